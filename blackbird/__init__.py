@@ -26,6 +26,7 @@
 
 import json
 import os
+import shlex
 import tempfile
 from textwrap import dedent
 
@@ -41,7 +42,7 @@ from eddy.core.datatypes.graphol import Item
 from eddy.core.datatypes.owl import OWLAxiom, OWLSyntax
 from eddy.core.diagram import Diagram
 from eddy.core.exporters.owl2 import OWLOntologyExporterWorker
-from eddy.core.functions.fsystem import fread, fexists
+from eddy.core.functions.fsystem import fexists
 from eddy.core.functions.misc import first
 from eddy.core.functions.path import expandPath
 from eddy.core.functions.signals import connect, disconnect
@@ -58,6 +59,8 @@ from eddy.plugins.blackbird import resources_rc
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.about import AboutDialog
 # noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.cache import SchemaCache
+# noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.diagram import BlackBirdDiagram
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.dialogs import (
@@ -78,12 +81,16 @@ from eddy.plugins.blackbird.items.edges import ForeignKeyEdge
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.items.nodes import TableNode
 # noinspection PyUnresolvedReferences
-from eddy.plugins.blackbird.rest import NetworkManager
+from eddy.plugins.blackbird.prefetch import TablePrefetcher
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.rest import NetworkManager, RequestCoordinator
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalSchema
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import (
     RelationalSchemaParser,
+    RelationalSchemaStreamParser,
+    RelationalSchemaDiff,
     EntityType
 )
 # noinspection PyUnresolvedReferences
@@ -91,7 +98,7 @@ from eddy.plugins.blackbird.schema import RelationalTable, ForeignKeyConstraint
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalTableAction
 # noinspection PyUnresolvedReferences
-from eddy.plugins.blackbird.translator import BlackbirdProcess
+from eddy.plugins.blackbird.translator import BlackbirdDaemonClient, BlackbirdProcess, EnginePool
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.ui.mdi import BlackBirdMdiSubWindow
 # noinspection PyUnresolvedReferences
@@ -120,7 +127,9 @@ class BlackbirdPlugin(AbstractPlugin):
     sgnStopTranslator = QtCore.pyqtSignal()
     sgnTranslatorReady = QtCore.pyqtSignal()
     sgnSchemaChanged = QtCore.pyqtSignal(RelationalSchema)
+    sgnSchemaUpdated = QtCore.pyqtSignal(RelationalSchemaDiff)
     sgnActionCorrectlyFinalized = QtCore.pyqtSignal()
+    sgnActionBatchFinalized = QtCore.pyqtSignal(list)
     sgnUndoActionCorrectlyFinalized = QtCore.pyqtSignal()
 
     sgnDiagramCreated = QtCore.pyqtSignal('QGraphicsScene', str)
@@ -129,9 +138,7 @@ class BlackbirdPlugin(AbstractPlugin):
 
     sgnFocusDiagram = QtCore.pyqtSignal('QGraphicsScene')
     sgnFocusItem = QtCore.pyqtSignal('QGraphicsItem')
-    sgnActionNodeAdded = QtCore.pyqtSignal(BlackBirdDiagram, TableNode)
-    sgnNodeAdded = QtCore.pyqtSignal(BlackBirdDiagram, TableNode)
-    sgnEdgeAdded = QtCore.pyqtSignal(BlackBirdDiagram, ForeignKeyEdge)
+    sgnItemsAdded = QtCore.pyqtSignal(BlackBirdDiagram, list)
     sgnFocusTable = QtCore.pyqtSignal(RelationalTable)
     sgnFocusForeignKey = QtCore.pyqtSignal(ForeignKeyConstraint)
 
@@ -143,6 +150,8 @@ class BlackbirdPlugin(AbstractPlugin):
         """
         super().__init__(spec, session)
         self.nmanager = NetworkManager(self)
+        self.prefetcher = TablePrefetcher(self.nmanager, self)
+        self.coordinator = RequestCoordinator(self.nmanager)
         self.translator = None
         self.bbOntologyEntityMgr = None
         self.subwindowList = []
@@ -153,6 +162,14 @@ class BlackbirdPlugin(AbstractPlugin):
         self.actionCounter = 0
         self.tableNameToSchemaQtActions = {}
         self.tableNameToDescriptionQtAction = {}
+        self.schemaParsers = {}
+        self.schemaCache = None
+        self.schemaCacheKeys = {}
+        self.engineSchemaKey = None
+        self.actionBatch = None
+        self.actionBatchReply = None
+        self.actionBatchResults = []
+        self.pendingExport = None
 
     #############################################
     #   HOOKS
@@ -177,6 +194,7 @@ class BlackbirdPlugin(AbstractPlugin):
         self.debug('Disconnecting from active session')
         disconnect(self.session.sgnReady, self.onSessionReady)
         disconnect(self.session.sgnUpdateState, self.doUpdateState)
+        disconnect(self.session.mdi.subWindowActivated, self.doPrefetchTables)
 
     def start(self):
         """
@@ -212,6 +230,9 @@ class BlackbirdPlugin(AbstractPlugin):
         connect(self.sgnFocusItem, self.doFocusItem)
         connect(self.sgnActionCorrectlyFinalized, self.onSchemaActionCorrectlyFinalized)
         connect(self.sgnUndoActionCorrectlyFinalized, self.onSchemaUndoActionCorrectlyFinalized)
+        connect(self.sgnSchemaChanged, self.onSchemaChanged)
+        connect(self.sgnSchemaUpdated, self.onSchemaUpdated)
+        connect(self.session.mdi.subWindowActivated, self.doPrefetchTables)
 
     # noinspection PyArgumentList
     def initActions(self):
@@ -339,8 +360,36 @@ class BlackbirdPlugin(AbstractPlugin):
         bbpath = os.path.join(path, self.spec.get('blackbird', 'executable'))
         if not fexists(bbpath):
             raise IOError('Cannot find Blackbird executable!')
-        self.translator = BlackbirdProcess(bbpath, self)
-        connect(self.translator.started, self.onTranslatorReady)
+        # JVM OPTIONS ARE READ FROM THE PLUGIN SPEC, AND CAN BE OVERRIDDEN IN THE PLUGIN SETTINGS
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        jvmOptions = self.spec.get('blackbird', 'jvm_options', fallback='')
+        jvmOptions = settings.value('blackbird/jvm/options', jvmOptions, str)
+        cds = self.spec.getboolean('blackbird', 'cds_archive', fallback=False)
+        cds = settings.value('blackbird/jvm/cds', cds, bool)
+        cdsDir = None
+        if cds:
+            location = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.CacheLocation)
+            cdsDir = os.path.join(location, 'blackbird', 'cds')
+        # IN DAEMON MODE THE ENGINE IS SHARED ACROSS SESSIONS AND OUTLIVES THEM UNTIL LEFT IDLE
+        daemonMode = settings.value('blackbird/engine/daemon', False, bool)
+        if daemonMode and not BlackbirdDaemonClient.isSupported():
+            LOGGER.warning('Blackbird Engine daemon is not available: running the engine within the session')
+            daemonMode = False
+        if daemonMode:
+            idleTimeout = settings.value('blackbird/engine/idleTimeout', 600, int)
+            self.translator = BlackbirdDaemonClient(bbpath, self, self.nmanager,
+                                                    shlex.split(jvmOptions), cdsDir, idleTimeout)
+        # A POOL OF ENGINES SERVES PREVIEWS CONCURRENTLY WITH SCHEMA GENERATIONS AND ACTIONS
+        elif settings.value('blackbird/engine/pool', 1, int) > 1:
+            size = settings.value('blackbird/engine/pool', 1, int)
+            port = settings.value('blackbird/engine/port', 8080, int)
+            portArgument = self.spec.get('blackbird', 'port_argument', fallback='--server.port={}')
+            self.translator = EnginePool(bbpath, self, self.nmanager, shlex.split(jvmOptions), cdsDir,
+                                         size, port, portArgument)
+        else:
+            self.translator = BlackbirdProcess(bbpath, self, self.nmanager, shlex.split(jvmOptions), cdsDir)
+        connect(self.translator.sgnReady, self.onTranslatorReady)
+        connect(self.translator.sgnFinished, self.onTranslatorFinished)
         connect(self.translator.errorOccurred, self.onTranslatorErrorOccurred)
         connect(self.sgnStartTranslator, self.doStartTranslator)
         connect(self.sgnStopTranslator, self.doStopTranslator)
@@ -712,6 +761,7 @@ class BlackbirdPlugin(AbstractPlugin):
             bbDiagramName = self.getNewDiagramName(ontDiagram)  # '{}_SCHEMA_0'.format(ontDiagram.name)
             bbDiagram = BlackBirdDiagram(bbDiagramName, self.project, self.schema, self)
             self.sgnDiagramCreated.emit(bbDiagram, ontDiagram.name)
+            items = []
             ontNodeToBBNodeDict = {}
             diagramToTablesDict = self.bbOntologyEntityMgr.diagramToTables
             relTableToDiagramNodes = diagramToTablesDict[ontDiagram]
@@ -722,10 +772,7 @@ class BlackbirdPlugin(AbstractPlugin):
                                         relational_table=table, diagram=bbDiagram)
                     relNode.setPos(ontNode.pos())
                     relNode.setText(tableName)
-                    bbDiagram.addItem(relNode)
-                    self.sgnNodeAdded.emit(bbDiagram, relNode)
-                    if len(table.actions) > 0:
-                        self.sgnActionNodeAdded.emit(bbDiagram, relNode)
+                    items.append(relNode)
                     ontNodeToBBNodeDict[ontNode] = relNode
             # ADDING EDGES
             diagramToForeignKeysDict = self.bbOntologyEntityMgr.diagramToForeignKeys
@@ -733,15 +780,20 @@ class BlackbirdPlugin(AbstractPlugin):
             for fk, fkVisualElementList in fkToDiagramElements.items():
                 for innerList in fkVisualElementList:
                     for fkVisualElement in innerList:
-                        self.addFkEdgeToDiagram(fk, fkVisualElement, bbDiagram, ontNodeToBBNodeDict)
+                        items.append(self.createFkEdge(fk, fkVisualElement, bbDiagram, ontNodeToBBNodeDict))
+            bbDiagram.addItems(items)
+            self.sgnItemsAdded.emit(bbDiagram, items)
 
-    def addFkEdgeToDiagram(self, fk, fkVisualElement, bbDiagram, ontNodeToBBNodeDict):
+    @staticmethod
+    def createFkEdge(fk, fkVisualElement, bbDiagram, ontNodeToBBNodeDict):
         """
-        Add to diagram the FK corresponding to the fkVisualElement based on the dictionary ontNodeToBBNodeDict
+        Create the edge for the FK corresponding to the fkVisualElement based on the dictionary ontNodeToBBNodeDict.
+        The edge is attached to its endpoints but not added to the diagram.
         :type fk: ForeignKeyConstraint
         :type fkVisualElement: ForeignKeyVisualElements
-        :type diagram: BlackBirdDiagram
+        :type bbDiagram: BlackBirdDiagram
         :type ontNodeToBBNodeDict: dict
+        :rtype: ForeignKeyEdge
         """
         src = ontNodeToBBNodeDict[fkVisualElement.src]
         tgt = ontNodeToBBNodeDict[fkVisualElement.tgt]
@@ -754,16 +806,8 @@ class BlackbirdPlugin(AbstractPlugin):
                 fkBreakpoints = edge.breakpoints[::-1]
             else:
                 fkBreakpoints = edge.breakpoints
-
-            fkEdge = ForeignKeyEdge(foreign_key=fk, source=src, target=tgt, breakpoints=fkBreakpoints,
-                                    diagram=bbDiagram)
-            bbDiagram.addItem(fkEdge)
-            self.sgnEdgeAdded.emit(bbDiagram, fkEdge)
-            fkEdge.source.setAnchor(fkEdge, QtCore.QPointF(fkVisualElement.src.anchor(edge)))
-            fkEdge.target.setAnchor(fkEdge, QtCore.QPointF(fkVisualElement.tgt.anchor(edge)))
-            fkEdge.source.addEdge(fkEdge)
-            fkEdge.target.addEdge(fkEdge)
-            fkEdge.updateEdge(visible=True)
+            srcAnchor = QtCore.QPointF(fkVisualElement.src.anchor(edge))
+            tgtAnchor = QtCore.QPointF(fkVisualElement.tgt.anchor(edge))
         else:
             srcAnchor = QtCore.QPointF(fkVisualElement.src.anchor(edges[0]))
             tgtAnchor = QtCore.QPointF(fkVisualElement.tgt.anchor(edges[-1]))
@@ -777,16 +821,13 @@ class BlackbirdPlugin(AbstractPlugin):
                     else:
                         currBreakpoints = item.breakpoints
                     fkBreakpoints.extend(currBreakpoints)
-            # fkEdge = InclusionEdge(source=src, target=tgt, breakpoints=fkBreakpoints, diagram=bbDiagram)
-            fkEdge = ForeignKeyEdge(foreign_key=fk, source=src, target=tgt, breakpoints=fkBreakpoints,
-                                    diagram=bbDiagram)
-            bbDiagram.addItem(fkEdge)
-            self.sgnEdgeAdded.emit(bbDiagram, fkEdge)
-            fkEdge.source.setAnchor(fkEdge, srcAnchor)
-            fkEdge.target.setAnchor(fkEdge, tgtAnchor)
-            fkEdge.source.addEdge(fkEdge)
-            fkEdge.target.addEdge(fkEdge)
-            fkEdge.updateEdge(visible=True)
+        fkEdge = ForeignKeyEdge(foreign_key=fk, source=src, target=tgt, breakpoints=fkBreakpoints,
+                                diagram=bbDiagram)
+        fkEdge.source.setAnchor(fkEdge, srcAnchor)
+        fkEdge.target.setAnchor(fkEdge, tgtAnchor)
+        fkEdge.source.addEdge(fkEdge)
+        fkEdge.target.addEdge(fkEdge)
+        return fkEdge
 
     def removeOldDiagramsAfterSchemaGeneration(self):
         # remove old diagrams
@@ -817,7 +858,26 @@ class BlackbirdPlugin(AbstractPlugin):
                 subwin.close()
         self.subwindowList = []
 
-    def updateDiagrams(self):
+    def updateDiagrams(self, diff=None):
+        """
+        Update the open diagrams to the current schema.
+        When the schema diff is given diagrams are patched in place and sgnSchemaUpdated is emitted, unless disabled
+        in the plugin settings, otherwise each of them is replaced by a new diagram after emitting sgnSchemaChanged.
+        :type diff: RelationalSchemaDiff
+        """
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        if diff and settings.value('blackbird/diagram/incremental', True, bool):
+            for diagram in self.diagramList:
+                LOGGER.debug('Patching diagram {}'.format(diagram.name))
+                addedItems = diagram.patch(self.schema, diff)
+                if addedItems:
+                    self.sgnItemsAdded.emit(diagram, addedItems)
+            # EXPLORERS UPDATE THE ROWS OF THE PATCHED ITEMS FROM THE DIFF
+            self.sgnSchemaUpdated.emit(diff)
+            return
+
+        # EXPLORERS ARE CLEARED, NEW DIAGRAMS ANNOUNCE ALL THEIR ITEMS
+        self.sgnSchemaChanged.emit(self.schema)
         copyList = self.diagramList[:]
         self.diagramList = []
 
@@ -934,6 +994,23 @@ class BlackbirdPlugin(AbstractPlugin):
         if not self.translator.state() == QtCore.QProcess.Running:
             self.sgnStartTranslator.emit()
 
+    @QtCore.pyqtSlot(RelationalSchema)
+    def onSchemaChanged(self, schema):
+        """
+        Executed whenever a new version of the schema is available.
+        """
+        self.prefetcher.invalidate(schema)
+        # PREFETCH ONCE THE DIAGRAMS HAVE BEEN UPDATED TO THE NEW VERSION OF THE SCHEMA
+        QtCore.QTimer.singleShot(0, self.doPrefetchTables)
+
+    @QtCore.pyqtSlot(RelationalSchemaDiff)
+    def onSchemaUpdated(self, diff):
+        """
+        Executed whenever the diagrams have been patched to a new version of the schema.
+        :type diff: RelationalSchemaDiff
+        """
+        self.onSchemaChanged(diff.newSchema)
+
     @QtCore.pyqtSlot()
     def onDiagramExportCompleted(self):
         """
@@ -941,9 +1018,24 @@ class BlackbirdPlugin(AbstractPlugin):
         """
         try:
             worker = self.session.worker('Blackbird OWL Export')
-            owltext = fread(worker.tmpfile.name)
-            os.unlink(worker.tmpfile.name)
-            reply = self.nmanager.postSchema(owltext.encode('utf-8'))
+            owl = self.readExportedOWL(worker)
+            cache = self.getSchemaCache()
+            key = SchemaCache.key(owl, self.getMergePolicies())
+            # THE ENGINE MUST STILL HOLD THE SCHEMA AS GENERATED FOR ACTIONS TO APPLY TO IT
+            entry = cache.get(key) if cache and key == self.engineSchemaKey and self.actionCounter == 0 else None
+            if entry:
+                LOGGER.debug('Schema {} loaded from cache'.format(key))
+                self.coordinator.supersede('schema')
+                self.widget('progress').hide()
+                self.owltext = str(owl, encoding='utf-8')
+                self.jsonSchema = None
+                self.onSchemaGenerated(entry[1])
+                return
+            reply = self.coordinator.issue('schema', key, self.nmanager.postSchema, owl, abortable=True)
+            if not reply:
+                return
+            self.schemaCacheKeys[reply] = key
+            self.streamSchemaReply(reply)
             # We deal with network errors in the slot connected to the finished()
             # signal since it always follows the error() signal
             connect(reply.finished, self.onSchemaGenerationCompleted)
@@ -954,6 +1046,26 @@ class BlackbirdPlugin(AbstractPlugin):
                 <p>{}</p>""".format(e)))
             LOGGER.exception(e)
 
+    @QtCore.pyqtSlot()
+    def onSchemaReplyReadyRead(self):
+        """
+        Executed when a chunk of a schema description has been received from the Blackbird engine.
+        """
+        reply = self.sender()
+        if not self.coordinator.isCurrent('schema', reply):
+            # SUPERSEDED REPLIES ARE NEVER APPLIED: DO NOT WASTE TIME PARSING THEM
+            self.schemaParsers.pop(reply, None)
+            return
+        parser = self.schemaParsers.get(reply)
+        status = reply.attribute(QtNetwork.QNetworkRequest.HttpStatusCodeAttribute)
+        if parser and reply.error() == QtNetwork.QNetworkReply.NoError and status and 200 <= status < 300:
+            try:
+                parser.feed(self.nmanager.readAll(reply))
+            except Exception as e:
+                LOGGER.exception(e)
+                self.schemaParsers.pop(reply, None)
+                reply.abort()
+
     @QtCore.pyqtSlot()
     def onPreviewDiagramExportCompleted(self):
         """
@@ -961,9 +1073,21 @@ class BlackbirdPlugin(AbstractPlugin):
         """
         try:
             worker = self.session.worker('Blackbird OWL Export')
-            owltext = fread(worker.tmpfile.name)
-            os.unlink(worker.tmpfile.name)
-            reply = self.nmanager.postSchema(owltext.encode('utf-8'))
+            owl = self.readExportedOWL(worker)
+            cache = self.getSchemaCache()
+            key = SchemaCache.key(owl, self.getMergePolicies())
+            entry = cache.get(key) if cache else None
+            if entry and entry[0] is not None:
+                LOGGER.debug('Schema preview {} loaded from cache'.format(key))
+                self.coordinator.supersede('preview')
+                self.widget('progress').hide()
+                self.owltext = str(owl, encoding='utf-8')
+                self.onPreviewSchemaGenerated(str(entry[0], encoding='utf-8'), entry[1])
+                return
+            reply = self.coordinator.issue('preview', key, self.nmanager.postSchema, owl, abortable=True)
+            if not reply:
+                return
+            self.schemaCacheKeys[reply] = key
             # We deal with network errors in the slot connected to the finished()
             # signal since it always follows the error() signal
             connect(reply.finished, self.onPreviewSchemaGenerationCompleted)
@@ -981,7 +1105,11 @@ class BlackbirdPlugin(AbstractPlugin):
         """
         try:
             self.widget('action_progress').show()
-            reply = self.nmanager.putActionToSchema(schema.name, action)
+            key = ('action', schema.name, action.key)
+            reply = self.coordinator.issue('schema', key, self.nmanager.putActionToSchema, schema.name, action)
+            if not reply:
+                return
+            self.streamSchemaReply(reply)
             # We deal with network errors in the slot connected to the finished()
             # signal since it always follows the error() signal
             connect(reply.finished, self.onSchemaActionCompleted)
@@ -992,6 +1120,32 @@ class BlackbirdPlugin(AbstractPlugin):
                 <p>{}</p>""".format(e)))
             LOGGER.exception(e)
 
+    @QtCore.pyqtSlot(RelationalSchema, list)
+    def onSchemaActionsApplied(self, schema, actions):
+        """
+        Executed when a batch of actions has been applied over the current schema.
+        The actions are applied in order, and the resulting schema is parsed and drawn only once at the end.
+        """
+        if self.actionBatch:
+            self.session.addNotification('Another batch of actions is being applied to the schema')
+            return
+        try:
+            self.widget('action_progress').show()
+            self.actionBatchResults = []
+            self.actionBatch = self.nmanager.putActionsToSchema(schema.name, actions)
+            # THE SCHEMA RESULTING FROM THE BATCH SUPERSEDES THE ONES STILL PENDING, AND IS SUPERSEDED IN TURN
+            # BY ANY SCHEMA REQUEST ISSUED WHILE THE BATCH IS BEING APPLIED
+            self.coordinator.claim('schema', self.actionBatch)
+            connect(self.actionBatch.sgnReplyFinished, self.onSchemaBatchActionCompleted)
+            connect(self.actionBatch.sgnFinished, self.onSchemaActionBatchCompleted)
+        except Exception as e:
+            self.actionBatch = None
+            self.widget('action_progress').hide()
+            self.session.addNotification(dedent("""\
+                <b><font color="#7E0B17">ERROR</font></b>: Could not connect to Blackbird Engine.<br/>
+                <p>{}</p>""".format(e)))
+            LOGGER.exception(e)
+
     @QtCore.pyqtSlot()
     def onSchemaActionUndo(self):
         """
@@ -999,7 +1153,7 @@ class BlackbirdPlugin(AbstractPlugin):
         """
         try:
             self.widget('undo_progress').show()
-            reply = self.nmanager.putUndoToSchema(self.schema.name)
+            reply = self.coordinator.issue('schema', None, self.nmanager.putUndoToSchema, self.schema.name)
             # We deal with network errors in the slot connected to the finished()
             # signal since it always follows the error() signal
             connect(reply.finished, self.onSchemaUndoCompleted)
@@ -1031,24 +1185,37 @@ class BlackbirdPlugin(AbstractPlugin):
             reply.deleteLater()
             assert reply.isFinished()
 
+            if not self.coordinator.isCurrent('schema', reply):
+                LOGGER.debug('Discarding superseded schema generation reply')
             # noinspection PyArgumentList
-            if reply.error() == QtNetwork.QNetworkReply.NoError:
+            elif reply.error() == QtNetwork.QNetworkReply.NoError:
                 self.owltext = str(reply.request().attribute(NetworkManager.OWL), encoding='utf-8')
-                schema = str(reply.readAll(), encoding='utf-8')
-                self.jsonSchema = json.loads(schema)
-                self.schema = RelationalSchemaParser.getSchema(self.jsonSchema)
-                self.initializeOntologyEntityManager()
-                self.actionCounter = 0
-                self.action('undo_last_schema_action').setEnabled(False)
-                self.action('show_ontology').setEnabled(True)
-                self.sgnSchemaChanged.emit(self.schema)
-                self.initDiagrams()
-                self.initSchemaTableActions()
+                schema = self.readSchema(reply)
+                # ACTIONS OVER THE SCHEMA MUST BE APPLIED BY THE ENGINE WHICH GENERATED IT
+                self.nmanager.bindSchema(schema.name, reply)
+                data = json.dumps(self.jsonSchema).encode('utf-8') if self.jsonSchema is not None else None
+                self.cacheSchema(reply, data, schema)
+                self.onSchemaGenerated(schema)
             else:
                 self.session.addNotification('Error generating schema: {}'.format(reply.errorString()))
                 LOGGER.error('Error generating schema: {}'.format(reply.errorString()))
         finally:
-            self.widget('progress').hide()
+            self.schemaParsers.pop(self.sender(), None)
+            self.schemaCacheKeys.pop(self.sender(), None)
+            self.hideSchemaProgress()
+
+    def onSchemaGenerated(self, schema):
+        """
+        Executed when a schema has been generated, either by the Blackbird engine or from the cache.
+        :type schema: RelationalSchema
+        """
+        self.schema = schema
+        self.actionCounter = 0
+        self.action('undo_last_schema_action').setEnabled(False)
+        self.action('show_ontology').setEnabled(True)
+        self.sgnSchemaChanged.emit(self.schema)
+        self.initializeOntologyEntityManager(self.initDiagrams)
+        self.initSchemaTableActions()
 
     def initSchemaTableActions(self):
         """
@@ -1058,40 +1225,82 @@ class BlackbirdPlugin(AbstractPlugin):
             self.removeAction(qtAction)
         self.tableNameToDescriptionQtAction = {}
         for table in self.schema.tables:
-            qtActionLabel = 'Show detailed description'
-            qtActionName = 'show_detailed_description_{}'.format(table.name)
-            # noinspection PyArgumentList
-            qtAction = QtWidgets.QAction(qtActionLabel, self, objectName=qtActionName,
-                                         triggered=self.doShowTableDescriptionDialog)
-            qtAction.setData(table)
-            self.addAction(qtAction)
-            self.tableNameToDescriptionQtAction[table.name] = qtAction
+            self.tableNameToDescriptionQtAction[table.name] = self.createTableDescriptionQtAction(table)
 
         for tableName, qtActionList in self.tableNameToSchemaQtActions.items():
             for qtAction in qtActionList:
                 self.removeAction(qtAction)
         self.tableNameToSchemaQtActions = {}
-        bbActions = self.schema.actions
-        for bbAction in bbActions:
-            subj = bbAction.actionSubjectTableName
-            type = bbAction.actionType
-            objs = bbAction.actionObjectsNames
-            if len(objs) > 1:
-                objectsString = ','.join(map(str, objs))
-            else:
-                objectsString = objs[0]
-            qtActionLabel = 'Merge {}'.format(objectsString)
-            qtActionName = 'apply_action_{}_{}'.format(subj, objectsString)
-            # noinspection PyArgumentList
-            qtAction = QtWidgets.QAction(qtActionLabel, self, objectName=qtActionName,
-                                         triggered=self.doApplySchemaAction)
-            qtAction.setData(bbAction)
-            self.addAction(qtAction)
-            if subj in self.tableNameToSchemaQtActions:
-                self.tableNameToSchemaQtActions[subj].append(qtAction)
+        for bbAction in self.schema.actions:
+            qtAction = self.createSchemaQtAction(bbAction)
+            self.tableNameToSchemaQtActions.setdefault(bbAction.actionSubjectTableName, []).append(qtAction)
+
+    def updateSchemaTableActions(self, diff):
+        """
+        Update the QT actions associated to the relational tables (right click menu related),
+        creating and removing only the actions of the tables affected by the given schema diff.
+        :type diff: RelationalSchemaDiff
+        """
+        for table in diff.removedTables:
+            self.removeAction(self.tableNameToDescriptionQtAction.pop(table.name))
+        for oldTable, _ in diff.renamedTables:
+            self.removeAction(self.tableNameToDescriptionQtAction.pop(oldTable.name))
+        for table in diff.addedTables + [newTable for _, newTable in diff.renamedTables]:
+            self.tableNameToDescriptionQtAction[table.name] = self.createTableDescriptionQtAction(table)
+        # TABLES ARE PARSED AGAIN AT EACH VERSION: POINT SURVIVING ACTIONS TO THE NEW OBJECTS
+        for table in diff.newSchema.tables:
+            self.tableNameToDescriptionQtAction[table.name].setData(table)
+
+        oldActions = {}
+        for qtActionList in self.tableNameToSchemaQtActions.values():
+            for qtAction in qtActionList:
+                oldActions[qtAction.data().key] = qtAction
+        self.tableNameToSchemaQtActions = {}
+        for bbAction in diff.newSchema.actions:
+            qtAction = oldActions.pop(bbAction.key, None)
+            if qtAction:
+                qtAction.setData(bbAction)
             else:
-                qtActionList = [qtAction]
-                self.tableNameToSchemaQtActions[subj] = qtActionList
+                qtAction = self.createSchemaQtAction(bbAction)
+            self.tableNameToSchemaQtActions.setdefault(bbAction.actionSubjectTableName, []).append(qtAction)
+        for qtAction in oldActions.values():
+            self.removeAction(qtAction)
+
+    def createTableDescriptionQtAction(self, table):
+        """
+        Create and register the QT action showing the detailed description of the given table.
+        :type table: RelationalTable
+        :rtype: QAction
+        """
+        qtActionLabel = 'Show detailed description'
+        qtActionName = 'show_detailed_description_{}'.format(table.name)
+        # noinspection PyArgumentList
+        qtAction = QtWidgets.QAction(qtActionLabel, self, objectName=qtActionName,
+                                     triggered=self.doShowTableDescriptionDialog)
+        qtAction.setData(table)
+        self.addAction(qtAction)
+        return qtAction
+
+    def createSchemaQtAction(self, bbAction):
+        """
+        Create and register the QT action applying the given schema action.
+        :type bbAction: RelationalTableAction
+        :rtype: QAction
+        """
+        subj = bbAction.actionSubjectTableName
+        objs = bbAction.actionObjectsNames
+        if len(objs) > 1:
+            objectsString = ','.join(map(str, objs))
+        else:
+            objectsString = objs[0]
+        qtActionLabel = 'Merge {}'.format(objectsString)
+        qtActionName = 'apply_action_{}_{}'.format(subj, objectsString)
+        # noinspection PyArgumentList
+        qtAction = QtWidgets.QAction(qtActionLabel, self, objectName=qtActionName,
+                                     triggered=self.doApplySchemaAction)
+        qtAction.setData(bbAction)
+        self.addAction(qtAction)
+        return qtAction
 
     @QtCore.pyqtSlot()
     def doNothing(self):
@@ -1104,6 +1313,7 @@ class BlackbirdPlugin(AbstractPlugin):
         """
         qtAction = self.sender()
         table = qtAction.data()
+        table = self.prefetcher.table(table.name) or table
         dialog = TableInfoDialog(table, self.session)
         dialog.show()
         dialog.raise_()
@@ -1117,7 +1327,11 @@ class BlackbirdPlugin(AbstractPlugin):
             self.widget('action_progress').show()
             qtAction = self.sender()
             bbAction = qtAction.data()
-            reply = self.nmanager.putActionToSchema(self.schema.name, bbAction)
+            key = ('action', self.schema.name, bbAction.key)
+            reply = self.coordinator.issue('schema', key, self.nmanager.putActionToSchema, self.schema.name, bbAction)
+            if not reply:
+                return
+            self.streamSchemaReply(reply)
             # We deal with network errors in the slot connected to the finished()
             # signal since it always follows the error() signal
             connect(reply.finished, self.onSchemaActionCompleted)
@@ -1137,24 +1351,39 @@ class BlackbirdPlugin(AbstractPlugin):
             reply = self.sender()
             reply.deleteLater()
             assert reply.isFinished()
+            if not self.coordinator.isCurrent('preview', reply):
+                LOGGER.debug('Discarding superseded schema preview reply')
             # noinspection PyArgumentList
-            if reply.error() == QtNetwork.QNetworkReply.NoError:
+            elif reply.error() == QtNetwork.QNetworkReply.NoError:
                 self.owltext = str(reply.request().attribute(NetworkManager.OWL), encoding='utf-8')
-                schema = str(reply.readAll(), encoding='utf-8')
-                # AGGANCIATI QUI CON IL PARSER
-                self.jsonSchema = json.loads(schema)
-                self.schema = RelationalSchemaParser.getSchema(self.jsonSchema)
-                self.initializeOntologyEntityManager()
-                dialog = BlackbirdOutputDialog(self.owltext, json.dumps(json.loads(schema), indent=2), self.schema,
-                                               self.session)
-                dialog.show()
-                dialog.raise_()
-                LOGGER.debug(self.schema)
+                data = self.nmanager.readAll(reply)
+                schema = RelationalSchemaParser.getSchema(json.loads(str(data, encoding='utf-8')))
+                # THE PREVIEW BECOMES THE CURRENT SCHEMA, HELD BY THE ENGINE WHICH GENERATED IT
+                self.nmanager.bindSchema(schema.name, reply)
+                self.cacheSchema(reply, data, schema)
+                self.onPreviewSchemaGenerated(str(data, encoding='utf-8'), schema)
             else:
                 self.session.addNotification('Error generating schema: {}'.format(reply.errorString()))
                 LOGGER.error('Error generating schema: {}'.format(reply.errorString()))
         finally:
-            self.widget('progress').hide()
+            self.schemaCacheKeys.pop(self.sender(), None)
+            self.hideSchemaProgress()
+
+    def onPreviewSchemaGenerated(self, schemaText, schema):
+        """
+        Executed when a schema preview has been generated, either by the Blackbird engine or from the cache.
+        :type schemaText: str
+        :type schema: RelationalSchema
+        """
+        # AGGANCIATI QUI CON IL PARSER
+        self.jsonSchema = json.loads(schemaText)
+        self.schema = schema
+        self.initializeOntologyEntityManager()
+        dialog = BlackbirdOutputDialog(self.owltext, json.dumps(self.jsonSchema, indent=2), self.schema,
+                                       self.session)
+        dialog.show()
+        dialog.raise_()
+        LOGGER.debug(self.schema)
 
     @QtCore.pyqtSlot()
     def onSchemaActionCompleted(self):
@@ -1165,21 +1394,75 @@ class BlackbirdPlugin(AbstractPlugin):
             reply = self.sender()
             reply.deleteLater()
             assert reply.isFinished()
+            if not self.coordinator.isCurrent('schema', reply):
+                LOGGER.debug('Discarding superseded schema action reply')
             # noinspection PyArgumentList
-            if reply.error() == QtNetwork.QNetworkReply.NoError:
-                schema = str(reply.readAll(), encoding='utf-8')
-                self.jsonSchema = json.loads(schema)
-                self.schema = RelationalSchemaParser.getSchema(self.jsonSchema)
-                # self.initializeOntologyEntityManager()
+            elif reply.error() == QtNetwork.QNetworkReply.NoError:
+                diff = RelationalSchemaDiff(self.schema, self.readSchema(reply))
+                self.schema = diff.newSchema
+                self.updateOntologyEntityManager()
                 self.actionCounter += 1
-                self.sgnSchemaChanged.emit(self.schema)
-                self.updateDiagrams()
-                self.initSchemaTableActions()
+                self.updateDiagrams(diff)
+                self.updateSchemaTableActions(diff)
                 self.sgnActionCorrectlyFinalized.emit()
             else:
                 self.session.addNotification('Error applying action: {}'.format(reply.errorString()))
                 LOGGER.error('Error applying action: {}'.format(reply.errorString()))
         finally:
+            self.schemaParsers.pop(self.sender(), None)
+            self.hideSchemaProgress()
+
+    @QtCore.pyqtSlot(QtNetwork.QNetworkReply)
+    def onSchemaBatchActionCompleted(self, reply):
+        """
+        Executed when an action of the batch being applied over the current schema completes.
+        Only the schema resulting from the last action correctly applied is retained.
+        :type reply: QNetworkReply
+        """
+        action = reply.request().attribute(NetworkManager.Action)
+        # noinspection PyArgumentList
+        if reply.error() == QtNetwork.QNetworkReply.NoError:
+            if self.actionBatchReply:
+                self.actionBatchReply.deleteLater()
+            self.actionBatchReply = reply
+            self.actionBatchResults.append((action, None))
+        else:
+            reply.deleteLater()
+            self.actionBatchResults.append((action, reply.errorString()))
+            LOGGER.error('Error applying action {}: {}'.format(action, reply.errorString()))
+
+    @QtCore.pyqtSlot()
+    def onSchemaActionBatchCompleted(self):
+        """
+        Executed when all the actions of the batch being applied over the current schema complete.
+        """
+        reply = self.actionBatchReply
+        results = self.actionBatchResults
+        try:
+            self.actionBatch.deleteLater()
+            if reply:
+                reply.deleteLater()
+            if reply and not self.coordinator.isCurrent('schema', self.actionBatch):
+                LOGGER.debug('Discarding superseded schema action batch reply')
+            elif reply:
+                diff = RelationalSchemaDiff(self.schema, self.readSchema(reply))
+                self.schema = diff.newSchema
+                self.updateOntologyEntityManager()
+                self.actionCounter += sum(1 for _, error in results if not error)
+                self.updateDiagrams(diff)
+                self.updateSchemaTableActions(diff)
+                self.sgnActionCorrectlyFinalized.emit()
+            failures = [(action, error) for action, error in results if error]
+            if failures:
+                self.session.addNotification(dedent("""\
+                    <b><font color="#7E0B17">ERROR</font></b>: {} of {} actions could not be applied.<br/>
+                    <p>{}</p>""".format(len(failures), len(results), '<br/>'.join(
+                        '{}: {}'.format(action, error) for action, error in failures))))
+            self.sgnActionBatchFinalized.emit(results)
+        finally:
+            self.actionBatch = None
+            self.actionBatchReply = None
+            self.actionBatchResults = []
             self.widget('action_progress').hide()
 
     @QtCore.pyqtSlot()
@@ -1198,25 +1481,28 @@ class BlackbirdPlugin(AbstractPlugin):
             reply = self.sender()
             reply.deleteLater()
             assert reply.isFinished()
+            if not self.coordinator.isCurrent('schema', reply):
+                LOGGER.debug('Discarding superseded schema undo reply')
             # noinspection PyArgumentList
-            if reply.error() == QtNetwork.QNetworkReply.NoError:
-                schema = str(reply.readAll(), encoding='utf-8')
+            elif reply.error() == QtNetwork.QNetworkReply.NoError:
+                schema = str(self.nmanager.readAll(reply), encoding='utf-8')
                 dialog = BlackbirdOutputDialog('', json.dumps(json.loads(schema), indent=2), self.session)
                 dialog.show()
                 dialog.raise_()
                 self.jsonSchema = json.loads(schema)
                 self.actionCounter += 1
-                self.schema = RelationalSchemaParser.getSchema(self.jsonSchema)
+                diff = RelationalSchemaDiff(self.schema, RelationalSchemaParser.getSchema(self.jsonSchema))
+                self.schema = diff.newSchema
+                self.updateOntologyEntityManager()
                 self.sgnActionCorrectlyFinalized.emit()
-                self.sgnSchemaChanged.emit(self.schema)
-                self.updateDiagrams()  # TODO sostistuisci con updateDiagramsFromUndo (DISEGNA A PARTIRE DA DIAGRAMMA CORRENTE + DIAGRAMMA PRECEDENTE AD AZIONE CHE VIENE ANNULLATA DA UNDO)
-                self.initSchemaTableActions()
+                self.updateDiagrams(diff)  # TODO sostistuisci con updateDiagramsFromUndo (DISEGNA A PARTIRE DA DIAGRAMMA CORRENTE + DIAGRAMMA PRECEDENTE AD AZIONE CHE VIENE ANNULLATA DA UNDO)
+                self.updateSchemaTableActions(diff)
                 self.sgnUndoActionCorrectlyFinalized.emit()
             else:
                 self.session.addNotification('Error undoing action: {}'.format(reply.errorString()))
                 LOGGER.error('Error undoing action: {}'.format(reply.errorString()))
         finally:
-            self.widget('undo_progress').hide()
+            self.hideSchemaProgress()
 
     @QtCore.pyqtSlot()
     def onSchemaUndoActionCorrectlyFinalized(self):
@@ -1235,6 +1521,14 @@ class BlackbirdPlugin(AbstractPlugin):
             <b><font color="#7E0B17">ERROR</font></b>: Could not start Blackbird Engine: {}
             """.format(error)))
         LOGGER.error('Could not start Blackbird Engine: {}'.format(error))
+        self.dropPendingExport()
+
+    @QtCore.pyqtSlot()
+    def onTranslatorFinished(self):
+        """
+        Executed when the Blackbird engine process terminates.
+        """
+        self.dropPendingExport()
 
     @QtCore.pyqtSlot()
     def onTranslatorReady(self):
@@ -1243,6 +1537,13 @@ class BlackbirdPlugin(AbstractPlugin):
         """
         self.session.addNotification('Blackbird Engine Ready')
         LOGGER.info('Blackbird Engine Ready')
+        # A NEW ENGINE DOES NOT HOLD ANY OF THE PREVIOUSLY GENERATED SCHEMAS
+        self.engineSchemaKey = None
+        self.sgnTranslatorReady.emit()
+        if self.pendingExport:
+            diagrams, onCompleted = self.pendingExport
+            self.pendingExport = None
+            self.exportDiagramsToOWL(diagrams, onCompleted)
 
     @QtCore.pyqtSlot('QGraphicsScene')
     def doFocusDiagram(self, diagram):
@@ -1299,6 +1600,31 @@ class BlackbirdPlugin(AbstractPlugin):
         """
         self.sgnFocusForeignKey.emit(fk)
 
+    @QtCore.pyqtSlot()
+    def doPrefetchTables(self):
+        """
+        Prefetch the details and the actions of the tables in the active diagram.
+        Selected tables come first, followed by the ones in the viewport, closest to its center first,
+        and finally by the rest of the diagram.
+        """
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        if not settings.value('blackbird/prefetch/enabled', True, bool):
+            return
+        diagram = self.session.mdi.activeDiagram()
+        view = self.session.mdi.activeView()
+        if not isinstance(diagram, BlackBirdDiagram) or not self.prefetcher.schema:
+            return
+        nodes = [node for node in diagram.nodes() if isinstance(node, TableNode)]
+        visible = view.mapToScene(view.viewport().rect()).boundingRect()
+        center = visible.center()
+
+        def priority(node):
+            pos = node.sceneBoundingRect().center()
+            distance = (pos.x() - center.x()) ** 2 + (pos.y() - center.y()) ** 2
+            return not node.isSelected(), not visible.intersects(node.sceneBoundingRect()), distance
+
+        self.prefetcher.prefetch([node.relationalTable.name for node in sorted(nodes, key=priority)])
+
     @QtCore.pyqtSlot()
     def doOpenDialog(self):
         """
@@ -1400,20 +1726,10 @@ class BlackbirdPlugin(AbstractPlugin):
         if not dialog.exec_():
             return
         diagrams = dialog.selectedDiagrams()
-        if len(diagrams) and self.translator.state() == QtCore.QProcess.Running:
+        if len(diagrams):
             self.diagSelInOntGen = diagrams
             self.widget('progress').show()
-            # EXPORT DIAGRAM TO OWL
-            tmpfile = tempfile.NamedTemporaryFile('wb', delete=False)
-            worker = OWLOntologyExporterWorker(self.project, tmpfile.name,
-                                               axioms={x for x in OWLAxiom},
-                                               normalize=False,
-                                               syntax=OWLSyntax.Functional,
-                                               diagrams=diagrams)
-            worker.tmpfile = tmpfile
-            connect(worker.sgnCompleted, self.onDiagramExportCompleted)
-            connect(worker.sgnErrored, self.onDiagramExportFailure)
-            self.session.startThread('Blackbird OWL Export', worker)
+            self.requestExport(diagrams, self.onDiagramExportCompleted)
 
     @QtCore.pyqtSlot()
     def doGeneratePreviewSchema(self):
@@ -1424,20 +1740,10 @@ class BlackbirdPlugin(AbstractPlugin):
         if not dialog.exec_():
             return
         diagrams = dialog.selectedDiagrams()
-        if len(diagrams) and self.translator.state() == QtCore.QProcess.Running:
+        if len(diagrams):
             self.diagSelInOntGen = diagrams
             self.widget('progress').show()
-            # EXPORT DIAGRAM TO OWL
-            tmpfile = tempfile.NamedTemporaryFile('wb', delete=False)
-            worker = OWLOntologyExporterWorker(self.project, tmpfile.name,
-                                               axioms={x for x in OWLAxiom},
-                                               normalize=False,
-                                               syntax=OWLSyntax.Functional,
-                                               diagrams=diagrams)
-            worker.tmpfile = tmpfile
-            connect(worker.sgnCompleted, self.onPreviewDiagramExportCompleted)
-            connect(worker.sgnErrored, self.onDiagramExportFailure)
-            self.session.startThread('Blackbird OWL Export', worker)
+            self.requestExport(diagrams, self.onPreviewDiagramExportCompleted)
 
     @QtCore.pyqtSlot()
     def doShowTranslatorLog(self):
@@ -1454,8 +1760,8 @@ class BlackbirdPlugin(AbstractPlugin):
         Shows the output of the last executed generation.
         """
         if self.translator:
-            dialog = BlackbirdOutputDialog(self.owltext, json.dumps(self.jsonSchema, indent=2),
-                                           self.schema, self.session)
+            jsonSchema = json.dumps(self.jsonSchema, indent=2) if self.jsonSchema is not None else ''
+            dialog = BlackbirdOutputDialog(self.owltext, jsonSchema, self.schema, self.session)
             dialog.exec_()
 
     @QtCore.pyqtSlot()
@@ -1464,32 +1770,18 @@ class BlackbirdPlugin(AbstractPlugin):
         Start the Blackbird translator process.
         """
         if self.translator and self.translator.state() == QtCore.QProcess.NotRunning:
+            # READINESS IS SIGNALED ASYNCHRONOUSLY ONCE THE ENGINE ANSWERS THE HEALTH PROBE
             self.translator.start()
-            attempt = 0
-            while attempt < 30:
-                self.translator.waitForStarted(100)
-                QtWidgets.QApplication.processEvents()
-                if self.translator.state() == QtCore.QProcess.Running:
-                    self.sgnTranslatorReady.emit()
-                    break
-                attempt += 1
 
     @QtCore.pyqtSlot()
     def doStopTranslator(self):
         """
-        Stop the Blackbird translator process.
+        Stop the Blackbird translator process, waiting for it to terminate.
+        The engine is given the stop timeout to exit gracefully (e.g. to dump its class data sharing archive),
+        after which it is killed, so that it never outlives the plugin.
         """
-        if self.translator and self.translator.state() != QtCore.QProcess.NotRunning:
-            self.translator.terminate()
-            attempt = 0
-            while attempt < 30:
-                self.translator.waitForFinished(100)
-                QtWidgets.QApplication.processEvents()
-                if self.translator.state() == QtCore.QProcess.NotRunning:
-                    break
-                attempt += 1
-            if self.translator.state() != QtCore.QProcess.NotRunning:
-                self.translator.kill()
+        if self.translator:
+            self.translator.stop(wait=True)
 
     @QtCore.pyqtSlot()
     def doShowAboutDialog(self):
@@ -1557,14 +1849,176 @@ class BlackbirdPlugin(AbstractPlugin):
         subwindow.showMaximized()
         return subwindow
 
-    def initializeOntologyEntityManager(self):
+    def initializeOntologyEntityManager(self, callback=None):
         """
-        Initialize the ontology visual elements manager.
+        Initialize the ontology visual elements manager, executing the given callback once
+        all the diagrams have been mapped. If worker threads are enabled in the plugin settings,
+        diagrams are mapped in the background and the callback runs from the event loop.
+        :type callback: callable
         """
-        self.bbOntologyEntityMgr = BlackbirdOntologyEntityManager(self.schema, self.session, self.diagSelInOntGen)
-        LOGGER.debug('############# Initializing BlackbirdOntologyEntityManager')
-        LOGGER.debug(self.bbOntologyEntityMgr.diagramToTablesString())
-        LOGGER.debug(self.bbOntologyEntityMgr.diagramToForeignKeysString())
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        workers = settings.value('blackbird/mapping/workers', 0, int)
+        manager = BlackbirdOntologyEntityManager(self.schema, self.session, self.diagSelInOntGen, workers=workers)
+        self.bbOntologyEntityMgr = manager
+
+        def onReady():
+            # A NEWER SCHEMA MAY HAVE REPLACED THE MANAGER WHILE IT WAS MAPPING DIAGRAMS
+            if manager is self.bbOntologyEntityMgr:
+                LOGGER.debug('############# Initializing BlackbirdOntologyEntityManager')
+                LOGGER.debug(manager.diagramToTablesString())
+                LOGGER.debug(manager.diagramToForeignKeysString())
+                if callback:
+                    callback()
+
+        if manager.isReady():
+            onReady()
+        else:
+            connect(manager.sgnReady, onReady)
+
+    def updateOntologyEntityManager(self):
+        """
+        Update the ontology visual elements manager to the current schema, reusing the mappings
+        computed for the previous one. The manager is initialized from scratch if not available.
+        """
+        if self.bbOntologyEntityMgr and self.bbOntologyEntityMgr.isReady():
+            self.bbOntologyEntityMgr.update(self.schema)
+        else:
+            self.initializeOntologyEntityManager()
+
+    def requestExport(self, diagrams, onCompleted):
+        """
+        Export the given diagrams to OWL as soon as the Blackbird engine is healthy, starting it if needed.
+        While the engine is not healthy only the newest export request is retained.
+        :type diagrams: list
+        :type onCompleted: callable
+        """
+        if self.translator.isHealthy():
+            self.exportDiagramsToOWL(diagrams, onCompleted)
+            return
+        self.pendingExport = (diagrams, onCompleted)
+        if self.translator.state() == QtCore.QProcess.NotRunning:
+            self.sgnStartTranslator.emit()
+
+    def dropPendingExport(self):
+        """
+        Drop the export request waiting for the Blackbird engine to become healthy.
+        """
+        if self.pendingExport:
+            self.pendingExport = None
+            self.widget('progress').hide()
+            self.session.addNotification('Schema generation cancelled: Blackbird Engine is not running')
+
+    def exportDiagramsToOWL(self, diagrams, onCompleted):
+        """
+        Export the given diagrams to an OWL ontology in functional syntax in a separate thread,
+        executing onCompleted once the export completes.
+        :type diagrams: list
+        :type onCompleted: callable
+        """
+        tmpfile = tempfile.NamedTemporaryFile('wb', delete=False)
+        # THE FILE IS WRITTEN BY THE WORKER: DO NOT LEAK THE HANDLE
+        tmpfile.close()
+        worker = OWLOntologyExporterWorker(self.project, tmpfile.name,
+                                           axioms={x for x in OWLAxiom},
+                                           normalize=False,
+                                           syntax=OWLSyntax.Functional,
+                                           diagrams=diagrams)
+        worker.tmpfile = tmpfile
+        connect(worker.sgnCompleted, onCompleted)
+        connect(worker.sgnErrored, self.onDiagramExportFailure)
+        self.session.startThread('Blackbird OWL Export', worker)
+
+    @staticmethod
+    def readExportedOWL(worker):
+        """
+        Returns the UTF-8 encoded ontology exported by the given worker, removing the exported file.
+        The content is handed over as is, without decoding it to text and encoding it back.
+        :type worker: OWLOntologyExporterWorker
+        :rtype: bytes
+        """
+        try:
+            with open(worker.tmpfile.name, 'rb') as f:
+                return f.read()
+        finally:
+            os.unlink(worker.tmpfile.name)
+
+    def getSchemaCache(self):
+        """
+        Returns the cache of the generated schemas, or None if disabled in the plugin settings.
+        :rtype: SchemaCache
+        """
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        if not settings.value('blackbird/cache/enabled', True, bool):
+            return None
+        maxSize = settings.value('blackbird/cache/size', 64, int) * 1024 * 1024
+        if not self.schemaCache:
+            location = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.CacheLocation)
+            self.schemaCache = SchemaCache(os.path.join(location, 'blackbird', 'schemas'), maxSize)
+        self.schemaCache.maxSize = maxSize
+        return self.schemaCache
+
+    @staticmethod
+    def getMergePolicies():
+        """
+        Returns the merge policies set in the plugin settings.
+        :rtype: dict
+        """
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        settings.beginGroup('blackbird/merge/policy')
+        try:
+            return {key: settings.value(key) for key in settings.childKeys()}
+        finally:
+            settings.endGroup()
+
+    def cacheSchema(self, reply, data, schema):
+        """
+        Store the schema generated by the Blackbird engine for the given reply in the schema cache.
+        :type reply: QNetworkReply
+        :type data: bytes
+        :type schema: RelationalSchema
+        """
+        key = self.schemaCacheKeys.pop(reply, None)
+        self.engineSchemaKey = key
+        cache = self.getSchemaCache()
+        if key and cache:
+            cache.put(key, data, schema)
+
+    def streamSchemaReply(self, reply):
+        """
+        Parse the schema carried by the given reply incrementally, as its content is received,
+        unless incremental parsing has been disabled in the plugin settings.
+        :type reply: QNetworkReply
+        """
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        if settings.value('blackbird/schema/incremental', True, bool):
+            self.schemaParsers[reply] = RelationalSchemaStreamParser()
+            connect(reply.readyRead, self.onSchemaReplyReadyRead)
+
+    def hideSchemaProgress(self):
+        """
+        Hide the progress dialogs of the requests issued to the Blackbird engine, unless some is still pending.
+        """
+        if not self.coordinator.isPending('schema') and not self.coordinator.isPending('preview'):
+            self.widget('progress').hide()
+        if not self.coordinator.isPending('schema'):
+            self.widget('undo_progress').hide()
+            if not self.actionBatch:
+                self.widget('action_progress').hide()
+
+    def readSchema(self, reply):
+        """
+        Returns the schema carried by the given finished reply.
+        If the reply has been parsed incrementally the JSON description of the schema is not retained.
+        :type reply: QNetworkReply
+        :rtype: RelationalSchema
+        """
+        parser = self.schemaParsers.pop(reply, None)
+        if parser:
+            parser.feed(self.nmanager.readAll(reply))
+            self.jsonSchema = None
+            return parser.close()
+        self.jsonSchema = json.loads(str(self.nmanager.readAll(reply), encoding='utf-8'))
+        return RelationalSchemaParser.getSchema(self.jsonSchema)
 
     def getNewUpdatedDiagram(self, oldDiagram):
         """
@@ -1573,128 +2027,52 @@ class BlackbirdPlugin(AbstractPlugin):
         :rtype: BlackBirdDiagram
         """
         LOGGER.debug('Updating diagram {}'.format(oldDiagram.name))
-        # newDiagram = BlackBirdDiagram('NEW_{}'.format(oldDiagram.name), self.session.project, self.schema)
-
         newDiagramName = self.getNewDiagramName(oldDiagram)
         newDiagram = BlackBirdDiagram(newDiagramName, self.session.project, self.schema, self)
         self.sgnDiagramCreated.emit(newDiagram, self.diagramToWindowLabel[oldDiagram])
         oldTableNodes = oldDiagram.nodes()
-        oldFkEdges = oldDiagram.edges()
+        nodeToTable, edgeToForeignKey = BlackBirdDiagram.matchItems(self.schema, oldTableNodes, oldDiagram.edges())
 
+        items = []
         oldNodeToNew = {}
-        remSchemaTables = []
-        for table in self.schema.tables:
-            remSchemaTables.append(table)
-        remSchemaFKs = []
-
-        for fk in self.schema.foreignKeys:
-            remSchemaFKs.append(fk)
-
-        remOldNodes = []
-        for node in oldTableNodes:
-            remOldNodes.append(node)
-
-        for fk in self.schema.foreignKeys:
-            for oldFkEdge in oldFkEdges:
-                if fk.equals(oldFkEdge.foreignKey):
-                    oldSrc = oldFkEdge.source
-                    if oldSrc in oldNodeToNew:
-                        newSrc = oldNodeToNew[oldSrc]
-                    else:
-                        newNodeRelTable = self.schema.getTableByEntityIRI(oldSrc.relationalTable.entity.fullIRI)
-                        if newNodeRelTable:
-                            if newNodeRelTable in remSchemaTables:
-                                remSchemaTables.remove(newNodeRelTable)
-                            newSrc = TableNode(oldSrc.width(), oldSrc.height(),
-                                               remaining_characters=newNodeRelTable.name,
-                                               relational_table=newNodeRelTable, diagram=newDiagram)
-                            newSrc.setPos(oldSrc.pos())
-                            newSrc.setText(newNodeRelTable.name)
-                            newDiagram.addItem(newSrc)
-                            self.sgnNodeAdded.emit(newDiagram, newSrc)
-                            if len(newNodeRelTable.actions) > 0:
-                                self.sgnActionNodeAdded.emit(newDiagram, newSrc)
-                            oldNodeToNew[oldSrc] = newSrc
-                            remOldNodes.remove(oldSrc)
-                        else:
-                            LOGGER.debug('Problems while drawing edge {} for foreign key {} in diagram {}.\n '
-                                         'Cannot find in new schema a table corresponding to src node '
-                                         'associated to IRI {}'.format(oldFkEdge, fk.name, newDiagram.name,
-                                                                       oldSrc.relationalTable.entity.fullIRI))
-
-                    if newSrc:
-                        oldTgt = oldFkEdge.target
-                        if oldTgt in oldNodeToNew:
-                            newTgt = oldNodeToNew[oldTgt]
-                        else:
-                            newNodeRelTable = self.schema.getTableByEntityIRI(oldTgt.relationalTable.entity.fullIRI)
-                            if newNodeRelTable:
-                                if newNodeRelTable in remSchemaTables:
-                                    remSchemaTables.remove(newNodeRelTable)
-                                newTgt = TableNode(oldTgt.width(), oldTgt.height(),
-                                                   remaining_characters=newNodeRelTable.name,
-                                                   relational_table=newNodeRelTable, diagram=newDiagram)
-                                newTgt.setPos(oldTgt.pos())
-                                newTgt.setText(newNodeRelTable.name)
-                                newDiagram.addItem(newTgt)
-                                self.sgnNodeAdded.emit(newDiagram, newTgt)
-                                if len(newNodeRelTable.actions) > 0:
-                                    self.sgnActionNodeAdded.emit(newDiagram, newTgt)
-                                oldNodeToNew[oldTgt] = newTgt
-                                remOldNodes.remove(oldTgt)
-                            else:
-                                LOGGER.debug('Problems while drawing edge {} for foreign key {} in diagram {}.\n '
-                                             'Cannot find in new schema a table corresponding to src node '
-                                             'associated to IRI {}'.format(oldFkEdge, fk.name, newDiagram.name,
-                                                                           oldTgt.relationalTable.entity.fullIRI))
-                        if newTgt:
-                            newSrcAnchor = QtCore.QPointF(oldSrc.anchor(oldFkEdge))
-                            newTgtAnchor = QtCore.QPointF(oldTgt.anchor(oldFkEdge))
-                            newFkEdge = ForeignKeyEdge(foreign_key=fk, source=newSrc, target=newTgt,
-                                                       breakpoints=oldFkEdge.breakpoints,
-                                                       diagram=newDiagram)
-                            newDiagram.addItem(newFkEdge)
-                            self.sgnEdgeAdded.emit(newDiagram, newFkEdge)
-                            newFkEdge.source.setAnchor(newFkEdge, newSrcAnchor)
-                            newFkEdge.target.setAnchor(newFkEdge, newTgtAnchor)
-                            newFkEdge.source.addEdge(newFkEdge)
-                            newFkEdge.target.addEdge(newFkEdge)
-                            newFkEdge.updateEdge(visible=True)
-                            LOGGER.debug('Edge {} representing foreign key {} added to diagram {}'
-                                         .format(newFkEdge, fk.name, newDiagram.name))
-                        else:
-                            LOGGER.debug('Problems while drawing edge {} for foreign key {} in diagram {}.'
-                                         .format(oldFkEdge, fk.name, newDiagram.name))
-                    if fk in remSchemaFKs:
-                        remSchemaFKs.remove(fk)
-
-        LOGGER.debug('After processing of FKs {} nodes of old diagram {} have not been copied to new diagram {} '
-                     .format(len(remOldNodes), oldDiagram.name, newDiagram.name))
-        LOGGER.debug('After processing of FKs {} fks of new schema have not been drawn into new diagram {} '
-                     .format(len(remSchemaFKs), oldDiagram.name, newDiagram.name))
-        LOGGER.debug('After processing of FKs {} tables of new schema have not been drawn into new diagram {} '
-                     .format(len(remSchemaTables), oldDiagram.name, newDiagram.name))
-
-        for remOldNode in remOldNodes:
-            newNodeRelTable = self.schema.getTableByEntityIRI(remOldNode.relationalTable)
-            if newNodeRelTable:
-                relNode = TableNode(remOldNode.width(), remOldNode.height(),
-                                    remaining_characters=newNodeRelTable.name,
-                                    relational_table=newNodeRelTable, diagram=newDiagram)
-                relNode.setPos(remOldNode.pos())
-                relNode.setText(newNodeRelTable.name)
-                newDiagram.addItem(relNode)
-                self.sgnNodeAdded.emit(newDiagram, relNode)
-                if len(newNodeRelTable.actions) > 0:
-                    self.sgnActionNodeAdded.emit(newDiagram, relNode)
-                remSchemaTables.remove(newNodeRelTable)
-                LOGGER.debug('Node {} (corresponding to table {}) added to diagram {} by direct old node inspection '
-                             .format(remOldNode, newNodeRelTable.name, newDiagram.name))
+        for oldNode, newNodeRelTable in nodeToTable.items():
+            newNode = TableNode(oldNode.width(), oldNode.height(),
+                                remaining_characters=newNodeRelTable.name,
+                                relational_table=newNodeRelTable, diagram=newDiagram)
+            newNode.setPos(oldNode.pos())
+            newNode.setText(newNodeRelTable.name)
+            items.append(newNode)
+            oldNodeToNew[oldNode] = newNode
+
+        for oldFkEdge, fk in edgeToForeignKey.items():
+            oldSrc = oldFkEdge.source
+            oldTgt = oldFkEdge.target
+            newSrc = oldNodeToNew.get(oldSrc)
+            newTgt = oldNodeToNew.get(oldTgt)
+            if newSrc and newTgt:
+                newSrcAnchor = QtCore.QPointF(oldSrc.anchor(oldFkEdge))
+                newTgtAnchor = QtCore.QPointF(oldTgt.anchor(oldFkEdge))
+                newFkEdge = ForeignKeyEdge(foreign_key=fk, source=newSrc, target=newTgt,
+                                           breakpoints=oldFkEdge.breakpoints,
+                                           diagram=newDiagram)
+                newFkEdge.source.setAnchor(newFkEdge, newSrcAnchor)
+                newFkEdge.target.setAnchor(newFkEdge, newTgtAnchor)
+                newFkEdge.source.addEdge(newFkEdge)
+                newFkEdge.target.addEdge(newFkEdge)
+                items.append(newFkEdge)
+                LOGGER.debug('Edge {} representing foreign key {} added to diagram {}'
+                             .format(newFkEdge, fk.name, newDiagram.name))
             else:
-                LOGGER.debug('Copy of node {} (corresponding to table {}) to diagram {} by direct '
-                             'old node inspection was not possible'
-                             .format(remOldNode, remOldNode.relationalTable.name, newDiagram.name))
-
+                LOGGER.debug('Problems while drawing edge {} for foreign key {} in diagram {}.\n '
+                             'Cannot find in new schema the tables corresponding to its endpoints'
+                             .format(oldFkEdge, fk.name, newDiagram.name))
+        newDiagram.addItems(items)
+        self.sgnItemsAdded.emit(newDiagram, items)
+
+        LOGGER.debug('{} nodes of old diagram {} have not been copied to new diagram {} '
+                     .format(len(oldTableNodes) - len(nodeToTable), oldDiagram.name, newDiagram.name))
+        LOGGER.debug('{} fks of new schema have not been drawn into new diagram {} '
+                     .format(len(self.schema.foreignKeys) - len(set(edgeToForeignKey.values())), newDiagram.name))
         return newDiagram
 
     def getNewDiagramName(self, oldDiagram):
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+
+
+import hashlib
+import os
+import pickle
+
+from eddy.core.output import getLogger
+
+LOGGER = getLogger()
+
+
+class SchemaCache:
+    """
+    Content-addressed on-disk cache of the schemas generated by the Blackbird engine.
+    Each entry holds the JSON description returned by the engine together with its parsed form,
+    and is addressed by a digest of the posted ontology and of the merge policies in use.
+    Entries are evicted in least recently used order as soon as the cache exceeds its size bound.
+    """
+    Extension = '.schema'
+    Version = 1
+
+    def __init__(self, path, maxSize):
+        """
+        Initialize the cache.
+        :type path: str
+        :type maxSize: int
+        """
+        self.path = path
+        self.maxSize = maxSize
+        os.makedirs(self.path, exist_ok=True)
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    @classmethod
+    def key(cls, owl, policies):
+        """
+        Returns the key addressing the schema generated from the given ontology under the given merge policies.
+        :type owl: bytes
+        :type policies: dict
+        :rtype: str
+        """
+        digest = hashlib.sha256()
+        digest.update(owl)
+        digest.update('\0{}'.format(cls.Version).encode('utf-8'))
+        for name, value in sorted(policies.items()):
+            digest.update('\0{}={}'.format(name, value).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Returns the (JSON description, parsed schema) pair cached for the given key, or None if there is none.
+        The JSON description is None for schemas that have been parsed incrementally.
+        :type key: str
+        :rtype: tuple
+        """
+        path = self.pathOf(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            LOGGER.warning('Discarding unreadable schema cache entry {}: {}'.format(key, e))
+            self.remove(key)
+            return None
+
+    def put(self, key, data, schema):
+        """
+        Store the given JSON description and parsed schema under the given key, evicting the least
+        recently used entries if the cache grows beyond its size bound.
+        :type key: str
+        :type data: bytes
+        :type schema: RelationalSchema
+        """
+        path = self.pathOf(key)
+        tmpPath = '{}.tmp'.format(path)
+        try:
+            with open(tmpPath, 'wb') as f:
+                pickle.dump((data, schema), f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmpPath, path)
+        except Exception as e:
+            LOGGER.warning('Could not store schema cache entry {}: {}'.format(key, e))
+            if os.path.exists(tmpPath):
+                os.unlink(tmpPath)
+            return
+        self.evict()
+
+    def remove(self, key):
+        """
+        Remove the entry with the given key, if any.
+        :type key: str
+        """
+        try:
+            os.unlink(self.pathOf(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """
+        Remove all the entries of the cache.
+        """
+        for entry in self.entries():
+            os.unlink(entry.path)
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits its size bound.
+        """
+        entries = sorted(self.entries(), key=lambda entry: entry.stat().st_mtime)
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if size <= self.maxSize:
+                break
+            size -= entry.stat().st_size
+            os.unlink(entry.path)
+            LOGGER.debug('Evicted schema cache entry {}'.format(entry.name))
+
+    def entries(self):
+        """
+        Returns the directory entries of the cached schemas.
+        :rtype: list
+        """
+        with os.scandir(self.path) as it:
+            return [entry for entry in it if entry.is_file() and entry.name.endswith(self.Extension)]
+
+    def pathOf(self, key):
+        """
+        Returns the path of the entry with the given key.
+        :type key: str
+        :rtype: str
+        """
+        return os.path.join(self.path, '{}{}'.format(key, self.Extension))
+
+    def size(self):
+        """
+        Returns the overall size of the cached entries, in bytes.
+        :rtype: int
+        """
+        return sum(entry.stat().st_size for entry in self.entries())
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+
+"""
+Supervisor keeping a Blackbird engine running across Eddy sessions.
+
+The supervisor runs detached from Eddy and only depends on the standard library, so that it can be
+started with any Python interpreter. It launches the engine, advertises it in the daemon file of the
+state directory and stops it once no client has held a lease on it for the idle timeout.
+Clients hold a lease by keeping a file named '<pid>-<name>' in the leases directory, where the name
+tells apart the clients living in the same process: leases of processes that are no longer alive are discarded.
+
+Usage: python daemon.py --state-dir DIR [--idle-timeout SECONDS] -- java [OPTIONS] -jar blackbird.jar
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+DaemonFile = 'blackbird-daemon.json'
+LeasesDir = 'blackbird-daemon.leases'
+LogFile = 'blackbird-daemon.log'
+
+
+#############################################
+#   UTILITIES
+#################################
+
+def isAlive(pid):
+    """
+    Returns True if the process identified by the given PID is alive, False otherwise.
+    :type pid: int
+    :rtype: bool
+    """
+    if sys.platform.startswith('win32'):
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            return False
+        try:
+            exitCode = ctypes.c_ulong()
+            # STILL_ACTIVE
+            return bool(kernel32.GetExitCodeProcess(handle, ctypes.byref(exitCode))) and exitCode.value == 259
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def readDaemonInfo(stateDir):
+    """
+    Returns the description of the daemon advertised in the given state directory, or None if there is none.
+    :type stateDir: str
+    :rtype: dict
+    """
+    try:
+        with open(os.path.join(stateDir, DaemonFile), 'r') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def writeDaemonInfo(stateDir, info):
+    """
+    Atomically advertise the given daemon description in the given state directory.
+    :type stateDir: str
+    :type info: dict
+    """
+    path = os.path.join(stateDir, DaemonFile)
+    with open('{}.{}.tmp'.format(path, os.getpid()), 'w') as file:
+        json.dump(info, file)
+    os.replace(file.name, path)
+
+
+def createDaemonInfo(stateDir):
+    """
+    Claim the daemon file of the given state directory for the current process.
+    Returns False if the file is held by another daemon which is still alive.
+    :type stateDir: str
+    :rtype: bool
+    """
+    path = os.path.join(stateDir, DaemonFile)
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            info = readDaemonInfo(stateDir)
+            if info and isAlive(info['pid']):
+                return False
+            try:
+                # A DAEMON MIGHT BE WRITING THE FILE RIGHT NOW
+                if not info and time.time() - os.path.getmtime(path) < 5:
+                    return False
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        with os.fdopen(fd, 'w') as file:
+            json.dump({'pid': os.getpid()}, file)
+        return True
+    return False
+
+
+def removeDaemonInfo(stateDir):
+    """
+    Remove the daemon file of the given state directory, if held by the current process.
+    :type stateDir: str
+    """
+    info = readDaemonInfo(stateDir)
+    if info and info.get('pid') == os.getpid():
+        try:
+            os.remove(os.path.join(stateDir, DaemonFile))
+        except OSError:
+            pass
+
+
+def acquireLease(stateDir, name):
+    """
+    Acquire the lease with the given name on the daemon of the given state directory on behalf of the current process.
+    :type stateDir: str
+    :type name: str
+    """
+    leasesDir = os.path.join(stateDir, LeasesDir)
+    os.makedirs(leasesDir, exist_ok=True)
+    with open(os.path.join(leasesDir, '{}-{}'.format(os.getpid(), name)), 'w') as file:
+        file.write('{:d}'.format(os.getpid()))
+
+
+def releaseLease(stateDir, name):
+    """
+    Release the lease with the given name held on the daemon of the given state directory by the current process.
+    :type stateDir: str
+    :type name: str
+    """
+    try:
+        os.remove(os.path.join(stateDir, LeasesDir, '{}-{}'.format(os.getpid(), name)))
+    except OSError:
+        pass
+
+
+def liveLeases(stateDir):
+    """
+    Returns the number of leases held on the daemon of the given state directory by clients which are alive,
+    discarding the leases of the ones which are not.
+    :type stateDir: str
+    :rtype: int
+    """
+    leasesDir = os.path.join(stateDir, LeasesDir)
+    count = 0
+    for name in os.listdir(leasesDir) if os.path.isdir(leasesDir) else ():
+        try:
+            pid = int(name.split('-', 1)[0])
+        except ValueError:
+            pid = None
+        if pid and isAlive(pid):
+            count += 1
+        else:
+            try:
+                os.remove(os.path.join(leasesDir, name))
+            except OSError:
+                pass
+    return count
+
+
+#############################################
+#   SUPERVISOR
+#################################
+
+def main(argv=None):
+    """
+    Run the engine command line given after '--', until it exits or it is left idle for the idle timeout.
+    :type argv: list
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description='Keep a Blackbird engine running across Eddy sessions.')
+    parser.add_argument('--state-dir', required=True)
+    parser.add_argument('--idle-timeout', type=float, default=600)
+    parser.add_argument('--poll', type=float, default=2)
+    parser.add_argument('command', nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+    command = args.command[1:] if args.command[:1] == ['--'] else args.command
+    if not command:
+        parser.error('missing engine command line')
+    os.makedirs(os.path.join(args.state_dir, LeasesDir), exist_ok=True)
+    if not createDaemonInfo(args.state_dir):
+        # ANOTHER DAEMON IS ALREADY SERVING THE CLIENTS
+        return 0
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    signal.signal(signal.SIGINT, lambda *_: stopping.append(True))
+    try:
+        with open(os.path.join(args.state_dir, LogFile), 'wb') as log:
+            engine = subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+        writeDaemonInfo(args.state_dir, {'pid': os.getpid(), 'enginePid': engine.pid, 'started': time.time()})
+        idleSince = None
+        while not stopping and engine.poll() is None:
+            if liveLeases(args.state_dir):
+                idleSince = None
+            elif idleSince is None:
+                idleSince = time.monotonic()
+            elif time.monotonic() - idleSince >= args.idle_timeout:
+                break
+            time.sleep(args.poll)
+        if engine.poll() is None:
+            engine.terminate()
+            try:
+                engine.wait(10)
+            except subprocess.TimeoutExpired:
+                engine.kill()
+                engine.wait()
+        return engine.returncode
+    finally:
+        removeDaemonInfo(args.state_dir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -404,6 +404,28 @@ class BlackBirdDiagram(Diagram):
             item.updateNode()
         self.sgnItemAdded.emit(self, item)
 
+    def addItems(self, items):
+        """
+        Add a batch of items to the Diagram.
+        Scene indexing and the per-item sgnItemAdded signal are suspended during the insertion, and the
+        geometry of the edges is computed once all the nodes are in place. Listeners are notified by the
+        plugin through its sgnItemsAdded signal.
+        :type items: list
+        """
+        indexMethod = self.itemIndexMethod()
+        self.setItemIndexMethod(BlackBirdDiagram.NoIndex)
+        try:
+            for item in items:
+                super(Diagram, self).addItem(item)
+                if item.isNode():
+                    item.updateNode()
+            for item in items:
+                if item.isEdge():
+                    item.updateEdge(visible=True)
+                self.project.doAddItem(self, item)
+        finally:
+            self.setItemIndexMethod(indexMethod)
+
     @staticmethod
     def completeMove(moveData, offset=QtCore.QPointF(0, 0)):
         """
@@ -491,6 +513,30 @@ class BlackBirdDiagram(Diagram):
             items = super().items(mixed, mode, **kwargs)
         return items
 
+    @staticmethod
+    def matchItems(schema, nodes, edges):
+        """
+        Match the items of a diagram drawn for a previous version of the schema to the given version:
+        nodes are matched through the IRI of the entity originating their table, edges through the
+        name of their foreign key. Items without a counterpart in the schema are left out.
+        :type schema: RelationalSchema
+        :type nodes: T <= list|tuple|set
+        :type edges: T <= list|tuple|set
+        :rtype: tuple
+        """
+        nodeToTable = {}
+        for node in nodes:
+            table = schema.getTableByEntityIRI(node.relationalTable.entity.fullIRI)
+            if table:
+                nodeToTable[node] = table
+        foreignKeyByName = {fk.name: fk for fk in schema.foreignKeys}
+        edgeToForeignKey = {}
+        for edge in edges:
+            fk = foreignKeyByName.get(edge.foreignKey.name)
+            if fk:
+                edgeToForeignKey[edge] = fk
+        return nodeToTable, edgeToForeignKey
+
     def nodes(self):
         """
         Returns a collection with all the nodes in the diagram.
@@ -506,6 +552,102 @@ class BlackBirdDiagram(Diagram):
         """
         return self.project.node(self, nid)
 
+    def patch(self, schema, diff):
+        """
+        Update the diagram in place to the given version of the schema.
+        Nodes and edges whose table or foreign key is still in the schema are retargeted (and renamed),
+        the others are removed, and the foreign keys added by the diff are drawn between the nodes already
+        in the diagram. All the other items are left untouched.
+        Returns the edges drawn for the added foreign keys.
+        :type schema: RelationalSchema
+        :type diff: RelationalSchemaDiff
+        :rtype: list
+        """
+        renamedTables = {oldTable.name: newTable for oldTable, newTable in diff.renamedTables}
+        edges = list(self.edges())
+        tableToNodes = {}
+        for node in list(self.nodes()):
+            oldTable = node.relationalTable
+            table = renamedTables.get(oldTable.name) or schema.getTableByName(oldTable.name)
+            if not table and oldTable.entity:
+                table = schema.getTableByEntityIRI(oldTable.entity.fullIRI)
+            if table:
+                node.relationalTable = table
+                if node.text() != table.name:
+                    node.setText(table.name)
+                tableToNodes.setdefault(table.name, []).append(node)
+            else:
+                for edge in list(node.edges):
+                    self.removeEdge(edge)
+                self.removeItem(node)
+                self.project.doRemoveItem(self, node)
+
+        foreignKeys = {fk.name: fk for fk in schema.foreignKeys}
+        drawnForeignKeys = set()
+        for edge in edges:
+            if edge.scene() is not self:
+                continue
+            fk = foreignKeys.get(edge.foreignKey.name)
+            src = fk and self.nodeForTable(tableToNodes, fk.srcTable, edge.source)
+            tgt = fk and self.nodeForTable(tableToNodes, fk.tgtTable, edge.target)
+            if not (src and tgt):
+                self.removeEdge(edge)
+                continue
+            # RETARGET EDGES WHOSE ENDPOINT TABLE HAS BEEN MERGED INTO ANOTHER ONE
+            changed = fk != edge.foreignKey
+            if src is not edge.source:
+                edge.source.removeEdge(edge)
+                edge.source = src
+                src.addEdge(edge)
+                changed = True
+            if tgt is not edge.target:
+                edge.target.removeEdge(edge)
+                edge.target = tgt
+                tgt.addEdge(edge)
+                changed = True
+            edge.foreignKey = fk
+            # REDRAW ONLY THE EDGES WHOSE ENDPOINTS OR FOREIGN KEY CHANGED
+            if changed:
+                edge.updateEdge()
+            drawnForeignKeys.add(fk.name)
+
+        addedEdges = []
+        for fk in diff.addedForeignKeys:
+            src = first(tableToNodes.get(fk.srcTable, ()))
+            tgt = first(tableToNodes.get(fk.tgtTable, ()))
+            if fk.name not in drawnForeignKeys and src and tgt:
+                edge = ForeignKeyEdge(foreign_key=fk, source=src, target=tgt, diagram=self)
+                src.addEdge(edge)
+                tgt.addEdge(edge)
+                addedEdges.append(edge)
+                drawnForeignKeys.add(fk.name)
+        if addedEdges:
+            self.addItems(addedEdges)
+        self.schema = schema
+        return addedEdges
+
+    def removeEdge(self, edge):
+        """
+        Detach the given edge from its endpoints and remove it from the diagram.
+        :type edge: ForeignKeyEdge
+        """
+        edge.source.removeEdge(edge)
+        edge.target.removeEdge(edge)
+        self.removeItem(edge)
+        self.project.doRemoveItem(self, edge)
+
+    @staticmethod
+    def nodeForTable(tableToNodes, tableName, node):
+        """
+        Returns the given node if it represents the given table, otherwise any node representing it.
+        :type tableToNodes: dict
+        :type tableName: str
+        :type node: TableNode
+        :rtype: TableNode
+        """
+        nodes = tableToNodes.get(tableName, ())
+        return node if node in nodes else first(nodes)
+
     def selectedEdges(self, filter_on_edges=lambda x: True):
         """
         Returns the edges selected in the diagram.
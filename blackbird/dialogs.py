@@ -23,7 +23,6 @@
 ##########################################################################
 
 
-import io
 import os
 
 from PyQt5 import (
@@ -39,19 +38,32 @@ from eddy.core.functions.misc import first
 from eddy.core.functions.path import openPath
 from eddy.core.functions.signals import connect
 
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.logbuffer import LogBuffer
+
 
 class BlackbirdLogDialog(QtWidgets.QDialog):
     """
     Extends QtWidgets.QDialog providing a view for the Blackbird translator log.
+    The log is shown one page of lines at a time: the dialog follows the tail of the log,
+    and older lines are only read from the log buffer when paging back through it.
     """
+    PageSize = 1000
+    RefreshInterval = 1000
 
-    def __init__(self, stream=io.StringIO(), parent=None):
+    def __init__(self, stream=None, parent=None):
         """
         Initialize the dialog.
+        :type stream: LogBuffer
         :type parent: QWidget
         """
         super().__init__(parent)
 
+        self.stream = stream if stream is not None else LogBuffer()
+        # THE START OF THE PAGE BEING SHOWN, OR NONE WHEN FOLLOWING THE TAIL OF THE LOG
+        self.pageStart = None
+        self.shownPage = None
+
         #############################################
         # MESSAGE AREA
         #################################
@@ -63,9 +75,27 @@ class BlackbirdLogDialog(QtWidgets.QDialog):
         self.messageArea.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
         self.messageArea.setMinimumSize(800, 500)
         self.highlighter = LogHighlighter(self.messageArea.document())
-        self.messageArea.setPlainText(stream.getvalue())
         self.messageArea.setReadOnly(True)
 
+        #############################################
+        # NAVIGATION AREA
+        #################################
+
+        self.positionLabel = QtWidgets.QLabel(self)
+        self.positionLabel.setFont(Font('Roboto', 12))
+        self.firstButton = QtWidgets.QPushButton('First', self)
+        self.previousButton = QtWidgets.QPushButton('Previous', self)
+        self.nextButton = QtWidgets.QPushButton('Next', self)
+        self.lastButton = QtWidgets.QPushButton('Last', self)
+
+        self.navigationLayout = QtWidgets.QHBoxLayout()
+        self.navigationLayout.setContentsMargins(10, 0, 0, 0)
+        self.navigationLayout.addWidget(self.positionLabel, 1)
+        self.navigationLayout.addWidget(self.firstButton)
+        self.navigationLayout.addWidget(self.previousButton)
+        self.navigationLayout.addWidget(self.nextButton)
+        self.navigationLayout.addWidget(self.lastButton)
+
         #############################################
         # CONFIRMATION AREA
         #################################
@@ -81,13 +111,106 @@ class BlackbirdLogDialog(QtWidgets.QDialog):
         self.mainLayout = QtWidgets.QVBoxLayout(self)
         self.mainLayout.setContentsMargins(10, 10, 10, 10)
         self.mainLayout.addWidget(self.messageArea)
+        self.mainLayout.addLayout(self.navigationLayout)
         self.mainLayout.addWidget(self.confirmationBox, 0, QtCore.Qt.AlignRight)
 
+        self.refreshTimer = QtCore.QTimer(self)
+        self.refreshTimer.setInterval(self.RefreshInterval)
+
         connect(self.confirmationBox.accepted, self.accept)
+        connect(self.firstButton.clicked, self.doShowFirstPage)
+        connect(self.previousButton.clicked, self.doShowPreviousPage)
+        connect(self.nextButton.clicked, self.doShowNextPage)
+        connect(self.lastButton.clicked, self.doShowLastPage)
+        connect(self.refreshTimer.timeout, self.doRefresh)
 
         self.setWindowIcon(QtGui.QIcon(':/blackbird/icons/128/ic_blackbird'))
         self.setWindowTitle('Blackbird Log')
 
+        self.doRefresh()
+        self.refreshTimer.start()
+
+    #############################################
+    #   SLOTS
+    #################################
+
+    @QtCore.pyqtSlot()
+    def doRefresh(self):
+        """
+        Refresh the page being shown with the lines written to the log in the meantime.
+        """
+        self.showPage(self.pageStart)
+
+    @QtCore.pyqtSlot()
+    def doShowFirstPage(self):
+        """
+        Show the page with the oldest lines retained in the log.
+        """
+        self.showPage(self.stream.firstLine())
+
+    @QtCore.pyqtSlot()
+    def doShowLastPage(self):
+        """
+        Show the last lines of the log, following its tail.
+        """
+        self.showPage(None)
+
+    @QtCore.pyqtSlot()
+    def doShowNextPage(self):
+        """
+        Show the page following the one being shown.
+        """
+        if self.shownPage:
+            self.showPage(self.shownPage[0] + self.PageSize)
+
+    @QtCore.pyqtSlot()
+    def doShowPreviousPage(self):
+        """
+        Show the page preceding the one being shown.
+        """
+        if self.shownPage:
+            self.showPage(max(self.shownPage[0] - self.PageSize, self.stream.firstLine()))
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    def showPage(self, start):
+        """
+        Show the page of the log starting from the line with the given index,
+        or the last page of the log, following its tail, if start is None.
+        :type start: int
+        """
+        self.stream.sync()
+        count = self.stream.lineCount()
+        firstLine = self.stream.firstLine()
+        if start is not None:
+            start = max(start, firstLine)
+            if start + self.PageSize >= count:
+                # THE LAST PAGE FOLLOWS THE TAIL OF THE LOG
+                start = None
+        self.pageStart = start
+        pageStart = start if start is not None else max(count - self.PageSize, firstLine)
+        # A PAGE IN THE MIDDLE OF THE LOG ONLY CHANGES WHEN ITS LINES ARE DISCARDED,
+        # WHILE THE TAIL ALSO CHANGES WHEN THE LINES NOT TERMINATED YET GROW
+        tail = (count, sum(len(line) for line in self.stream.pending())) if start is None else None
+        page = (pageStart, tail)
+        if page != self.shownPage:
+            lines = self.stream.readLines(pageStart, self.PageSize)
+            scrollbar = self.messageArea.verticalScrollBar()
+            following = start is None and (not self.shownPage or scrollbar.value() == scrollbar.maximum())
+            position = scrollbar.value() if self.shownPage and self.shownPage[0] == pageStart else 0
+            self.messageArea.setPlainText('\n'.join(lines))
+            scrollbar.setValue(scrollbar.maximum() if following else position)
+            self.shownPage = page
+            self.positionLabel.setText('Lines {}-{} of {}{}'.format(
+                pageStart + 1 if lines else pageStart, pageStart + len(lines), count,
+                ' ({} older lines discarded)'.format(firstLine) if firstLine else ''))
+        self.firstButton.setEnabled(pageStart > firstLine)
+        self.previousButton.setEnabled(pageStart > firstLine)
+        self.nextButton.setEnabled(start is not None)
+        self.lastButton.setEnabled(start is not None)
+
 
 class LogHighlighter(QtGui.QSyntaxHighlighter):
     """
@@ -23,6 +23,8 @@
 ##########################################################################
 
 
+from concurrent.futures import ThreadPoolExecutor
+
 from PyQt5 import QtCore
 
 from eddy.core.datatypes.graphol import Item
@@ -119,16 +121,373 @@ class ForeignKeyVisualElements:
         return 'VE(src:{}; edges:{}; inners:{}; tgt:{})'.format(self.src.id, edgesStr, innersStr, self.tgt.id)
 
 
+class DiagramSnapshot:
+    """
+    Immutable snapshot of the nodes and edges of a diagram.
+    It holds plain data only, so that the diagram can be mapped in a worker thread while
+    the GUI thread keeps editing it. Nodes and edges are identified by their position in the
+    sequences the snapshot has been taken from, and edges are indexed by node and edge type.
+    """
+    __slots__ = ('nodeTypes', 'nodeTexts', 'edgeTypes', 'edgeSources', 'edgeTargets', '_adjacency')
+
+    def __init__(self, nodes, edges):
+        """
+        Initialize the snapshot.
+        :type nodes: list
+        :type edges: list
+        """
+        position = {node: i for i, node in enumerate(nodes)}
+        self.nodeTypes = tuple(node.type() for node in nodes)
+        self.nodeTexts = tuple(node.text().replace('\n', '') if node.type() in ForeignKeyPatternMatcher.Entity
+                               else None for node in nodes)
+        self.edgeTypes = tuple(edge.type() for edge in edges)
+        self.edgeSources = tuple(position[edge.source] for edge in edges)
+        self.edgeTargets = tuple(position[edge.target] for edge in edges)
+        self._adjacency = {}
+        for edge, edgeType in enumerate(self.edgeTypes):
+            for node in {self.edgeSources[edge], self.edgeTargets[edge]}:
+                self._adjacency.setdefault((node, edgeType), []).append(edge)
+
+    def edgesOf(self, node, edgeType):
+        """
+        Returns the edges of the given type attached to the given node, in diagram order.
+        :type node: int
+        :type edgeType: Item
+        :rtype: list
+        """
+        return self._adjacency.get((node, edgeType), ())
+
+    def nodeIndex(self):
+        """
+        Returns a dictionary mapping each (item type, short IRI) pair to the
+        list of predicate nodes of that type in the snapshot.
+        :rtype: dict
+        """
+        index = {}
+        for node, (nodeType, text) in enumerate(zip(self.nodeTypes, self.nodeTexts)):
+            if text is not None:
+                index.setdefault((nodeType, text), []).append(node)
+        return index
+
+
+def mapDiagramSnapshot(snapshot, tables, foreignKeys):
+    """
+    Maps tables and foreign keys to the elements of the given diagram snapshot.
+    Tables are given as (item type, short IRI) pairs, and foreign keys as (source table
+    position, target table position, pattern name) triples. Returns a pair of dictionaries,
+    respectively mapping the position of each mapped table to the positions of its nodes,
+    and the position of each mapped foreign key to its visual elements, given as
+    (src, tgt, edges, inners, invertBreakpoints) tuples of positions.
+    :type snapshot: DiagramSnapshot
+    :type tables: list
+    :type foreignKeys: list
+    :rtype: tuple
+    """
+    nodeIndex = snapshot.nodeIndex()
+    tableToNodes = {}
+    for table, key in enumerate(tables):
+        nodes = nodeIndex.get(key)
+        if nodes:
+            tableToNodes[table] = nodes
+    nodeToMatches = {}
+    foreignKeyToElements = {}
+    for fk, (srcTable, tgtTable, pattern) in enumerate(foreignKeys):
+        srcNodes = tableToNodes.get(srcTable)
+        tgtNodes = tableToNodes.get(tgtTable)
+        if srcNodes and tgtNodes:
+            elements = []
+            for srcNode in srcNodes:
+                if srcNode not in nodeToMatches:
+                    nodeToMatches[srcNode] = ForeignKeyPatternMatcher.match(srcNode, snapshot)
+                for tgtNode in tgtNodes:
+                    elements.extend(nodeToMatches[srcNode].get((pattern, tgtNode), ()))
+            if elements:
+                foreignKeyToElements[fk] = elements
+    return tableToNodes, foreignKeyToElements
+
+
+class DiagramMapping:
+    """
+    Mapping state retained for a diagram: the items a snapshot has been taken from, and the
+    pattern matches computed so far, so that the mapping can be updated when the schema changes.
+    """
+    def __init__(self, nodes, edges, snapshot):
+        """
+        Initialize the mapping state.
+        :type nodes: list
+        :type edges: list
+        :type snapshot: DiagramSnapshot
+        """
+        self.nodes = nodes
+        self.edges = edges
+        self.snapshot = snapshot
+        self._positions = None
+        self._nodeIndex = None
+        self._matches = {}
+
+    def nodesOf(self, nodeType, shortIRI):
+        """
+        Returns the predicate nodes of the given type and short IRI.
+        :type nodeType: Item
+        :type shortIRI: str
+        :rtype: list
+        """
+        if self._nodeIndex is None:
+            self._nodeIndex = self.snapshot.nodeIndex()
+        return [self.nodes[node] for node in self._nodeIndex.get((nodeType, shortIRI), ())]
+
+    def visualElementsOf(self, pattern, srcNodes, tgtNodes):
+        """
+        Returns the visual elements matching the given pattern between the given nodes.
+        Pattern matches are computed once per source node and reused afterwards.
+        :type pattern: str
+        :type srcNodes: list
+        :type tgtNodes: list
+        :rtype: list
+        """
+        if self._positions is None:
+            self._positions = {node: i for i, node in enumerate(self.nodes)}
+        elements = []
+        for srcNode in srcNodes:
+            src = self._positions[srcNode]
+            if src not in self._matches:
+                self._matches[src] = ForeignKeyPatternMatcher.match(src, self.snapshot)
+            for tgtNode in tgtNodes:
+                elements.extend(self._matches[src].get((pattern, self._positions[tgtNode]), ()))
+        return self.toVisualElements(elements)
+
+    def toVisualElements(self, elements):
+        """
+        Returns the ForeignKeyVisualElements corresponding to the given tuples of positions.
+        :type elements: list
+        :rtype: list
+        """
+        nodes, edges = self.nodes, self.edges
+        return [ForeignKeyVisualElements(nodes[src], nodes[tgt], [edges[edge] for edge in path],
+                                         [nodes[node] for node in inners] or None,
+                                         [edges[edge] for edge in inverted] or None)
+                for src, tgt, path, inners, inverted in elements]
+
+
+class PatternStep:
+    """
+    A single step of a foreign key path pattern: follow an edge of the given
+    type in the given direction and land on a node of one of the given types.
+    """
+    Forward = 'forward'
+    Backward = 'backward'
+    Undirected = 'undirected'
+
+    __slots__ = ('edgeType', 'direction', 'nodeTypes')
+
+    def __init__(self, edgeType, direction, nodeTypes):
+        """
+        Initialize the step.
+        :type edgeType: Item
+        :type direction: str
+        :type nodeTypes: frozenset
+        """
+        self.edgeType = edgeType
+        self.direction = direction
+        self.nodeTypes = nodeTypes
+
+    def follow(self, node, snapshot):
+        """
+        Generate the (edge, node, inverted) triples reached from the given node by this step,
+        where inverted is True if the edge is walked from its target to its source.
+        :type node: int
+        :type snapshot: DiagramSnapshot
+        :rtype: generator
+        """
+        for edge in snapshot.edgesOf(node, self.edgeType):
+            if snapshot.edgeSources[edge] == node and self.direction != PatternStep.Backward:
+                other, inverted = snapshot.edgeTargets[edge], False
+            elif snapshot.edgeTargets[edge] == node and self.direction != PatternStep.Forward:
+                other, inverted = snapshot.edgeSources[edge], True
+            else:
+                continue
+            if snapshot.nodeTypes[other] in self.nodeTypes:
+                yield edge, other, inverted
+
+    def __eq__(self, other):
+        if not isinstance(other, PatternStep):
+            return NotImplemented
+        return (self.edgeType, self.direction, self.nodeTypes) == (other.edgeType, other.direction, other.nodeTypes)
+
+    def __hash__(self):
+        return hash((self.edgeType, self.direction, self.nodeTypes))
+
+
+class ForeignKeyPatternMatcher:
+    """
+    Declarative matcher of the diagram shapes a foreign key can be drawn over.
+    Each pattern is declared as the alternative paths leading from an occurrence of the entity
+    of the source table to an occurrence of the entity of the target table. All the paths are
+    merged into a single prefix tree, so that every pattern is matched in one walk from each node.
+    """
+    Entity = frozenset({Item.ConceptNode, Item.RoleNode, Item.AttributeNode})
+    Union = frozenset({Item.UnionNode, Item.DisjointUnionNode})
+    Domain = frozenset({Item.DomainRestrictionNode})
+    Range = frozenset({Item.RangeRestrictionNode})
+
+    # A-->B, R-->P, U1-->U2
+    EntityIsaEntity = 'EntityIsaEntity'
+    # A-->exist(R) , A-->exist(U)
+    ClassIsaExistRoleOrAttribute = 'ClassIsaExistRoleOrAttribute'
+    # A-->exist(inv(R))
+    ClassIsaExistRoleInv = 'ClassIsaExistRoleInv'
+    # exist(R)-->A , exist(U)-->A
+    ExistRoleOrAttributeIsaClass = 'ExistRoleOrAttributeIsaClass'
+    # exist(inv(R))-->A
+    ExistRoleInvIsaClass = 'ExistRoleInvIsaClass'
+    # exist(R)-->exist(P), exist(R)-->exist(U), exist(U)-->exist(R), exist(U1)-->exist(U2)
+    ExistRoleOrAttributeIsaExistRoleOrAttribute = 'ExistRoleOrAttributeIsaExistRoleOrAttribute'
+    # exist(R)-->exist(inv(P)), exist(U)-->exist(inv(P))
+    ExistRoleOrAttributeIsaExistRoleInv = 'ExistRoleOrAttributeIsaExistRoleInv'
+    # exist(inv(R))-->exist(P), exist(inv(R))-->exist(U)
+    ExistRoleInvIsaExistRoleOrAttribute = 'ExistRoleInvIsaExistRoleOrAttribute'
+    # exist(inv(R))-->exist(inv(P))
+    ExistRoleInvIsaExistRoleInv = 'ExistRoleInvIsaExistRoleInv'
+
+    _tree = None
+
+    @staticmethod
+    def isa(nodeTypes):
+        """Step along an inclusion edge, from its source to its target."""
+        return PatternStep(Item.InclusionEdge, PatternStep.Forward, nodeTypes)
+
+    @staticmethod
+    def equivalent(nodeTypes):
+        """Step along an equivalence edge, in either direction."""
+        return PatternStep(Item.EquivalenceEdge, PatternStep.Undirected, nodeTypes)
+
+    @staticmethod
+    def inputOf(nodeTypes):
+        """Step along an input edge, from the operand to the operator node."""
+        return PatternStep(Item.InputEdge, PatternStep.Forward, nodeTypes)
+
+    @staticmethod
+    def inputFrom(nodeTypes):
+        """Step along an input edge, from the operator node to the operand."""
+        return PatternStep(Item.InputEdge, PatternStep.Backward, nodeTypes)
+
+    @classmethod
+    def patterns(cls):
+        """
+        Returns the declared patterns, as a dictionary mapping each pattern name to its paths.
+        :rtype: dict
+        """
+        isa, equivalent, inputOf, inputFrom = cls.isa, cls.equivalent, cls.inputOf, cls.inputFrom
+
+        def classIsaExist(restriction):
+            return [
+                [isa(restriction), inputFrom(cls.Entity)],
+                [equivalent(restriction), inputFrom(cls.Entity)],
+                [isa(cls.Union), inputFrom(restriction), inputFrom(cls.Entity)],
+                [equivalent(cls.Union), inputFrom(restriction), inputFrom(cls.Entity)],
+            ]
+
+        def existIsaClass(restriction):
+            return [
+                [inputOf(restriction), isa(cls.Entity)],
+                [inputOf(restriction), equivalent(cls.Entity)],
+                [inputOf(restriction), isa(cls.Union), inputFrom(cls.Entity)],
+                [inputOf(restriction), equivalent(cls.Union), inputFrom(cls.Entity)],
+                [inputOf(restriction), inputOf(cls.Union), isa(cls.Entity)],
+                [inputOf(restriction), inputOf(cls.Union), equivalent(cls.Entity)],
+            ]
+
+        def existIsaExist(srcRestriction, tgtRestriction):
+            return [
+                [inputOf(srcRestriction), isa(tgtRestriction), inputFrom(cls.Entity)],
+                [inputOf(srcRestriction), equivalent(tgtRestriction), inputFrom(cls.Entity)],
+            ]
+
+        return {
+            cls.EntityIsaEntity: [
+                [isa(cls.Entity)],
+                [equivalent(cls.Entity)],
+                [inputOf(cls.Union), isa(cls.Entity)],
+                [inputOf(cls.Union), equivalent(cls.Entity)],
+            ],
+            cls.ClassIsaExistRoleOrAttribute: classIsaExist(cls.Domain),
+            cls.ClassIsaExistRoleInv: classIsaExist(cls.Range),
+            cls.ExistRoleOrAttributeIsaClass: existIsaClass(cls.Domain),
+            cls.ExistRoleInvIsaClass: existIsaClass(cls.Range),
+            cls.ExistRoleOrAttributeIsaExistRoleOrAttribute: existIsaExist(cls.Domain, cls.Domain),
+            cls.ExistRoleOrAttributeIsaExistRoleInv: existIsaExist(cls.Domain, cls.Range),
+            cls.ExistRoleInvIsaExistRoleOrAttribute: existIsaExist(cls.Range, cls.Domain),
+            cls.ExistRoleInvIsaExistRoleInv: existIsaExist(cls.Range, cls.Range),
+        }
+
+    @classmethod
+    def tree(cls):
+        """
+        Returns the prefix tree of all the declared paths. Each tree node maps a
+        step to a pair (subtree, names of the patterns whose paths end with that step).
+        :rtype: dict
+        """
+        if cls._tree is None:
+            tree = {}
+            for name, paths in cls.patterns().items():
+                for path in paths:
+                    subtree = tree
+                    for i, step in enumerate(path):
+                        children, names = subtree.setdefault(step, ({}, []))
+                        if i == len(path) - 1:
+                            names.append(name)
+                        subtree = children
+            cls._tree = tree
+        return cls._tree
+
+    @classmethod
+    def match(cls, node, snapshot):
+        """
+        Matches all the declared patterns starting from the given node, returning a dictionary
+        mapping each (pattern name, reached node) pair to the list of paths connecting the given
+        node to the reached one, as (src, tgt, edges, inners, invertBreakpoints) tuples.
+        :type node: int
+        :type snapshot: DiagramSnapshot
+        :rtype: dict
+        """
+        result = {}
+        cls._walk(cls.tree(), node, node, (), (), (), snapshot, result)
+        return result
+
+    @classmethod
+    def _walk(cls, tree, src, node, edges, inners, inverted, snapshot, result):
+        for step, (children, names) in tree.items():
+            for edge, other, isInverted in step.follow(node, snapshot):
+                currEdges = edges + (edge,)
+                currInverted = inverted + (edge,) if isInverted else inverted
+                for name in names:
+                    result.setdefault((name, other), []).append((src, other, currEdges, inners, currInverted))
+                if children:
+                    cls._walk(children, src, other, currEdges, inners + (other,), currInverted, snapshot, result)
+
+
 class BlackbirdOntologyEntityManager(QtCore.QObject):
     """
     Initialize the manager.
 
     :type relational_schema: RelationalSchema
     :type session: Session
+    :type diagrams: list
+    :type workers: int
     """
+    sgnReady = QtCore.pyqtSignal()
+    sgnDiagramMapped = QtCore.pyqtSignal(object)
+
+    WorkerName = 'BlackbirdMapping'
+
+    EntityTypeToItem = {
+        EntityType.Class: Item.ConceptNode,
+        EntityType.ObjectProperty: Item.RoleNode,
+        EntityType.DataProperty: Item.AttributeNode,
+    }
 
     # noinspection PyArgumentList
-    def __init__(self, relational_schema, session, diagrams, **kwargs):
+    def __init__(self, relational_schema, session, diagrams, workers=0, **kwargs):
         super().__init__(session, **kwargs)
         self._session = session
         self._eddyProject = self._session.project
@@ -139,11 +498,25 @@ class BlackbirdOntologyEntityManager(QtCore.QObject):
         self._relationalSchema = relational_schema
         self._tables = relational_schema.tables
         self._foreignKeys = relational_schema.foreignKeys
+        self._mappedTables = []
+        self._mappedForeignKeys = []
+        self._workers = workers
+        self._diagramToMapping = {}
+        self._pending = {}
+        self._ready = False
 
         self._diagramToTables = {}
         self._diagramToForeignKeys = {}
+        self.sgnDiagramMapped.connect(self.onDiagramMapped, QtCore.Qt.QueuedConnection)
         self.buildDictionaries()
 
+    def isReady(self):
+        """
+        Returns True if all the diagrams have been mapped, False otherwise.
+        :rtype: bool
+        """
+        return self._ready
+
     @property
     def diagramToTables(self):
         return self._diagramToTables
@@ -171,719 +544,219 @@ class BlackbirdOntologyEntityManager(QtCore.QObject):
         return res
 
     def buildDictionaries(self):
+        """
+        Map the schema tables and foreign keys to the visual elements of each diagram.
+        If worker threads are enabled, diagrams are mapped concurrently from immutable
+        snapshots without blocking the caller, and sgnReady is emitted once all of them
+        have been merged into the dictionaries.
+        """
         LOGGER.info('########## Starting mapping schema objects to diagrams\' visual elements ##########')
-        for ontDiagram in self._ontologyDiagrams:
-            LOGGER.info('\n##### DIAGRAM {} #####'.format(ontDiagram.name))
+        self._mappedTables = list(self._tables)
+        tablePositions = {table: i for i, table in enumerate(self._mappedTables)}
+        tables = [(self.EntityTypeToItem.get(table.entity.entityType), table.entity.shortIRI)
+                  for table in self._mappedTables]
+        foreignKeys = []
+        self._mappedForeignKeys = []
+        for fk in self._foreignKeys:
+            srcTable = self._relationalSchema.getTableByName(fk.srcTable)
+            tgtTable = self._relationalSchema.getTableByName(fk.tgtTable)
+            pattern = self.getForeignKeyPattern(fk, srcTable, tgtTable) if srcTable and tgtTable else None
+            if pattern:
+                foreignKeys.append((tablePositions[srcTable], tablePositions[tgtTable], pattern))
+                self._mappedForeignKeys.append(fk)
+            else:
+                LOGGER.debug('FK {} skipped as it does not match any diagram pattern'.format(fk.name))
+
+        if self._workers > 0 and len(self._ontologyDiagrams) > 1:
+            self.buildDictionariesInWorkers(tables, foreignKeys)
+        else:
+            for ontDiagram in self._ontologyDiagrams:
+                nodes, edges = list(ontDiagram.nodes()), list(ontDiagram.edges())
+                diagramMapping = DiagramMapping(nodes, edges, DiagramSnapshot(nodes, edges))
+                self.mergeMapping(ontDiagram, diagramMapping,
+                                  mapDiagramSnapshot(diagramMapping.snapshot, tables, foreignKeys))
+            self._ready = True
+
+    def buildDictionariesInWorkers(self, tables, foreignKeys):
+        """
+        Map a snapshot of each diagram in a pool of worker threads, so that the GUI thread is not blocked.
+        Worker processes are not an option: plugin modules are only importable once the plugin manager
+        registered them, which never happens in a freshly spawned interpreter.
+        :type tables: list
+        :type foreignKeys: list
+        """
+        executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix=self.WorkerName)
+        try:
+            for ontDiagram in self._ontologyDiagrams:
+                nodes, edges = list(ontDiagram.nodes()), list(ontDiagram.edges())
+                diagramMapping = DiagramMapping(nodes, edges, DiagramSnapshot(nodes, edges))
+                future = executor.submit(mapDiagramSnapshot, diagramMapping.snapshot, tables, foreignKeys)
+                self._pending[future] = (ontDiagram, diagramMapping, tables, foreignKeys)
+                # CALLBACKS RUN IN THE EXECUTOR THREAD: THE QUEUED SIGNAL BRINGS THEM BACK TO THE GUI THREAD
+                future.add_done_callback(self.sgnDiagramMapped.emit)
+        finally:
+            executor.shutdown(wait=False)
+
+    @QtCore.pyqtSlot(object)
+    def onDiagramMapped(self, future):
+        """
+        Executed when a worker thread completes mapping a diagram snapshot.
+        :type future: Future
+        """
+        ontDiagram, diagramMapping, tables, foreignKeys = self._pending.pop(future)
+        try:
+            mapping = future.result()
+        except Exception as e:
+            LOGGER.error('Could not map diagram {} in a worker thread: mapping it in the GUI thread'
+                         .format(ontDiagram.name))
+            LOGGER.exception(e)
+            mapping = mapDiagramSnapshot(diagramMapping.snapshot, tables, foreignKeys)
+        self.mergeMapping(ontDiagram, diagramMapping, mapping)
+        if not self._pending:
+            self._ready = True
+            self.sgnReady.emit()
+
+    def mergeMapping(self, ontDiagram, diagramMapping, mapping):
+        """
+        Merge the mapping computed over a snapshot of the given diagram into the dictionaries,
+        resolving node and edge positions to the diagram items the snapshot has been taken from.
+        :type ontDiagram: Diagram
+        :type diagramMapping: DiagramMapping
+        :type mapping: tuple
+        """
+        self._diagramToMapping[ontDiagram] = diagramMapping
+        tableToNodes, foreignKeyToElements = mapping
+        LOGGER.info('\n##### DIAGRAM {} #####'.format(ontDiagram.name))
+        LOGGER.info('### TABLES ###')
+        currDiagramToTableDict = {}
+        for table, positions in tableToNodes.items():
+            table = self._mappedTables[table]
+            currList = [diagramMapping.nodes[node] for node in positions]
+            currDiagramToTableDict[table] = currList
+            tablesStr = " , ".join(map(str, currList))
+            LOGGER.info('{} --> [{}]'.format(table.name, tablesStr))
+        self._diagramToTables[ontDiagram] = currDiagramToTableDict
+
+        LOGGER.info('### FOREIGN KEYS ###')
+        currDiagramToForeignKeyDict = {}
+        for fk, elements in foreignKeyToElements.items():
+            fk = self._mappedForeignKeys[fk]
+            currVisualEls = diagramMapping.toVisualElements(elements)
+            currDiagramToForeignKeyDict[fk] = [currVisualEls]
+            fksStr = ",".join(map(str, currVisualEls))
+            LOGGER.info('{} --> [{}]'.format(fk.name, fksStr))
+        self._diagramToForeignKeys[ontDiagram] = currDiagramToForeignKeyDict
+
+    def update(self, relational_schema):
+        """
+        Update the dictionaries to a new version of the schema, reusing the mappings computed
+        for the current one. Only the tables and foreign keys that have been added, removed
+        or renamed, or whose tables changed entity, are mapped again over the diagram snapshots.
+        :type relational_schema: RelationalSchema
+        """
+        oldSchema = self._relationalSchema
+        self._relationalSchema = relational_schema
+        self._tables = relational_schema.tables
+        self._foreignKeys = relational_schema.foreignKeys
+
+        # MATCH UNCHANGED TABLES AND FOREIGN KEYS TO THEIR PREVIOUS VERSION
+        tableToOld = {}
+        for table in self._tables:
+            oldTable = oldSchema.getTableByName(table.name)
+            if oldTable and oldTable.entity.fullIRI == table.entity.fullIRI and \
+                    oldTable.entity.entityType == table.entity.entityType:
+                tableToOld[table] = oldTable
+        # FOREIGN KEYS HAVE VALUE IDENTITY: AN UNCHANGED ONE ALSO LOOKS UP ITS PREVIOUS MAPPING
+        oldForeignKeys = set(oldSchema.foreignKeys)
+        reusedForeignKeys = set()
+        fkToPattern = {}
+        for fk in self._foreignKeys:
+            srcTable = relational_schema.getTableByName(fk.srcTable)
+            tgtTable = relational_schema.getTableByName(fk.tgtTable)
+            if fk in oldForeignKeys and srcTable in tableToOld and tgtTable in tableToOld:
+                reusedForeignKeys.add(fk)
+            elif srcTable and tgtTable:
+                fkToPattern[fk] = (srcTable, tgtTable, self.getForeignKeyPattern(fk, srcTable, tgtTable))
+        LOGGER.debug('Updating diagrams mapping: {} tables and {} foreign keys to be mapped again'
+                     .format(len(self._tables) - len(tableToOld), len(fkToPattern)))
+
+        for ontDiagram, diagramMapping in self._diagramToMapping.items():
+            oldDiagramToTableDict = self._diagramToTables[ontDiagram]
             currDiagramToTableDict = {}
-            LOGGER.info('### TABLES ###'.format(ontDiagram.name))
             for table in self._tables:
-                currList = list()
-                tableEntity = table.entity
-                entityIRI = tableEntity.fullIRI
-                entityShortIRI = tableEntity.shortIRI
-                entityType = tableEntity.entityType
-                nodes = ontDiagram.nodes()
-                if entityType == EntityType.Class:
-                    for node in nodes:
-                        if node.Type == Item.ConceptNode:
-                            nodeShortIRI = node.text().replace("\n", "")
-                            if nodeShortIRI == entityShortIRI:
-                                currList.append(node)
-                elif entityType == EntityType.ObjectProperty:
-                    for node in nodes:
-                        if node.Type == Item.RoleNode:
-                            nodeShortIRI = node.text().replace("\n", "")
-                            if nodeShortIRI == entityShortIRI:
-                                currList.append(node)
-                elif entityType == EntityType.DataProperty:
-                    for node in nodes:
-                        if node.Type == Item.AttributeNode:
-                            nodeShortIRI = node.text().replace("\n", "")
-                            if nodeShortIRI == entityShortIRI:
-                                currList.append(node)
-                if len(currList) > 0:
+                if table in tableToOld:
+                    currList = oldDiagramToTableDict.get(tableToOld[table])
+                else:
+                    nodeType = self.EntityTypeToItem.get(table.entity.entityType)
+                    currList = diagramMapping.nodesOf(nodeType, table.entity.shortIRI)
+                if currList:
                     currDiagramToTableDict[table] = currList
-                    tablesStr = " , ".join(map(str, currList))
-                    LOGGER.info('{} --> [{}]'.format(table.name, tablesStr))
             self._diagramToTables[ontDiagram] = currDiagramToTableDict
 
-            LOGGER.info('### FOREIGN KEYS ###'.format(ontDiagram.name))
+            oldDiagramToForeignKeyDict = self._diagramToForeignKeys[ontDiagram]
             currDiagramToForeignKeyDict = {}
             for fk in self._foreignKeys:
-                LOGGER.info('## Mapping fk {}'.format(fk.name))
-                currVisualEls = list()
-                srcTableName = fk.srcTable
-                srcTable = self._relationalSchema.getTableByName(srcTableName)
-                srcEntity = srcTable.entity
-                srcEntityShortIRI = srcEntity.shortIRI
-                srcEntityType = srcEntity.entityType
-
-                srcColumnNames = fk.srcColumns
-
-                tgtTableName = fk.tgtTable
-                tgtTable = self._relationalSchema.getTableByName(tgtTableName)
-                tgtEntity = tgtTable.entity
-                tgtEntityShortIRI = tgtEntity.shortIRI
-                tgtEntityType = tgtEntity.entityType
-
-                tgtColumnNames = fk.tgtColumns
-
-                if srcTable in self._diagramToTables[ontDiagram] and tgtTable in self._diagramToTables[ontDiagram]:
-                    srcOccurrencesInDiagram = self._diagramToTables[ontDiagram][srcTable]
-                    tgtOccurrencesInDiagram = self._diagramToTables[ontDiagram][tgtTable]
-
-                    if srcOccurrencesInDiagram and tgtOccurrencesInDiagram:
-                        if len(srcColumnNames) == 1:
-                            if srcEntityType == EntityType.Class:
-                                if tgtEntityType == EntityType.Class:
-                                    currVisualEls.append(self.getEntityIsaEntityVEs(srcOccurrencesInDiagram,
-                                                                                    tgtOccurrencesInDiagram,
-                                                                                    ontDiagram))
-                                elif tgtEntityType == EntityType.ObjectProperty:
-                                    tgtColumnName = first(tgtColumnNames)
-                                    relColumn = tgtTable.getColumnByName(tgtColumnName)
-                                    relcolPos = relColumn.position
-                                    if relcolPos == 0:
-                                        currVisualEls.append(
-                                            self.getClassIsaExistRoleOrAttributeVEs(srcOccurrencesInDiagram,
-                                                                                    tgtOccurrencesInDiagram,
-                                                                                    ontDiagram))
-                                    elif relcolPos == 1:
-                                        currVisualEls.append(self.getClassIsaExistRoleInvVEs(srcOccurrencesInDiagram,
-                                                                                             tgtOccurrencesInDiagram,
-                                                                                             ontDiagram))
-
-                                elif tgtEntityType == EntityType.DataProperty:
-                                    tgtColumnName = first(tgtColumnNames)
-                                    relColumn = tgtTable.getColumnByName(tgtColumnName)
-                                    relcolPos = relColumn.position
-                                    if relcolPos == 0:
-                                        currVisualEls.append(
-                                            self.getClassIsaExistRoleOrAttributeVEs(srcOccurrencesInDiagram,
-                                                                                    tgtOccurrencesInDiagram,
-                                                                                    ontDiagram))
-                            elif srcEntityType == EntityType.ObjectProperty:
-                                srcColumnName = first(srcColumnNames)
-                                srcRelColumn = srcTable.getColumnByName(srcColumnName)
-                                srcRelcolPos = srcRelColumn.position
-                                if tgtEntityType == EntityType.Class:
-                                    if srcRelcolPos == 0:
-                                        currVisualEls.append(
-                                            self.getExistRoleOrAttributeIsaClassVEs(srcOccurrencesInDiagram,
-                                                                                    tgtOccurrencesInDiagram,
-                                                                                    ontDiagram))
-                                    elif srcRelcolPos == 1:
-                                        currVisualEls.append(self.getExistRoleInvIsaClassVEs(srcOccurrencesInDiagram,
-                                                                                             tgtOccurrencesInDiagram,
-                                                                                             ontDiagram))
-                                elif tgtEntityType == EntityType.ObjectProperty:
-                                    tgtColumnName = first(tgtColumnNames)
-                                    tgtRelColumn = tgtTable.getColumnByName(tgtColumnName)
-                                    tgtRelcolPos = tgtRelColumn.position
-                                    if srcRelcolPos == 0 and tgtRelcolPos == 0:
-                                        currVisualEls.append(
-                                            self.getExistRoleOrAttributeIsaExistRoleOrAttributeVEs(
-                                                srcOccurrencesInDiagram,
-                                                tgtOccurrencesInDiagram,
-                                                ontDiagram))
-                                    elif srcRelcolPos == 0 and tgtRelcolPos == 1:
-                                        currVisualEls.append(
-                                            self.getExistRoleOrAttributeIsaExistRoleInvVEs(srcOccurrencesInDiagram,
-                                                                                           tgtOccurrencesInDiagram,
-                                                                                           ontDiagram))
-                                    elif srcRelcolPos == 1 and tgtRelcolPos == 0:
-                                        currVisualEls.append(
-                                            self.getExistRoleInvIsaExistRoleOrAttributeVEs(srcOccurrencesInDiagram,
-                                                                                           tgtOccurrencesInDiagram,
-                                                                                           ontDiagram))
-                                    elif srcRelcolPos == 1 and tgtRelcolPos == 1:
-                                        currVisualEls.append(
-                                            self.getExistRoleInvIsaExistRoleInvVEs(srcOccurrencesInDiagram,
-                                                                                   tgtOccurrencesInDiagram,
-                                                                                   ontDiagram))
-                                elif tgtEntityType == EntityType.DataProperty:
-                                    if srcRelcolPos == 0:
-                                        currVisualEls.append(
-                                            self.getExistRoleOrAttributeIsaExistRoleOrAttributeVEs(
-                                                srcOccurrencesInDiagram,
-                                                tgtOccurrencesInDiagram,
-                                                ontDiagram))
-                                    elif srcRelcolPos == 1:
-                                        currVisualEls.append(
-                                            self.getExistRoleInvIsaExistRoleOrAttributeVEs(srcOccurrencesInDiagram,
-                                                                                           tgtOccurrencesInDiagram,
-                                                                                           ontDiagram))
-                            elif srcEntityType == EntityType.DataProperty:
-                                if tgtEntityType == EntityType.Class:
-                                    currVisualEls.append(
-                                        self.getExistRoleOrAttributeIsaClassVEs(srcOccurrencesInDiagram,
-                                                                                tgtOccurrencesInDiagram,
-                                                                                ontDiagram))
-                                elif tgtEntityType == EntityType.ObjectProperty:
-                                    tgtColumnName = first(tgtColumnNames)
-                                    tgtRelColumn = tgtTable.getColumnByName(tgtColumnName)
-                                    tgtRelcolPos = tgtRelColumn.position
-                                    if tgtRelcolPos == 0:
-                                        currVisualEls.append(
-                                            self.getExistRoleOrAttributeIsaExistRoleOrAttributeVEs(
-                                                srcOccurrencesInDiagram,
-                                                tgtOccurrencesInDiagram,
-                                                ontDiagram))
-                                    elif tgtRelcolPos == 1:
-                                        currVisualEls.append(
-                                            self.getExistRoleOrAttributeIsaExistRoleInvVEs(srcOccurrencesInDiagram,
-                                                                                           tgtOccurrencesInDiagram,
-                                                                                           ontDiagram))
-                                elif tgtEntityType == EntityType.DataProperty:
-                                    currVisualEls.append(
-                                        self.getExistRoleOrAttributeIsaExistRoleOrAttributeVEs(srcOccurrencesInDiagram,
-                                                                                               tgtOccurrencesInDiagram,
-                                                                                               ontDiagram))
-                        elif len(srcColumnNames) == 2:
-                            if srcEntityType == EntityType.ObjectProperty:
-                                if tgtEntityType == EntityType.ObjectProperty:
-                                    currVisualEls.append(self.getEntityIsaEntityVEs(srcOccurrencesInDiagram,
-                                                                                    tgtOccurrencesInDiagram,
-                                                                                    ontDiagram))
-                            elif srcEntityType == EntityType.DataProperty:
-                                if tgtEntityType == EntityType.DataProperty:
-                                    currVisualEls.append(self.getEntityIsaEntityVEs(srcOccurrencesInDiagram,
-                                                                                    tgtOccurrencesInDiagram,
-                                                                                    ontDiagram))
-                        if currVisualEls:
-                            currDiagramToForeignKeyDict[fk] = currVisualEls
-                            fksStr = ",".join(map(str, currVisualEls))
-                            LOGGER.info('{} --> [{}]'.format(fk.name, fksStr))
-                else:
-                    LOGGER.debug('FK skipped as diagram does not contain visual elements for srcTable ({}) or for '
-                                 'tgtTable ({})'.format(srcTable.entity.shortIRI, tgtTable.entity.shortIRI))
+                currVisualEls = None
+                if fk in reusedForeignKeys:
+                    currVisualEls = oldDiagramToForeignKeyDict.get(fk)
+                elif fk in fkToPattern:
+                    srcTable, tgtTable, pattern = fkToPattern[fk]
+                    srcNodes = currDiagramToTableDict.get(srcTable)
+                    tgtNodes = currDiagramToTableDict.get(tgtTable)
+                    if pattern and srcNodes and tgtNodes:
+                        visualElements = diagramMapping.visualElementsOf(pattern, srcNodes, tgtNodes)
+                        if visualElements:
+                            currVisualEls = [visualElements]
+                if currVisualEls:
+                    currDiagramToForeignKeyDict[fk] = currVisualEls
             self._diagramToForeignKeys[ontDiagram] = currDiagramToForeignKeyDict
 
-    # A-->B, R-->P, U1-->U2
-    # SOLVED
-    def getEntityIsaEntityVEs(self, srcOccurrencesInDiagram, tgtOccurrencesInDiagram, ontDiagram):
-        LOGGER.debug('Call to getEntityIsaEntityVEs')
-        result = list()
-        edges = ontDiagram.edges()
-        for edge in edges:
-            firstSrc = edge.source
-            firstTgt = edge.target
-            if edge.type() == Item.InclusionEdge:
-                if firstSrc in srcOccurrencesInDiagram and firstTgt in tgtOccurrencesInDiagram:
-                    currVE = ForeignKeyVisualElements(firstSrc, firstTgt, [edge])
-                    result.append(currVE)
-            elif edge.type() == Item.EquivalenceEdge:
-                if firstSrc in srcOccurrencesInDiagram and firstTgt in tgtOccurrencesInDiagram:
-                    currVE = ForeignKeyVisualElements(firstSrc, firstTgt, [edge])
-                    result.append(currVE)
-                elif firstTgt in srcOccurrencesInDiagram and firstSrc in tgtOccurrencesInDiagram:
-                    currVE = ForeignKeyVisualElements(firstTgt, firstSrc, [edge], invertBreakpoints=[edge])
-                    result.append(currVE)
-            elif edge.type() == Item.InputEdge:
-                if firstSrc in srcOccurrencesInDiagram and (
-                        firstTgt.type() == Item.UnionNode or firstTgt.type() == Item.DisjointUnionNode):
-                    for secondEdge in firstTgt.edges:
-                        if secondEdge.type() == Item.EquivalenceEdge:
-                            secondSrc = secondEdge.source
-                            secondTgt = secondEdge.target
-                            if secondSrc == firstTgt and secondTgt in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(firstSrc, secondTgt, [edge, secondEdge], [firstTgt])
-                                result.append(currVE)
-                            elif secondTgt == firstTgt and secondSrc in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(firstSrc, secondSrc, [edge, secondEdge],
-                                                                  [firstTgt], [secondEdge])
-                                result.append(currVE)
-                        if secondEdge.type() == Item.InclusionEdge:
-                            secondSrc = secondEdge.source
-                            secondTgt = secondEdge.target
-                            if secondSrc == firstTgt and secondTgt in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(firstSrc, secondTgt, [edge, secondEdge], [firstTgt])
-                                result.append(currVE)
-        return result
-
-    # A-->exist(R) , A-->exist(U)
-    # SOLVED
-    def getClassIsaExistRoleOrAttributeVEs(self, srcOccurrencesInDiagram, tgtOccurrencesInDiagram, ontDiagram):
-        LOGGER.debug('Call to getClassIsaExistRoleOrAttributeVEs')
-        result = list()
-        edges = ontDiagram.edges()
-        for edge in edges:
-            if edge.type() == Item.InclusionEdge:
-                currSrc = edge.source
-                firstOpTgt = edge.target
-                if currSrc in srcOccurrencesInDiagram and firstOpTgt.type() is Item.DomainRestrictionNode:
-                    for innerEdge in firstOpTgt.edges:
-                        if innerEdge.type() == Item.InputEdge:
-                            innerSrc = innerEdge.source
-                            # innerTgt = innerEdge.target
-                            # if innerSrc in tgtOccurrencesInDiagram and innerTgt == currRestrTgt:
-                            if innerSrc in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerSrc, [edge, innerEdge], [firstOpTgt])
-                                result.append(currVE)
-                # UNION OR DISJOINT UNION
-                elif currSrc in srcOccurrencesInDiagram and (
-                        firstOpTgt.type() is Item.UnionNode or firstOpTgt.type() is Item.DisjointUnionNode):
-                    for firstInnerEdge in firstOpTgt.edges:
-                        if firstInnerEdge.type() == Item.InputEdge:
-                            firstInnerSrc = firstInnerEdge.source
-                            firstInnerTgt = firstInnerEdge.target
-                            if firstInnerTgt == firstOpTgt and firstInnerSrc.type() is Item.DomainRestrictionNode:
-                                for secInnerEdge in firstInnerSrc.edges:
-                                    secInnerSrc = secInnerEdge.source
-                                    if secInnerSrc in tgtOccurrencesInDiagram:
-                                        currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                          [edge, firstInnerEdge, secInnerEdge],
-                                                                          [firstOpTgt, firstInnerTgt])
-                                        result.append(currVE)
-            elif edge.type() == Item.EquivalenceEdge:
-                currSrc = edge.source
-                firstOpTgt = edge.target
-                if currSrc in srcOccurrencesInDiagram and firstOpTgt.type() is Item.DomainRestrictionNode:
-                    for innerEdge in firstOpTgt.edges:
-                        if innerEdge.type() == Item.InputEdge:
-                            innerSrc = innerEdge.source
-                            # innerTgt = innerEdge.target
-                            # if innerSrc in tgtOccurrencesInDiagram and innerTgt == firstOpTgt:
-                            if innerSrc in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerSrc, [edge, innerEdge], [firstOpTgt])
-                                result.append(currVE)
-                elif firstOpTgt in srcOccurrencesInDiagram and currSrc.type() is Item.DomainRestrictionNode:
-                    for innerEdge in currSrc.edges:
-                        if innerEdge.type() == Item.InputEdge:
-                            innerSrc = innerEdge.source
-                            # innerTgt = innerEdge.target
-                            # if innerSrc in tgtOccurrencesInDiagram and innerTgt == currSrc:
-                            if innerSrc in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(firstOpTgt, innerSrc, [edge, innerEdge], [currSrc],
-                                                                  [edge])
-                                result.append(currVE)
-                # UNION OR DISJOINT UNION
-                elif currSrc in srcOccurrencesInDiagram and (
-                        firstOpTgt.type() is Item.UnionNode or firstOpTgt.type() is Item.DisjointUnionNode):
-                    for firstInnerEdge in firstOpTgt.edges:
-                        if firstInnerEdge.type() == Item.InputEdge:
-                            firstInnerSrc = firstInnerEdge.source
-                            firstInnerTgt = firstInnerEdge.target
-                            if firstInnerTgt == firstOpTgt and firstInnerSrc.type() is Item.DomainRestrictionNode:
-                                for secInnerEdge in firstInnerSrc.edges:
-                                    secInnerSrc = secInnerEdge.source
-                                    if secInnerSrc in tgtOccurrencesInDiagram:
-                                        currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                          [edge, firstInnerEdge, secInnerEdge],
-                                                                          [firstOpTgt, firstInnerSrc])
-                                        result.append(currVE)
-                elif firstOpTgt in srcOccurrencesInDiagram and (
-                        currSrc.type() is Item.UnionNode or currSrc.type() is Item.DisjointUnionNode):
-                    for firstInnerEdge in currSrc.edges:
-                        if firstInnerEdge.type() == Item.InputEdge:
-                            firstInnerSrc = firstInnerEdge.source
-                            firstInnerTgt = firstInnerEdge.target
-                            if firstInnerTgt == currSrc and firstInnerSrc.type() is Item.DomainRestrictionNode:
-                                for secInnerEdge in firstInnerSrc.edges:
-                                    secInnerSrc = secInnerEdge.source
-                                    if secInnerSrc in tgtOccurrencesInDiagram:
-                                        currVE = ForeignKeyVisualElements(firstOpTgt, secInnerSrc,
-                                                                          [edge, firstInnerEdge, secInnerEdge],
-                                                                          [currSrc, firstInnerSrc], [edge])
-                                        result.append(currVE)
-        return result
-
-    # exist(R)-->A , exist(U)-->A
-    # SOLVED
-    def getExistRoleOrAttributeIsaClassVEs(self, srcOccurrencesInDiagram, tgtOccurrencesInDiagram, ontDiagram):
-        LOGGER.debug('Call to getExistRoleOrAttributeIsaClassVEs')
-        result = list()
-        edges = ontDiagram.edges()
-        for edge in edges:
-            if edge.type() == Item.InputEdge:
-                currSrc = edge.source
-                currRestrTgt = edge.target
-                if currSrc in srcOccurrencesInDiagram and currRestrTgt.type() is Item.DomainRestrictionNode:
-                    for innerEdge in currRestrTgt.edges:
-                        if innerEdge.type() == Item.InclusionEdge:
-                            # innerSrc = innerEdge.source
-                            innerTgt = innerEdge.target
-                            # if innerTgt in tgtOccurrencesInDiagram and innerSrc == currRestrTgt:
-                            if innerTgt in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerTgt, [edge, innerEdge], [currRestrTgt])
-                                result.append(currVE)
-                            elif innerTgt.type() is Item.UnionNode or innerTgt.type() is Item.DisjointUnionNode:
-                                for secInnerEdge in innerTgt.edges:
-                                    if secInnerEdge.type() == Item.InputEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerTgt == innerTgt and secInnerSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt], [secInnerEdge])
-                                            result.append(currVE)
-
-                        elif innerEdge.type() == Item.EquivalenceEdge:
-                            innerSrc = innerEdge.source
-                            innerTgt = innerEdge.target
-                            if innerTgt in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerTgt, [edge, innerEdge], [currRestrTgt])
-                                result.append(currVE)
-                            elif innerSrc in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerSrc, [edge, innerEdge],
-                                                                  [currRestrTgt], [innerEdge])
-                                result.append(currVE)
-                            elif innerTgt.type() is Item.UnionNode or innerTgt.type() is Item.DisjointUnionNode:
-                                for secInnerEdge in innerTgt.edges:
-                                    if secInnerEdge.type() == Item.InputEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerTgt == innerTgt and secInnerSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt], [secInnerEdge])
-                                            result.append(currVE)
-                            elif innerTgt == currRestrTgt and (
-                                    innerSrc.type() is Item.UnionNode or innerSrc.type() is Item.DisjointUnionNode):
-                                for secInnerEdge in innerSrc.edges:
-                                    if secInnerEdge.type() == Item.InputEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerTgt == innerSrc and secInnerSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerSrc],
-                                                                              [innerEdge, secInnerEdge])
-                                            result.append(currVE)
-                        # UNION OR DISJOINT UNION
-                        elif innerEdge.type() == Item.InputEdge:
-                            innerSrc = innerEdge.source
-                            innerTgt = innerEdge.target
-                            if innerSrc == currRestrTgt and (
-                                    innerTgt.type() is Item.UnionNode or innerTgt.type() is Item.DisjointUnionNode):
-                                for secInnerEdge in innerTgt.edges:
-                                    if secInnerEdge.type() == Item.InclusionEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerSrc == innerTgt and secInnerTgt in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerTgt,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt])
-                                            result.append(currVE)
-                                    if secInnerEdge.type() == Item.EquivalenceEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerSrc == innerTgt and secInnerTgt in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerTgt,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt])
-                                            result.append(currVE)
-                                        elif secInnerTgt == innerTgt and secInnerSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt], [secInnerEdge])
-                                            result.append(currVE)
-        return result
-
-    # A-->exist(inv(R))
-    def getClassIsaExistRoleInvVEs(self, srcOccurrencesInDiagram, tgtOccurrencesInDiagram, ontDiagram):
-        LOGGER.debug('Call to getClassIsaExistRoleInvVEs')
-        result = list()
-        edges = ontDiagram.edges()
-        # for edge in edges:
-        #     if edge.type() == Item.InclusionEdge or edge.type() == Item.EquivalenceEdge:
-        #         currSrc = edge.source
-        #         currRestrTgt = edge.target
-        #         if currSrc in srcOccurrencesInDiagram and currRestrTgt.type() is Item.RangeRestrictionNode:
-        #             for innerEdge in currRestrTgt.edges:
-        #                 if innerEdge.type() == Item.InputEdge:
-        #                     innerSrc = innerEdge.source
-        #                     innerTgt = innerEdge.target
-        #                     if innerSrc in tgtOccurrencesInDiagram and innerTgt == currRestrTgt:
-        #                         currVE = ForeignKeyVisualElements(currSrc, innerSrc, [edge, innerEdge], [currRestrTgt])
-        #                         result.append(currVE)
-        for edge in edges:
-            if edge.type() == Item.InclusionEdge:
-                currSrc = edge.source
-                firstOpTgt = edge.target
-                if currSrc in srcOccurrencesInDiagram and firstOpTgt.type() is Item.RangeRestrictionNode:
-                    for innerEdge in firstOpTgt.edges:
-                        if innerEdge.type() == Item.InputEdge:
-                            innerSrc = innerEdge.source
-                            # innerTgt = innerEdge.target
-                            # if innerSrc in tgtOccurrencesInDiagram and innerTgt == currRestrTgt:
-                            if innerSrc in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerSrc, [edge, innerEdge], [firstOpTgt])
-                                result.append(currVE)
-                # UNION OR DISJOINT UNION
-                elif currSrc in srcOccurrencesInDiagram and (
-                        firstOpTgt.type() is Item.UnionNode or firstOpTgt.type() is Item.DisjointUnionNode):
-                    for firstInnerEdge in firstOpTgt.edges:
-                        if firstInnerEdge.type() == Item.InputEdge:
-                            firstInnerSrc = firstInnerEdge.source
-                            firstInnerTgt = firstInnerEdge.target
-                            if firstInnerTgt == firstOpTgt and firstInnerSrc.type() is Item.RangeRestrictionNode:
-                                for secInnerEdge in firstInnerSrc.edges:
-                                    secInnerSrc = secInnerEdge.source
-                                    if secInnerSrc in tgtOccurrencesInDiagram:
-                                        currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                          [edge, firstInnerEdge, secInnerEdge],
-                                                                          [firstOpTgt, firstInnerTgt])
-                                        result.append(currVE)
-
-            elif edge.type() == Item.EquivalenceEdge:
-                currSrc = edge.source
-                firstOpTgt = edge.target
-                if currSrc in srcOccurrencesInDiagram and firstOpTgt.type() is Item.RangeRestrictionNode:
-                    for innerEdge in firstOpTgt.edges:
-                        if innerEdge.type() == Item.InputEdge:
-                            innerSrc = innerEdge.source
-                            # innerTgt = innerEdge.target
-                            # if innerSrc in tgtOccurrencesInDiagram and innerTgt == firstOpTgt:
-                            if innerSrc in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerSrc, [edge, innerEdge], [firstOpTgt])
-                                result.append(currVE)
-                elif firstOpTgt in srcOccurrencesInDiagram and currSrc.type() is Item.RangeRestrictionNode:
-                    for innerEdge in currSrc.edges:
-                        if innerEdge.type() == Item.InputEdge:
-                            innerSrc = innerEdge.source
-                            # innerTgt = innerEdge.target
-                            # if innerSrc in tgtOccurrencesInDiagram and innerTgt == currSrc:
-                            if innerSrc in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(firstOpTgt, innerSrc, [edge, innerEdge], [currSrc],
-                                                                  [edge])
-                                result.append(currVE)
-
-                # UNION OR DISJOINT UNION
-                elif currSrc in srcOccurrencesInDiagram and (
-                        firstOpTgt.type() is Item.UnionNode or firstOpTgt.type() is Item.DisjointUnionNode):
-                    for firstInnerEdge in firstOpTgt.edges:
-                        if firstInnerEdge.type() == Item.InputEdge:
-                            firstInnerSrc = firstInnerEdge.source
-                            firstInnerTgt = firstInnerEdge.target
-                            if firstInnerTgt == firstOpTgt and firstInnerSrc.type() is Item.RangeRestrictionNode:
-                                for secInnerEdge in firstInnerSrc.edges:
-                                    secInnerSrc = secInnerEdge.source
-                                    if secInnerSrc in tgtOccurrencesInDiagram:
-                                        currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                          [edge, firstInnerEdge, secInnerEdge],
-                                                                          [firstOpTgt, firstInnerSrc])
-                                        result.append(currVE)
-
-                elif firstOpTgt in srcOccurrencesInDiagram and (
-                        currSrc.type() is Item.UnionNode or currSrc.type() is Item.DisjointUnionNode):
-                    for firstInnerEdge in currSrc.edges:
-                        if firstInnerEdge.type() == Item.InputEdge:
-                            firstInnerSrc = firstInnerEdge.source
-                            firstInnerTgt = firstInnerEdge.target
-                            if firstInnerTgt == currSrc and firstInnerSrc.type() is Item.RangeRestrictionNode:
-                                for secInnerEdge in firstInnerSrc.edges:
-                                    secInnerSrc = secInnerEdge.source
-                                    if secInnerSrc in tgtOccurrencesInDiagram:
-                                        currVE = ForeignKeyVisualElements(firstOpTgt, secInnerSrc,
-                                                                          [edge, firstInnerEdge, secInnerEdge],
-                                                                          [currSrc, firstInnerSrc], [edge])
-                                        result.append(currVE)
-        return result
-
-    # exist(inv(R))-->A
-    def getExistRoleInvIsaClassVEs(self, srcOccurrencesInDiagram, tgtOccurrencesInDiagram, ontDiagram):
-        LOGGER.debug('Call to getExistRoleInvIsaClassVEs')
-        result = list()
-        edges = ontDiagram.edges()
-        # for edge in edges:
-        #     if edge.type() == Item.InputEdge:
-        #         currSrc = edge.source
-        #         currRestrTgt = edge.target
-        #         if currSrc in srcOccurrencesInDiagram and currRestrTgt.type() is Item.RangeRestrictionNode:
-        #             for innerEdge in currRestrTgt.edges:
-        #                 if innerEdge.type() == Item.InclusionEdge or innerEdge.type() == Item.EquivalenceEdge:
-        #                     innerSrc = innerEdge.source
-        #                     innerTgt = innerEdge.target
-        #                     if innerTgt in tgtOccurrencesInDiagram and innerSrc == currRestrTgt:
-        #                         currVE = ForeignKeyVisualElements(currSrc, innerTgt, [edge, innerEdge], [currRestrTgt])
-        #                         result.append(currVE)
-        for edge in edges:
-            if edge.type() == Item.InputEdge:
-                currSrc = edge.source
-                currRestrTgt = edge.target
-                if currSrc in srcOccurrencesInDiagram and currRestrTgt.type() is Item.RangeRestrictionNode:
-                    for innerEdge in currRestrTgt.edges:
-                        if innerEdge.type() == Item.InclusionEdge:
-                            # innerSrc = innerEdge.source
-                            innerTgt = innerEdge.target
-                            # if innerTgt in tgtOccurrencesInDiagram and innerSrc == currRestrTgt:
-                            if innerTgt in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerTgt, [edge, innerEdge], [currRestrTgt])
-                                result.append(currVE)
-                            elif innerTgt.type() is Item.UnionNode or innerTgt.type() is Item.DisjointUnionNode:
-                                for secInnerEdge in innerTgt.edges:
-                                    if secInnerEdge.type() == Item.InputEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerTgt == innerTgt and secInnerSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt], [secInnerEdge])
-                                            result.append(currVE)
-
-                        elif innerEdge.type() == Item.EquivalenceEdge:
-                            innerSrc = innerEdge.source
-                            innerTgt = innerEdge.target
-                            if innerTgt in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerTgt, [edge, innerEdge], [currRestrTgt])
-                                result.append(currVE)
-                            elif innerSrc in tgtOccurrencesInDiagram:
-                                currVE = ForeignKeyVisualElements(currSrc, innerSrc, [edge, innerEdge], [currRestrTgt],
-                                                                  [innerEdge])
-                                result.append(currVE)
-                            elif innerTgt.type() is Item.UnionNode or innerTgt.type() is Item.DisjointUnionNode:
-                                for secInnerEdge in innerTgt.edges:
-                                    if secInnerEdge.type() == Item.InputEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerTgt == innerTgt and secInnerSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt], [secInnerEdge])
-                                            result.append(currVE)
-                            elif innerTgt == currRestrTgt and (
-                                    innerSrc.type() is Item.UnionNode or innerSrc.type() is Item.DisjointUnionNode):
-                                for secInnerEdge in innerSrc.edges:
-                                    if secInnerEdge.type() == Item.InputEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerTgt == innerSrc and secInnerSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerSrc],
-                                                                              [innerEdge, secInnerEdge])
-                                            result.append(currVE)
-                        # UNION OR DISJOINT UNION
-                        elif innerEdge.type() == Item.InputEdge:
-                            innerSrc = innerEdge.source
-                            innerTgt = innerEdge.target
-                            if innerSrc == currRestrTgt and (
-                                    innerTgt.type() is Item.UnionNode or innerTgt.type() is Item.DisjointUnionNode):
-                                for secInnerEdge in innerTgt.edges:
-                                    if secInnerEdge.type() == Item.InclusionEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerSrc == innerTgt and secInnerTgt in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerTgt,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt])
-                                            result.append(currVE)
-                                    if secInnerEdge.type() == Item.EquivalenceEdge:
-                                        secInnerSrc = secInnerEdge.source
-                                        secInnerTgt = secInnerEdge.target
-                                        if secInnerSrc == innerTgt and secInnerTgt in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerTgt,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt])
-                                            result.append(currVE)
-                                        elif secInnerTgt == innerTgt and secInnerSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(currSrc, secInnerSrc,
-                                                                              [edge, innerEdge, secInnerEdge],
-                                                                              [currRestrTgt, innerTgt], [secInnerEdge])
-                                            result.append(currVE)
-        return result
-
-    # exist(R)-->exist(P), exist(R)-->exist(U), exist(U)-->exist(R), exist(U1)-->exist(U2)
-    def getExistRoleOrAttributeIsaExistRoleOrAttributeVEs(self, srcOccurrencesInDiagram, tgtOccurrencesInDiagram,
-                                                          ontDiagram):
-        LOGGER.debug('Call to getExistRoleOrAttributeIsaExistRoleOrAttributeVEs')
-        result = list()
-        edges = ontDiagram.edges()
-        for firstEdge in edges:
-            if firstEdge.type() == Item.InputEdge:
-                firstSrc = firstEdge.source
-                firstTgt = firstEdge.target
-                if firstSrc in srcOccurrencesInDiagram and firstTgt is Item.DomainRestrictionNode:
-                    for secondEdge in firstTgt.edges:
-                        if secondEdge.type() == Item.InclusionEdge or secondEdge.type() == Item.EquivalenceEdge:
-                            secondSrc = secondEdge.source
-                            secondTgt = secondEdge.target
-                            if secondSrc == firstTgt and secondTgt is Item.DomainRestrictionNode:
-                                for thirdEdge in secondTgt.edges:
-                                    if thirdEdge.type() == Item.InputEdge:
-                                        thirdSrc = thirdEdge.source
-                                        thirdTgt = thirdEdge.target
-                                        if thirdTgt == secondTgt and thirdSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(firstSrc, thirdSrc,
-                                                                              [firstEdge, secondEdge, thirdEdge],
-                                                                              [firstTgt, secondTgt])
-                                            result.append(currVE)
-        return result
-
-    # exist(inv(R))-->exist(P), exist(inv(R))-->exist(U)
-    def getExistRoleInvIsaExistRoleOrAttributeVEs(self, srcOccurrencesInDiagram, tgtOccurrencesInDiagram, ontDiagram):
-        LOGGER.debug('Call to getExistRoleInvIsaExistRoleOrAttributeVEs')
-        result = list()
-        edges = ontDiagram.edges()
-        for firstEdge in edges:
-            if firstEdge.type() == Item.InputEdge:
-                firstSrc = firstEdge.source
-                firstTgt = firstEdge.target
-                if firstSrc in srcOccurrencesInDiagram and firstTgt is Item.RangeRestrictionNode:
-                    for secondEdge in firstTgt.edges:
-                        if secondEdge.type() == Item.InclusionEdge or secondEdge.type() == Item.EquivalenceEdge:
-                            secondSrc = secondEdge.source
-                            secondTgt = secondEdge.target
-                            if secondSrc == firstTgt and secondTgt is Item.DomainRestrictionNode:
-                                for thirdEdge in secondTgt.edges:
-                                    if thirdEdge.type() == Item.InputEdge:
-                                        thirdSrc = thirdEdge.source
-                                        thirdTgt = thirdEdge.target
-                                        if thirdTgt == secondTgt and thirdSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(firstSrc, thirdSrc,
-                                                                              [firstEdge, secondEdge, thirdEdge],
-                                                                              [firstTgt, secondTgt])
-                                            result.append(currVE)
-        return result
-
-    # exist(inv(R))-->exist(inv(P))
-    def getExistRoleInvIsaExistRoleInvVEs(self, srcOccurrencesInDiagram, tgtOccurrencesInDiagram, ontDiagram):
-        LOGGER.debug('Call to getExistRoleInvIsaExistRoleInvVEs')
-        result = list()
-        edges = ontDiagram.edges()
-        for firstEdge in edges:
-            if firstEdge.type() == Item.InputEdge:
-                firstSrc = firstEdge.source
-                firstTgt = firstEdge.target
-                if firstSrc in srcOccurrencesInDiagram and firstTgt is Item.RangeRestrictionNode:
-                    for secondEdge in firstTgt.edges:
-                        if secondEdge.type() == Item.InclusionEdge or secondEdge.type() == Item.EquivalenceEdge:
-                            secondSrc = secondEdge.source
-                            secondTgt = secondEdge.target
-                            if secondSrc == firstTgt and secondTgt is Item.RangeRestrictionNode:
-                                for thirdEdge in secondTgt.edges:
-                                    if thirdEdge.type() == Item.InputEdge:
-                                        thirdSrc = thirdEdge.source
-                                        thirdTgt = thirdEdge.target
-                                        if thirdTgt == secondTgt and thirdSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(firstSrc, thirdSrc,
-                                                                              [firstEdge, secondEdge, thirdEdge],
-                                                                              [firstTgt, secondTgt])
-                                            result.append(currVE)
-        return result
-
-    # exist(R)-->exist(inv(P)), exist(U)-->exist(inv(P))
-    def getExistRoleOrAttributeIsaExistRoleInvVEs(self, srcOccurrencesInDiagram, tgtOccurrencesInDiagram, ontDiagram):
-        LOGGER.debug('Call to getExistRoleOrAttributeIsaExistRoleInvVEs')
-        result = list()
-        edges = ontDiagram.edges()
-        for firstEdge in edges:
-            if firstEdge.type() == Item.InputEdge:
-                firstSrc = firstEdge.source
-                firstTgt = firstEdge.target
-                if firstSrc in srcOccurrencesInDiagram and firstTgt is Item.DomainRestrictionNode:
-                    for secondEdge in firstTgt.edges:
-                        if secondEdge.type() == Item.InclusionEdge or secondEdge.type() == Item.EquivalenceEdge:
-                            secondSrc = secondEdge.source
-                            secondTgt = secondEdge.target
-                            if secondSrc == firstTgt and secondTgt is Item.RangeRestrictionNode:
-                                for thirdEdge in secondTgt.edges:
-                                    if thirdEdge.type() == Item.InputEdge:
-                                        thirdSrc = thirdEdge.source
-                                        thirdTgt = thirdEdge.target
-                                        if thirdTgt == secondTgt and thirdSrc in tgtOccurrencesInDiagram:
-                                            currVE = ForeignKeyVisualElements(firstSrc, thirdSrc,
-                                                                              [firstEdge, secondEdge, thirdEdge],
-                                                                              [firstTgt, secondTgt])
-                                            result.append(currVE)
+    def getForeignKeyPattern(self, fk, srcTable, tgtTable):
+        """
+        Returns the name of the pattern describing how the given foreign key appears in a diagram,
+        based on the type of the entities of its tables and on the position of the referenced columns.
+        Returns None if the foreign key cannot be mapped to any visual element.
+        :type fk: ForeignKeyConstraint
+        :type srcTable: RelationalTable
+        :type tgtTable: RelationalTable
+        :rtype: str
+        """
+        patterns = ForeignKeyPatternMatcher
+        properties = {EntityType.ObjectProperty, EntityType.DataProperty}
+        srcEntityType = srcTable.entity.entityType
+        tgtEntityType = tgtTable.entity.entityType
+        if len(fk.srcColumns) == 2:
+            if srcEntityType == tgtEntityType and srcEntityType in properties:
+                return patterns.EntityIsaEntity
+        elif len(fk.srcColumns) == 1:
+            srcInverse = srcEntityType == EntityType.ObjectProperty and \
+                self.getColumnPosition(srcTable, fk.srcColumns) == 1
+            tgtInverse = tgtEntityType == EntityType.ObjectProperty and \
+                self.getColumnPosition(tgtTable, fk.tgtColumns) == 1
+            if srcEntityType == EntityType.Class:
+                if tgtEntityType == EntityType.Class:
+                    return patterns.EntityIsaEntity
+                elif tgtInverse:
+                    return patterns.ClassIsaExistRoleInv
+                elif tgtEntityType in properties and self.getColumnPosition(tgtTable, fk.tgtColumns) == 0:
+                    return patterns.ClassIsaExistRoleOrAttribute
+            elif srcEntityType in properties:
+                if tgtEntityType == EntityType.Class:
+                    return patterns.ExistRoleInvIsaClass if srcInverse else patterns.ExistRoleOrAttributeIsaClass
+                elif tgtInverse:
+                    return patterns.ExistRoleInvIsaExistRoleInv if srcInverse \
+                        else patterns.ExistRoleOrAttributeIsaExistRoleInv
+                elif tgtEntityType in properties:
+                    return patterns.ExistRoleInvIsaExistRoleOrAttribute if srcInverse \
+                        else patterns.ExistRoleOrAttributeIsaExistRoleOrAttribute
+        return None
+
+    @staticmethod
+    def getColumnPosition(table, columnNames):
+        """
+        Returns the position of the first of the given columns in the given table.
+        :type table: RelationalTable
+        :type columnNames: tuple
+        :rtype: int
+        """
+        return table.getColumnByName(first(columnNames)).position
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+
+import codecs
+import os
+from collections import deque
+from itertools import islice
+
+from eddy.core.output import getLogger
+
+LOGGER = getLogger()
+
+
+class LogBuffer:
+    """
+    Bounded, line-indexed buffer for the output of the Blackbird engine.
+    Only the most recent lines are retained in memory: older lines are discarded or, if a spill file
+    is given, appended to it, rotating it once it grows over the spill size as logging handlers do.
+    Lines are indexed from the first line written to the buffer, so that the index of a line
+    does not change as older lines are discarded.
+    """
+    def __init__(self, maxLines=10000, spillPath=None, spillSize=1048576, spillCount=3):
+        """
+        Initialize the buffer.
+        :type maxLines: int
+        :type spillPath: str
+        :type spillSize: int
+        :type spillCount: int
+        """
+        self.maxLines = max(1, maxLines)
+        self.spillPath = spillPath
+        self.spillSize = spillSize
+        self.spillCount = spillCount
+        self.spillFile = None
+        self.lines = deque()
+        self.partials = {}
+        self.discarded = 0
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    def clear(self):
+        """
+        Discard all the lines in the buffer, without spilling them.
+        """
+        self.lines.clear()
+        self.partials.clear()
+        self.discarded = 0
+
+    def close(self):
+        """
+        Close the spill file, if any.
+        """
+        if self.spillFile:
+            self.spillFile.close()
+            self.spillFile = None
+
+    def firstLine(self):
+        """
+        Returns the index of the oldest line retained in the buffer.
+        :rtype: int
+        """
+        return self.discarded
+
+    def getvalue(self):
+        """
+        Returns the content of the buffer.
+        :rtype: str
+        """
+        return ''.join('{}\n'.format(line) for line in self.lines) + ''.join(self.pending())
+
+    def lineCount(self):
+        """
+        Returns the number of lines written to the buffer, including the discarded ones
+        and the last ones which are not terminated yet.
+        :rtype: int
+        """
+        return self.discarded + len(self.lines) + len(self.partials)
+
+    def readLines(self, start, count):
+        """
+        Returns the lines retained in the buffer among the count lines starting from the line with the given index.
+        :type start: int
+        :type count: int
+        :rtype: list
+        """
+        stop = max(start + max(count, 0) - self.discarded, 0)
+        start = min(max(start - self.discarded, 0), stop)
+        size = len(self.lines)
+        # ITERATE THE DEQUE FROM ITS NEAREST END, WITHOUT COPYING IT
+        if start < size - stop:
+            lines = list(islice(self.lines, start, stop))
+        else:
+            lines = list(islice(reversed(self.lines), max(size - stop, 0), max(size - start, 0)))[::-1]
+        if stop > size:
+            lines += self.pending()[max(start - size, 0):stop - size]
+        return lines
+
+    def sync(self):
+        """
+        Bring the buffer up to date with its source: lines written to the buffer are available right away.
+        """
+
+    def tail(self, count):
+        """
+        Returns the last count lines retained in the buffer.
+        :type count: int
+        :rtype: list
+        """
+        return self.readLines(self.lineCount() - count, count)
+
+    def write(self, text, prefix=''):
+        """
+        Write the given text to the buffer, prepending the given prefix to each line.
+        Lines written with different prefixes are completed independently of each other,
+        so that several sources may share the same buffer.
+        :type text: str
+        :type prefix: str
+        :rtype: int
+        """
+        if not text:
+            return 0
+        chunks = (self.partials.pop(prefix, '') + text).split('\n')
+        last = chunks.pop()
+        if last:
+            self.partials[prefix] = last
+        evicted = []
+        for chunk in chunks:
+            if len(self.lines) == self.maxLines:
+                evicted.append(self.lines.popleft())
+            self.lines.append(prefix + chunk.rstrip('\r'))
+        if evicted:
+            self.discarded += len(evicted)
+            self.spill(evicted)
+        return len(text)
+
+    #############################################
+    #   UTILITIES
+    #################################
+
+    def pending(self):
+        """
+        Returns the lines which are not terminated yet, one for each prefix.
+        :rtype: list
+        """
+        return [prefix + partial for prefix, partial in self.partials.items()]
+
+    def rotate(self):
+        """
+        Rotate the spill file, keeping at most spillCount backups of it.
+        """
+        self.close()
+        for i in range(self.spillCount - 1, 0, -1):
+            source = '{}.{}'.format(self.spillPath, i)
+            if os.path.exists(source):
+                os.replace(source, '{}.{}'.format(self.spillPath, i + 1))
+        if self.spillCount > 0:
+            os.replace(self.spillPath, '{}.1'.format(self.spillPath))
+        else:
+            os.remove(self.spillPath)
+
+    def spill(self, lines):
+        """
+        Append the given lines to the spill file, if any.
+        :type lines: list
+        """
+        if not self.spillPath:
+            return
+        try:
+            if not self.spillFile:
+                os.makedirs(os.path.dirname(self.spillPath) or os.curdir, exist_ok=True)
+                self.spillFile = open(self.spillPath, 'a', encoding='utf-8')
+            self.spillFile.write(''.join('{}\n'.format(line) for line in lines))
+            self.spillFile.flush()
+            if self.spillFile.tell() >= self.spillSize:
+                self.rotate()
+        except OSError as e:
+            LOGGER.error('Failed to spill log lines to {}: {}'.format(self.spillPath, e))
+            self.spillPath = None
+            self.close()
+
+
+class LogFileTail(LogBuffer):
+    """
+    Bounded, line-indexed buffer following the tail of a log file written by another process.
+    The content appended to the file is read whenever the buffer is synced, so that readers
+    access the file once for a consistent view of the buffer.
+    If the file is truncated, the buffer starts over from its beginning.
+    """
+    def __init__(self, path, maxLines=10000):
+        """
+        Initialize the buffer.
+        :type path: str
+        :type maxLines: int
+        """
+        super().__init__(maxLines)
+        self.path = path
+        self.offset = 0
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    def sync(self):
+        """
+        Read the content appended to the log file since the last read.
+        Only the tail of the file which fits in the buffer is read.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                size = f.seek(0, os.SEEK_END)
+                if size < self.offset:
+                    self.clear()
+                    self.decoder.reset()
+                    self.offset = 0
+                if size == self.offset:
+                    return
+                # SKIP THE CONTENT WHICH WOULD BE DISCARDED ANYWAY, ASSUMING LINES OF AT MOST 1KB
+                start = max(self.offset, size - self.maxLines * 1024)
+                f.seek(start)
+                data = f.read(size - start)
+        except OSError:
+            return
+        if start > self.offset:
+            # DROP THE PARTIAL LINE AT THE BEGINNING OF THE TAIL
+            newline = data.find(b'\n')
+            data = data[newline + 1:] if newline >= 0 else b''
+            self.partials.clear()
+            self.decoder.reset()
+        self.offset = size
+        self.write(self.decoder.decode(data))
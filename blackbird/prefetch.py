@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+
+
+
+import json
+
+from PyQt5 import (
+    QtCore,
+    QtNetwork
+)
+
+from eddy.core.functions.signals import connect
+from eddy.core.output import getLogger
+
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.rest import NetworkManager
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.rest import RequestQueue
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.rest import Resources
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import RelationalSchemaParser
+
+LOGGER = getLogger()
+
+
+class TablePrefetcher(QtCore.QObject):
+    """
+    Fetches in background the details and the applicable actions of the tables of a schema,
+    keeping them in a cache that is valid for a single version of the schema.
+    Additionally to built-in signals, this class emits:
+
+    * sgnTableFetched: whenever the details of a table have been fetched.
+    * sgnActionsFetched: whenever the actions applicable over a table have been fetched.
+    """
+    sgnTableFetched = QtCore.pyqtSignal(str)
+    sgnActionsFetched = QtCore.pyqtSignal(str)
+
+    def __init__(self, nmanager, parent=None):
+        """
+        Initialize the prefetcher.
+        :type nmanager: NetworkManager
+        :type parent: QObject
+        """
+        super().__init__(parent)
+        self.nmanager = nmanager
+        self.schema = None
+        self.version = 0
+        self.queue = None
+        self.inFlight = set()
+        self.tables = {}
+        self.actions = {}
+
+    #############################################
+    #   SLOTS
+    #################################
+
+    @QtCore.pyqtSlot(QtNetwork.QNetworkReply)
+    def onReplyFinished(self, reply):
+        """
+        Executed when a prefetch request completes.
+        :type reply: QNetworkReply
+        """
+        reply.deleteLater()
+        # DISCARD REPLIES REFERRING TO A PREVIOUS VERSION OF THE SCHEMA
+        if self.sender().version != self.version:
+            return
+        key = self.requestKey(reply)
+        self.inFlight.discard(key)
+        # noinspection PyArgumentList
+        if reply.error() != QtNetwork.QNetworkReply.NoError:
+            # noinspection PyArgumentList
+            if reply.error() != QtNetwork.QNetworkReply.OperationCanceledError:
+                LOGGER.debug('Could not prefetch {}: {}'.format(reply.url().toString(), reply.errorString()))
+            return
+        resource, tableName = key
+        data = json.loads(str(self.nmanager.readAll(reply), encoding='utf-8'))
+        if resource == Resources.SchemaSingleTableActions.name:
+            self.actions[tableName] = [RelationalSchemaParser.getTableAction(action) for action in data]
+            self.sgnActionsFetched.emit(tableName)
+        else:
+            self.tables[tableName] = RelationalSchemaParser.getTable(data, [], {})
+            self.sgnTableFetched.emit(tableName)
+
+    @QtCore.pyqtSlot()
+    def onQueueFinished(self):
+        """
+        Executed when all the requests of a prefetch batch complete.
+        """
+        queue = self.sender()
+        if queue is self.queue:
+            self.queue = None
+        queue.deleteLater()
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    def invalidate(self, schema=None):
+        """
+        Discard the cached details and actions, along with any request in progress, and
+        start caching the ones of the given schema version.
+        :type schema: RelationalSchema
+        """
+        if self.queue:
+            self.queue.abort()
+            self.queue = None
+        self.schema = schema
+        self.version += 1
+        self.inFlight = set()
+        self.tables = {}
+        self.actions = {}
+
+    def isCached(self, tableName):
+        """
+        Returns True if both the details and the actions of the given table are cached, False otherwise.
+        :type tableName: str
+        :rtype: bool
+        """
+        return tableName in self.tables and tableName in self.actions
+
+    def prefetch(self, tableNames):
+        """
+        Fetch the details and the actions of the given tables of the current schema, in the given order.
+        Pending requests of previous calls are dropped in favour of the new priority order,
+        while the ones already in flight are allowed to complete and are not issued again.
+        :type tableNames: list
+        """
+        if not self.schema:
+            return
+        if self.queue:
+            # REQUESTS IN FLIGHT COMPLETE ANYWAY: DO NOT ISSUE THEM AGAIN
+            self.inFlight.update(self.requestKey(reply) for reply in self.queue.inFlight)
+            self.queue.clear()
+        self.queue = RequestQueue(self.nmanager)
+        self.queue.version = self.version
+        connect(self.queue.sgnReplyFinished, self.onReplyFinished)
+        connect(self.queue.sgnFinished, self.onQueueFinished)
+        tableResource, actionsResource = Resources.SchemaSingleTable.name, Resources.SchemaSingleTableActions.name
+        for tableName in dict.fromkeys(tableNames):
+            if tableName not in self.tables and (tableResource, tableName) not in self.inFlight:
+                self.queue.enqueue(self.nmanager.getTable, self.schema.name, tableName)
+            if tableName not in self.actions and (actionsResource, tableName) not in self.inFlight:
+                self.queue.enqueue(self.nmanager.getActions, self.schema.name, tableName)
+        if self.queue.isFinished():
+            self.queue.deleteLater()
+            self.queue = None
+
+    @staticmethod
+    def requestKey(reply):
+        """
+        Returns the (resource, table name) pair identifying the prefetch request of the given reply.
+        :type reply: QNetworkReply
+        :rtype: tuple
+        """
+        request = reply.request()
+        return request.attribute(NetworkManager.Resource), request.attribute(NetworkManager.TableName)
+
+    def table(self, tableName):
+        """
+        Returns the cached details of the given table, or None if they have not been fetched yet.
+        :type tableName: str
+        :rtype: RelationalTable
+        """
+        return self.tables.get(tableName)
+
+    def tableActions(self, tableName):
+        """
+        Returns the cached actions applicable over the given table, or None if they have not been fetched yet.
+        :type tableName: str
+        :rtype: list
+        """
+        return self.actions.get(tableName)
@@ -23,7 +23,10 @@
 ##########################################################################
 
 
+import gzip
 import urllib
+import zlib
+from collections import deque
 from enum import unique
 from json import JSONEncoder
 
@@ -32,12 +35,19 @@ from PyQt5 import (
     QtNetwork
 )
 
+from eddy import ORGANIZATION, APPNAME
 from eddy.core.datatypes.common import Enum_
+from eddy.core.functions.signals import connect
 from eddy.core.output import getLogger
 
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalTableAction
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 LOGGER = getLogger()
 
 
@@ -54,20 +64,275 @@ class Resources(Enum_):
     SchemaSingleTableActions = '{}/actions'.format(SchemaSingleTable)
 
 
+@unique
+class Encoding(Enum_):
+    Identity = 'identity'
+    Gzip = 'gzip'
+    Zstd = 'zstd'
+
+    @classmethod
+    def accepted(cls):
+        """
+        Returns the value of the Accept-Encoding header listing the supported content encodings.
+        :rtype: bytes
+        """
+        if zstandard:
+            return b'zstd, gzip, deflate'
+        return b'gzip, deflate'
+
+
+def compress(data, encoding):
+    """
+    Returns the given data compressed with the given content encoding.
+    :type data: bytes
+    :type encoding: Encoding
+    :rtype: bytes
+    """
+    if encoding is Encoding.Gzip:
+        return gzip.compress(data, compresslevel=6)
+    if encoding is Encoding.Zstd:
+        if not zstandard:
+            raise BlackbirdRequestError('zstd compression requires the zstandard package')
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+
+def endpointAtPort(port):
+    """
+    Returns the endpoint of the Blackbird engine listening on the given local port.
+    :type port: int
+    :rtype: str
+    """
+    url = QtCore.QUrl(Resources.Endpoint.value)
+    url.setPort(port)
+    return url.toString()
+
+
+class ReplyDecoder:
+    """
+    Incrementally decodes the content of a reply according to its Content-Encoding header.
+    """
+    def __init__(self, encoding):
+        """
+        Initialize the decoder.
+        :type encoding: str
+        """
+        encoding = encoding.strip().lower()
+        self.decompressor = None
+        if encoding in ('gzip', 'x-gzip', 'deflate'):
+            # AUTOMATIC DETECTION OF GZIP AND ZLIB HEADERS
+            self.decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS)
+        elif encoding == 'zstd':
+            if not zstandard:
+                raise BlackbirdRequestError('zstd decompression requires the zstandard package')
+            self.decompressor = zstandard.ZstdDecompressor().decompressobj()
+        elif encoding not in ('', 'identity'):
+            raise BlackbirdRequestError('Unsupported content encoding: {}'.format(encoding))
+
+    def decode(self, data):
+        """
+        Returns the decoded content of the given chunk of data.
+        :type data: bytes
+        :rtype: bytes
+        """
+        if self.decompressor:
+            return self.decompressor.decompress(data)
+        return data
+
+    def flush(self):
+        """
+        Returns the decoded content still buffered by the decoder.
+        :rtype: bytes
+        """
+        if self.decompressor:
+            return self.decompressor.flush()
+        return b''
+
+
 class NetworkManager(QtNetwork.QNetworkAccessManager):
     """
     Subclass of QNetworkAccessManager used for REST request to the Blackbird API.
+    When several engines are available, requests are balanced among them: requests over a schema
+    are sticky to the engine holding it, while the others go to the least busy engine, round-robin.
     """
     OWL = QtNetwork.QNetworkRequest.Attribute(7001)
     SchemaName = QtNetwork.QNetworkRequest.Attribute(7002)
+    Action = QtNetwork.QNetworkRequest.Attribute(7003)
+    Endpoint = QtNetwork.QNetworkRequest.Attribute(7004)
+    Resource = QtNetwork.QNetworkRequest.Attribute(7005)
+    TableName = QtNetwork.QNetworkRequest.Attribute(7006)
+
+    def __init__(self, parent=None, endpoint=Resources.Endpoint.value):
+        """
+        Initialize the network manager.
+        :type parent: QObject
+        :type endpoint: str
+        """
+        super().__init__(parent)
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        self.endpoint = endpoint
+        self.endpoints = [endpoint]
+        self.schemaEndpoints = {}
+        self.load = {}
+        self.nextEndpoint = 0
+        self.maxInFlight = max(1, settings.value('blackbird/network/requests', 6, int))
+        self.compression = Encoding.valueOf(settings.value('blackbird/network/compression', 'identity', str))
+        if not self.compression or (self.compression is Encoding.Zstd and not zstandard):
+            self.compression = Encoding.Identity
+        self.decoders = {}
+
+    #############################################
+    #   SLOTS
+    #################################
+
+    @QtCore.pyqtSlot()
+    def onReplyFinished(self):
+        """
+        Executed when a reply issued to one of the engines completes.
+        """
+        endpoint = self.sender().request().attribute(self.Endpoint)
+        if endpoint in self.load:
+            self.load[endpoint] = max(0, self.load[endpoint] - 1)
+
+    @QtCore.pyqtSlot()
+    def onDecodedReplyFinished(self):
+        """
+        Executed when a reply whose content is being decoded completes.
+        Aborted and failed replies with no content left to read are not read to the end: drop their decoder.
+        """
+        reply = self.sender()
+        if reply.error() != QtNetwork.QNetworkReply.NoError and not reply.bytesAvailable():
+            self.decoders.pop(reply, None)
+
+    @QtCore.pyqtSlot('QObject*')
+    def onDecodedReplyDestroyed(self, reply):
+        """
+        Executed when a reply whose content is being decoded is destroyed.
+        :type reply: QNetworkReply
+        """
+        self.decoders.pop(reply, None)
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    def bindSchema(self, schemaName, reply):
+        """
+        Bind the schema identified by schemaName to the engine that served the given reply,
+        so that the following requests over the schema are issued to the engine holding it.
+        :type schemaName: str
+        :type reply: QNetworkReply
+        """
+        endpoint = reply.request().attribute(self.Endpoint)
+        if schemaName and endpoint in self.endpoints:
+            self.schemaEndpoints[schemaName] = endpoint
+
+    def endpointFor(self, schemaName=None):
+        """
+        Returns the endpoint requests over the schema identified by schemaName are issued to.
+        Schemas are bound to an engine upon their first request, while requests not concerning a schema
+        are issued to the engine with the fewest requests in flight, round-robin among equally busy ones.
+        :type schemaName: str
+        :rtype: str
+        """
+        if len(self.endpoints) == 1:
+            return self.endpoints[0]
+        endpoint = self.schemaEndpoints.get(schemaName)
+        if not endpoint:
+            count = len(self.endpoints)
+            candidates = [self.endpoints[(self.nextEndpoint + i) % count] for i in range(count)]
+            endpoint = min(candidates, key=lambda e: self.load.get(e, 0))
+            self.nextEndpoint = (self.endpoints.index(endpoint) + 1) % count
+            if schemaName:
+                self.schemaEndpoints[schemaName] = endpoint
+        return endpoint
+
+    def setEndpoints(self, endpoints):
+        """
+        Set the endpoints of the engines requests are balanced among, falling back to the
+        default endpoint if there is none. Schemas bound to a dropped engine are unbound.
+        :type endpoints: list
+        """
+        self.endpoints = list(endpoints) or [self.endpoint]
+        self.nextEndpoint = 0
+        self.schemaEndpoints = {k: v for k, v in self.schemaEndpoints.items() if v in self.endpoints}
+
+    def newRequest(self, resource, *args, idempotent=False, schemaName=None):
+        """
+        Returns a new request for the given resource, formatted with the given arguments.
+        Connections are kept alive across requests, and idempotent requests may be pipelined over them.
+        The request is addressed to the engine selected by the load balancer for the given schema.
+        :type resource: Resources
+        :type args: str
+        :type idempotent: bool
+        :type schemaName: str
+        :rtype: QNetworkRequest
+        """
+        endpoint = self.endpointFor(schemaName)
+        url = resource.value.format(*args)
+        if endpoint != Resources.Endpoint.value:
+            url = url.replace(Resources.Endpoint.value, endpoint, 1)
+        request = QtNetwork.QNetworkRequest(QtCore.QUrl(url))
+        request.setAttribute(self.Endpoint, endpoint)
+        request.setAttribute(self.Resource, resource.name)
+        request.setRawHeader(b'Connection', b'keep-alive')
+        # SETTING THE HEADER DISABLES THE TRANSPARENT DECOMPRESSION: REPLIES ARE DECODED BY readAll()
+        request.setRawHeader(b'Accept-Encoding', Encoding.accepted())
+        if idempotent:
+            request.setAttribute(QtNetwork.QNetworkRequest.HttpPipeliningAllowedAttribute, True)
+        return request
+
+    def get(self, request):
+        """
+        Issue a GET request, accounting it to the load of the engine it is addressed to.
+        :type request: QNetworkRequest
+        :rtype: QNetworkReply
+        """
+        return self.track(super().get(request))
+
+    def post(self, request, data):
+        """
+        Issue a POST request, accounting it to the load of the engine it is addressed to.
+        :type request: QNetworkRequest
+        :type data: bytes
+        :rtype: QNetworkReply
+        """
+        return self.track(super().post(request, data))
+
+    def put(self, request, data):
+        """
+        Issue a PUT request, accounting it to the load of the engine it is addressed to.
+        :type request: QNetworkRequest
+        :type data: bytes
+        :rtype: QNetworkReply
+        """
+        return self.track(super().put(request, data))
+
+    def readAll(self, reply):
+        """
+        Returns the decoded content available in the given reply.
+        The content of compressed replies is decompressed incrementally, as it is read: the decoder
+        is released once the reply is read to the end, fails, is aborted or is destroyed.
+        :type reply: QNetworkReply
+        :rtype: bytes
+        """
+        decoder = self.decoders.get(reply)
+        if not decoder:
+            decoder = self.decoders[reply] = ReplyDecoder(str(reply.rawHeader(b'Content-Encoding'), encoding='ascii'))
+            connect(reply.finished, self.onDecodedReplyFinished)
+            connect(reply.destroyed, self.onDecodedReplyDestroyed)
+        data = decoder.decode(bytes(reply.readAll()))
+        if reply.isFinished() and not reply.bytesAvailable():
+            data += decoder.flush()
+            del self.decoders[reply]
+        return data
 
     def getAllSchemas(self):
         """
         Get the list of schemas from the Blackbird engine.
         :rtype: QNetworkReply
         """
-        url = QtCore.QUrl(Resources.Schema.value)
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.Schema, idempotent=True)
         reply = self.get(request)
         return reply
 
@@ -77,14 +342,16 @@ class NetworkManager(QtNetwork.QNetworkAccessManager):
         returning the corresponding reply.
         It is responsibility of the caller to delete the reply once
         the processing completes by calling its 'deleteLater()' method.
-        :type owl: str
+        The ontology is expected to be UTF-8 encoded, and is compressed if enabled in the plugin settings.
+        :type owl: bytes
         :rtype: QNetworkReply
         """
-        url = QtCore.QUrl(Resources.Schema.value)
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.Schema)
         request.setHeader(QtNetwork.QNetworkRequest.ContentTypeHeader, 'text/plain;charset=utf-8')
         request.setAttribute(self.OWL, owl)
-        reply = self.post(request, bytes(owl))
+        if self.compression is not Encoding.Identity:
+            request.setRawHeader(b'Content-Encoding', self.compression.value.encode('ascii'))
+        reply = self.post(request, compress(owl, self.compression))
         return reply
 
     def getSchema(self, schemaName):
@@ -95,8 +362,7 @@ class NetworkManager(QtNetwork.QNetworkAccessManager):
         """
         if not schemaName:
             raise BlackbirdRequestError('Schema name must not be empty')
-        url = QtCore.QUrl(Resources.Schema.value.format(schemaName))
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.Schema, schemaName, idempotent=True, schemaName=schemaName)
         reply = self.get(request)
         return reply
 
@@ -108,8 +374,7 @@ class NetworkManager(QtNetwork.QNetworkAccessManager):
         """
         if not schemaName:
             raise BlackbirdRequestError('Schema name must not be empty')
-        url = QtCore.QUrl(Resources.SchemaHistoryByName.value.format(schemaName))
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.SchemaHistoryByName, schemaName, idempotent=True, schemaName=schemaName)
         reply = self.get(request)
         return reply
 
@@ -121,8 +386,7 @@ class NetworkManager(QtNetwork.QNetworkAccessManager):
         """
         if not schemaName:
             raise BlackbirdRequestError('Schema name must not be empty')
-        url = QtCore.QUrl(Resources.Schema.value.format(schemaName))
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.Schema, schemaName, schemaName=schemaName)
         reply = self.delete(request)
         return reply
 
@@ -139,13 +403,32 @@ class NetworkManager(QtNetwork.QNetworkAccessManager):
             raise BlackbirdRequestError('Action must not be empty')
         actionJsonStr = RelationalTableActionDecoder().encode(action)
         encodedSchemaName = self.encodeUrl(schemaName, '')
-        url = QtCore.QUrl(Resources.SchemaApplyActionByName.value.format(encodedSchemaName))
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.SchemaApplyActionByName, encodedSchemaName, schemaName=schemaName)
         request.setHeader(QtNetwork.QNetworkRequest.ContentTypeHeader, 'application/json;charset=utf-8')
+        request.setAttribute(self.Action, action)
         byteContent = bytes(actionJsonStr, encoding='utf8')
         reply = self.put(request, byteContent)
         return reply
 
+    def putActionsToSchema(self, schemaName, actions):
+        """
+        Apply the given actions, in order, over the schema identified by schemaName.
+        Each action is applied over the schema resulting from the previous ones, hence the requests
+        are issued one at a time over the same persistent connection.
+        The action carried by each reply is available through its request 'Action' attribute.
+        :type schemaName: str
+        :type actions: list
+        :rtype: RequestQueue
+        """
+        if not schemaName:
+            raise BlackbirdRequestError('Schema name must not be empty')
+        if not actions or not all(actions):
+            raise BlackbirdRequestError('Actions must not be empty')
+        queue = RequestQueue(self, maxInFlight=1)
+        for action in actions:
+            queue.enqueue(self.putActionToSchema, schemaName, action)
+        return queue
+
     def putUndoToSchema(self, schemaName):
         """
         Undo the last action applied over the schema identified by schemaName
@@ -156,8 +439,7 @@ class NetworkManager(QtNetwork.QNetworkAccessManager):
             raise BlackbirdRequestError('Schema name must not be empty')
         emptyJsonStr = ''
         encodedSchemaName = self.encodeUrl(schemaName, '')
-        url = QtCore.QUrl(Resources.SchemaUndoByName.value.format(encodedSchemaName))
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.SchemaUndoByName, encodedSchemaName, schemaName=schemaName)
         request.setHeader(QtNetwork.QNetworkRequest.ContentTypeHeader, 'application/json')
         reply = self.put(request, bytes(emptyJsonStr, encoding='utf8'))
         return reply
@@ -170,8 +452,7 @@ class NetworkManager(QtNetwork.QNetworkAccessManager):
         """
         if not schemaName:
             raise BlackbirdRequestError('Schema name must not be empty')
-        url = QtCore.QUrl(Resources.SchemaTables.value.format(schemaName))
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.SchemaTables, schemaName, idempotent=True, schemaName=schemaName)
         reply = self.get(request)
         return reply
 
@@ -186,8 +467,9 @@ class NetworkManager(QtNetwork.QNetworkAccessManager):
             raise BlackbirdRequestError('Schema name must not be empty')
         if not tableName:
             raise BlackbirdRequestError('Table name must not be empty')
-        url = QtCore.QUrl(Resources.SchemaSingleTable.value.format(schemaName, tableName))
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.SchemaSingleTable, schemaName, tableName,
+                                  idempotent=True, schemaName=schemaName)
+        request.setAttribute(self.TableName, tableName)
         reply = self.get(request)
         return reply
 
@@ -202,20 +484,269 @@ class NetworkManager(QtNetwork.QNetworkAccessManager):
             raise BlackbirdRequestError('Schema name must not be empty')
         if not tableName:
             raise BlackbirdRequestError('Table name must not be empty')
-        url = QtCore.QUrl(Resources.SchemaSingleTableActions.value.format(schemaName, tableName))
-        request = QtNetwork.QNetworkRequest(url)
+        request = self.newRequest(Resources.SchemaSingleTableActions, schemaName, tableName,
+                                  idempotent=True, schemaName=schemaName)
+        request.setAttribute(self.TableName, tableName)
         reply = self.get(request)
         return reply
 
+    def getAllTables(self, schemaName, tableNames):
+        """
+        Get the tables identified by tableNames in the schema identified by schemaName,
+        keeping a bounded number of requests in flight.
+        :type schemaName: str
+        :type tableNames: list
+        :rtype: RequestQueue
+        """
+        queue = RequestQueue(self)
+        for tableName in tableNames:
+            queue.enqueue(self.getTable, schemaName, tableName)
+        return queue
+
+    def getAllActions(self, schemaName, tableNames):
+        """
+        Get the actions that can be applied over the tables identified by tableNames in the schema
+        identified by schemaName, keeping a bounded number of requests in flight.
+        :type schemaName: str
+        :type tableNames: list
+        :rtype: RequestQueue
+        """
+        queue = RequestQueue(self)
+        for tableName in tableNames:
+            queue.enqueue(self.getActions, schemaName, tableName)
+        return queue
+
     def encodeUrl(self, url, safe):
         return urllib.parse.quote(url, safe)
 
+    #############################################
+    #   UTILITIES
+    #################################
+
+    def track(self, reply):
+        """
+        Account the given reply to the load of the engine it is addressed to, until it completes.
+        :type reply: QNetworkReply
+        :rtype: QNetworkReply
+        """
+        endpoint = reply.request().attribute(self.Endpoint)
+        if endpoint:
+            self.load[endpoint] = self.load.get(endpoint, 0) + 1
+            connect(reply.finished, self.onReplyFinished)
+        return reply
+
+
+class RequestQueue(QtCore.QObject):
+    """
+    Issues a batch of requests keeping at most a given number of them in flight, so that they are
+    served over a few persistent connections instead of flooding the network manager.
+    Additionally to built-in signals, this class emits:
+
+    * sgnReplyFinished: whenever a reply of the batch completes.
+    * sgnFinished: whenever all the requests of the batch have completed.
+    """
+    sgnReplyFinished = QtCore.pyqtSignal(QtNetwork.QNetworkReply)
+    sgnFinished = QtCore.pyqtSignal()
+
+    def __init__(self, nmanager, maxInFlight=None):
+        """
+        Initialize the request queue.
+        :type nmanager: NetworkManager
+        :type maxInFlight: int
+        """
+        super().__init__(nmanager)
+        self.maxInFlight = maxInFlight or nmanager.maxInFlight
+        self.pending = deque()
+        self.inFlight = set()
+
+    #############################################
+    #   SLOTS
+    #################################
+
+    @QtCore.pyqtSlot()
+    def onReplyFinished(self):
+        """
+        Executed when a reply of the batch completes.
+        """
+        reply = self.sender()
+        self.inFlight.discard(reply)
+        self.sgnReplyFinished.emit(reply)
+        self.issue()
+        if self.isFinished():
+            self.sgnFinished.emit()
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    def abort(self):
+        """
+        Drop the pending requests and abort the ones in flight.
+        """
+        self.pending.clear()
+        for reply in list(self.inFlight):
+            reply.abort()
+
+    def clear(self):
+        """
+        Drop the pending requests, letting the ones in flight complete.
+        """
+        self.pending.clear()
+        if self.isFinished():
+            self.sgnFinished.emit()
+
+    def enqueue(self, request, *args):
+        """
+        Enqueue the request issued by calling the given network manager method with the given arguments.
+        :type request: callable
+        :type args: str
+        """
+        self.pending.append((request, args))
+        self.issue()
+
+    def isFinished(self):
+        """
+        Returns True if all the requests of the batch have completed, False otherwise.
+        :rtype: bool
+        """
+        return not self.pending and not self.inFlight
+
+    def issue(self):
+        """
+        Issue pending requests until the in-flight bound is reached.
+        """
+        while self.pending and len(self.inFlight) < self.maxInFlight:
+            request, args = self.pending.popleft()
+            reply = request(*args)
+            self.inFlight.add(reply)
+            connect(reply.finished, self.onReplyFinished)
+
+
+class RequestCoordinator(QtCore.QObject):
+    """
+    Coordinates the requests issued to the Blackbird engine over named channels,
+    so that only the response to the newest request of each channel is processed.
+    A request identical to the newest one still in flight on its channel is coalesced with it,
+    while any other request supersedes the ones in flight, aborting those that are safe to abort.
+    """
+    def __init__(self, nmanager):
+        """
+        Initialize the request coordinator.
+        :type nmanager: NetworkManager
+        """
+        super().__init__(nmanager)
+        self.nmanager = nmanager
+        self.current = {}
+        self.inFlight = {}
+        self.keys = {}
+        self.abortable = set()
+
+    #############################################
+    #   SLOTS
+    #################################
+
+    @QtCore.pyqtSlot()
+    def onReplyFinished(self):
+        """
+        Executed when a coordinated reply completes.
+        """
+        reply = self.sender()
+        for replies in self.inFlight.values():
+            if reply in replies:
+                replies.remove(reply)
+        self.keys.pop(reply, None)
+        self.abortable.discard(reply)
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    def claim(self, channel, request):
+        """
+        Make the given request, issued outside of the coordinator (e.g. a batch of requests), the newest one
+        of the given channel, superseding the requests in flight over it: any request issued afterwards
+        over the channel supersedes the given one in turn.
+        :type channel: str
+        :type request: QObject
+        """
+        self.supersede(channel)
+        self.current[channel] = request
+
+    def isCurrent(self, channel, reply):
+        """
+        Returns True if the given reply answers the newest request issued over the given channel, False otherwise.
+        :type channel: str
+        :type reply: QObject
+        :rtype: bool
+        """
+        return self.current.get(channel) is reply
+
+    def isPending(self, channel):
+        """
+        Returns True if the newest request issued over the given channel is still in flight, False otherwise.
+        :type channel: str
+        :rtype: bool
+        """
+        return self.current.get(channel) in self.inFlight.get(channel, ())
+
+    def issue(self, channel, key, request, *args, abortable=False):
+        """
+        Issue the request performed by calling the given network manager method with the given arguments,
+        superseding the requests in flight over the given channel.
+        Returns None if the request has been coalesced with an identical one still in flight.
+        :type channel: str
+        :type key: object
+        :type request: callable
+        :type args: object
+        :type abortable: bool
+        :rtype: QNetworkReply
+        """
+        if key is not None and self.isPending(channel) and self.keys.get(self.current[channel]) == key:
+            LOGGER.debug('Request {} coalesced with the one in flight over channel {}'.format(key, channel))
+            return None
+        reply = request(*args)
+        superseded = list(self.inFlight.get(channel, ()))
+        # ABORTED REPLIES FINISH SYNCHRONOUSLY: THE NEW REPLY MUST ALREADY BE THE CURRENT ONE
+        self.current[channel] = reply
+        self.inFlight.setdefault(channel, []).append(reply)
+        self.keys[reply] = key
+        if abortable:
+            self.abortable.add(reply)
+        connect(reply.finished, self.onReplyFinished)
+        self.abort(superseded)
+        return reply
+
+    def supersede(self, channel):
+        """
+        Supersede the requests in flight over the given channel, aborting those that are safe to abort.
+        :type channel: str
+        """
+        self.current.pop(channel, None)
+        self.abort(list(self.inFlight.get(channel, ())))
+
+    #############################################
+    #   UTILITIES
+    #################################
+
+    def abort(self, replies):
+        """
+        Abort the given replies that are safe to abort.
+        :type replies: list
+        """
+        for reply in replies:
+            if reply in self.abortable:
+                reply.abort()
+
 
 # A specialised JSONEncoder that encodes RelationalTableAction objects as JSON
 class RelationalTableActionDecoder(JSONEncoder):
     def default(self, o):
         if isinstance(o, RelationalTableAction):
-            return o.__dict__
+            return {
+                'actionSubjectTableName': o.actionSubjectTableName,
+                'actionType': o.actionType,
+                'actionObjectsNames': list(o.actionObjectsNames),
+            }
         else:
             return JSONEncoder.default(self, o)
 
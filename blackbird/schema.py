@@ -23,6 +23,10 @@
 ##########################################################################
 
 
+import codecs
+import json
+import re
+import sys
 from enum import unique
 
 from eddy.core.datatypes.common import IntEnum_
@@ -31,6 +35,48 @@ from eddy.core.output import getLogger
 LOGGER = getLogger()
 
 
+def intern(value):
+    """
+    Returns the canonical (interned) copy of the given string, so that
+    equal IRIs, names and types coming from different parts of the schema
+    description share a single object. Non-string values are returned as is.
+    :type value: str
+    :rtype: str
+    """
+    if type(value) is str:
+        return sys.intern(value)
+    return value
+
+
+def keyOf(value):
+    """
+    Returns the value identity of the given schema object, or None for a missing object.
+    :type value: object
+    :rtype: tuple
+    """
+    return value.key if value is not None else None
+
+
+def keysOf(values):
+    """
+    Returns the value identities of the given schema objects, as a tuple.
+    :type values: list
+    :rtype: tuple
+    """
+    return tuple(value.key for value in values or ())
+
+
+def internAll(values):
+    """
+    Returns an immutable tuple holding the interned copy of the given strings.
+    :type values: Iterable[str]
+    :rtype: tuple
+    """
+    if values is None:
+        return tuple()
+    return tuple(intern(value) for value in values)
+
+
 @unique
 class EntityType(IntEnum_):
     """
@@ -63,7 +109,7 @@ class RelationalSchemaParser:
     def getSchema(schema_json_data):
         tables = list()
         schemaActions = list()
-        schemaForeignKeys = list()
+        schemaForeignKeys = dict()
         schemaName = schema_json_data["schemaName"]
         schemaId = schema_json_data["id"]
         jsonTables = schema_json_data["tables"]
@@ -106,17 +152,17 @@ class RelationalSchemaParser:
             for jsonUnique in jsonUniques:
                 unique = RelationalSchemaParser.getUnique(jsonUnique)
                 uniques.append(unique)
-        foreignKeys = list()
+        # DICTIONARIES ARE USED AS INSERTION-ORDERED SETS TO DISCARD DUPLICATED FKS
+        foreignKeys = dict()
         jsonFKs = jsonTable["foreignKeyConstraints"]
         if jsonFKs:
             for jsonFK in jsonFKs:
                 fkName = jsonFK["fkName"]
                 LOGGER.debug('### Parsing FK {}'.format(fkName))
                 fk = RelationalSchemaParser.getForeignKey(jsonFK)
-                if not fk in foreignKeys:
-                    foreignKeys.append(fk)
-                if not fk in schemaForeignKeys:
-                    schemaForeignKeys.append(fk)
+                fk = schemaForeignKeys.setdefault(fk, fk)
+                foreignKeys.setdefault(fk, fk)
+        foreignKeys = list(foreignKeys)
         tableId = jsonTable["id"]
         actions = list()
         tableActions = jsonTable["tableActions"]
@@ -174,18 +220,230 @@ class RelationalSchemaParser:
         return RelationalTableAction(subjectName, actionType, objectsNames)
 
 
+class RelationalSchemaStreamParser:
+    """
+    Incremental parser that builds a RelationalSchema out of its JSON description while it is being received.
+    Tables are parsed one at a time, as soon as their JSON representation is complete, so that
+    the whole JSON document never needs to be materialised in memory.
+
+    USAGE:
+
+    >>> parser = RelationalSchemaStreamParser()
+    >>> for chunk in chunks:
+    >>>     tables = parser.feed(chunk)
+    >>> schema = parser.close()
+    """
+    ObjectStart = 0
+    Key = 1
+    Colon = 2
+    Value = 3
+    TablesStart = 4
+    Table = 5
+    Done = 6
+
+    _Incomplete = object()
+    _MinWindow = 4096
+    _RE_SPACE = re.compile(rb'\s*')
+    _RE_SCALAR_END = re.compile(rb'[\s,}\]]')
+
+    def __init__(self):
+        """
+        Initialize the parser.
+        """
+        self._jsonDecoder = json.JSONDecoder()
+        self._buffer = bytearray()
+        self._pos = 0
+        self._window = RelationalSchemaStreamParser._MinWindow
+        self._state = RelationalSchemaStreamParser.ObjectStart
+        self._key = None
+        self._retryAt = 0
+        self._fields = {}
+        self._tables = list()
+        self._schemaActions = list()
+        self._schemaForeignKeys = dict()
+
+    @property
+    def tables(self):
+        """
+        Returns the tables parsed so far.
+        :rtype: list
+        """
+        return self._tables
+
+    def feed(self, data):
+        """
+        Feed the parser with the next chunk of the UTF-8 encoded JSON document,
+        returning the tables whose parsing has been completed by this chunk.
+        :type data: bytes
+        :rtype: list
+        """
+        count = len(self._tables)
+        self._buffer.extend(data)
+        self._consume()
+        return self._tables[count:]
+
+    def close(self):
+        """
+        Complete the parsing process and returns the parsed schema.
+        :rtype: RelationalSchema
+        """
+        self._consume(final=True)
+        if self._state != RelationalSchemaStreamParser.Done:
+            raise RelationalSchemaParseError('Unexpected end of schema document')
+        try:
+            schemaName = self._fields['schemaName']
+            schemaId = self._fields['id']
+        except KeyError as e:
+            raise RelationalSchemaParseError('Missing schema attribute: {}'.format(e))
+        LOGGER.debug('############# Size of schemaForeignKeys={}'.format(len(self._schemaForeignKeys)))
+        return RelationalSchema(schemaName, schemaId, self._tables, self._schemaActions)
+
+    def _consume(self, final=False):
+        """
+        Consume the buffered input as far as possible.
+        :type final: bool
+        """
+        while self._skipWhitespaces():
+            char = self._buffer[self._pos:self._pos + 1]
+            if self._state == RelationalSchemaStreamParser.ObjectStart:
+                self._expect(char, b'{')
+                self._state = RelationalSchemaStreamParser.Key
+            elif self._state == RelationalSchemaStreamParser.Key:
+                if char == b',':
+                    self._pos += 1
+                elif char == b'}':
+                    self._pos += 1
+                    self._state = RelationalSchemaStreamParser.Done
+                else:
+                    self._expect(char, b'"', consume=False)
+                    key = self._scanValue(final)
+                    if key is RelationalSchemaStreamParser._Incomplete:
+                        break
+                    self._key = key
+                    self._state = RelationalSchemaStreamParser.Colon
+            elif self._state == RelationalSchemaStreamParser.Colon:
+                self._expect(char, b':')
+                if self._key == 'tables':
+                    self._state = RelationalSchemaStreamParser.TablesStart
+                else:
+                    self._state = RelationalSchemaStreamParser.Value
+            elif self._state == RelationalSchemaStreamParser.Value:
+                value = self._scanValue(final)
+                if value is RelationalSchemaStreamParser._Incomplete:
+                    break
+                self._fields[self._key] = value
+                self._state = RelationalSchemaStreamParser.Key
+            elif self._state == RelationalSchemaStreamParser.TablesStart:
+                self._expect(char, b'[')
+                self._state = RelationalSchemaStreamParser.Table
+            elif self._state == RelationalSchemaStreamParser.Table:
+                if char == b',':
+                    self._pos += 1
+                elif char == b']':
+                    self._pos += 1
+                    self._state = RelationalSchemaStreamParser.Key
+                else:
+                    jsonTable = self._scanValue(final)
+                    if jsonTable is RelationalSchemaStreamParser._Incomplete:
+                        break
+                    table = RelationalSchemaParser.getTable(jsonTable, self._schemaActions, self._schemaForeignKeys)
+                    self._tables.append(table)
+                    # DISCARD THE CONSUMED INPUT IN PLACE
+                    del self._buffer[:self._pos]
+                    self._pos = 0
+            else:
+                raise RelationalSchemaParseError('Unexpected content after schema document: {}'.format(
+                    char.decode('utf-8', errors='replace')))
+
+    def _expect(self, char, expected, consume=True):
+        """
+        Make sure the given character matches the expected one, optionally consuming it.
+        :type char: bytearray
+        :type expected: bytes
+        :type consume: bool
+        """
+        if char != expected:
+            raise RelationalSchemaParseError('Expected \'{}\' at offset {}, found \'{}\''.format(
+                expected.decode('ascii'), self._pos, char.decode('utf-8', errors='replace')))
+        if consume:
+            self._pos += 1
+
+    def _skipWhitespaces(self):
+        """
+        Skip whitespaces in the buffer, returning True if there is more input to process.
+        :rtype: bool
+        """
+        self._pos = RelationalSchemaStreamParser._RE_SPACE.match(self._buffer, self._pos).end()
+        return self._pos < len(self._buffer)
+
+    def _scanValue(self, final=False):
+        """
+        Decode the JSON value starting at the current position, returning the decoded
+        value or the _Incomplete marker if the value is not entirely buffered yet.
+        Decoding of an incomplete value is retried only once the pending input has
+        doubled in size, so that the overall decoding effort stays linear.
+        Only a window of the buffered input, sized after the previous value, is decoded
+        at first, and the window is doubled until it holds the whole value.
+        :type final: bool
+        """
+        buffer = self._buffer
+        if not final:
+            if len(buffer) < self._retryAt:
+                return RelationalSchemaStreamParser._Incomplete
+            if buffer[self._pos] not in b'{["':
+                # SCALARS ARE COMPLETE ONLY WHEN FOLLOWED BY A DELIMITER
+                if not RelationalSchemaStreamParser._RE_SCALAR_END.search(buffer, self._pos):
+                    return RelationalSchemaStreamParser._Incomplete
+        available = len(buffer) - self._pos
+        window = min(self._window, available)
+        while True:
+            try:
+                text, consumed = codecs.utf_8_decode(buffer[self._pos:self._pos + window], 'strict',
+                                                     final and window == available)
+            except UnicodeDecodeError as e:
+                raise RelationalSchemaParseError('Malformed schema document: {}'.format(e))
+            try:
+                value, end = self._jsonDecoder.raw_decode(text)
+                # A VALUE ENDING WITH THE WINDOW MAY BE A TRUNCATED SCALAR
+                if end < len(text) or window == available:
+                    break
+            except ValueError as e:
+                if window == available:
+                    if final:
+                        raise RelationalSchemaParseError('Malformed schema document: {}'.format(e))
+                    self._retryAt = 2 * len(buffer) - self._pos
+                    return RelationalSchemaStreamParser._Incomplete
+            window = min(2 * window, available)
+        # OFFSETS IN THE DECODED TEXT ARE BYTE OFFSETS AS WELL, UNLESS IT HOLDS NON-ASCII CHARACTERS
+        size = end if consumed == len(text) else len(text[:end].encode('utf-8'))
+        self._pos += size
+        self._window = max(2 * size, RelationalSchemaStreamParser._MinWindow)
+        self._retryAt = 0
+        return value
+
+
 class RelationalSchema:
+    __slots__ = ('_name', '_id', '_tables', '_actions', '_foreignKeys', '_tableByName', '_tableById',
+                 '_tableByEntityFullIRI', '_tableByEntityShortIRI')
+
     def __init__(self, name, id, tables, actions):
         self._name = name
         self._id = id
         self._tables = tables
         self._actions = actions
         # self._foreignKeys = foreignKeys
-        self._foreignKeys = list()
+        self._foreignKeys = dict()
+        self._tableByName = {}
+        self._tableById = {}
+        self._tableByEntityFullIRI = {}
+        self._tableByEntityShortIRI = {}
         if self._tables:
             for table in self._tables:
                 if table.foreignKeys:
-                    self._foreignKeys.extend(table.foreignKeys)
+                    for fk in table.foreignKeys:
+                        self._foreignKeys.setdefault(fk, fk)
+                self._indexTable(table)
+        self._foreignKeys = list(self._foreignKeys)
 
     @property
     def id(self):
@@ -207,17 +465,49 @@ class RelationalSchema:
     def foreignKeys(self):
         return self._foreignKeys
 
+    def _indexTable(self, table):
+        """
+        Add the given table to the lookup indexes of the schema.
+        In case of clashing keys the first indexed table is retained.
+        :type table: RelationalTable
+        """
+        self._tableByName.setdefault(table.name, table)
+        self._tableById.setdefault(table.id, table)
+        if table.entity:
+            self._tableByEntityFullIRI.setdefault(table.entity.fullIRI, table)
+            self._tableByEntityShortIRI.setdefault(table.entity.shortIRI, table)
+
     def getTableByName(self, tableName):
-        for table in self.tables:
-            if table.name == tableName:
-                return table
-        return None
+        """
+        Returns the table with the given name, or None if no such table exists.
+        :type tableName: str
+        :rtype: RelationalTable
+        """
+        return self._tableByName.get(tableName)
+
+    def getTableById(self, tableId):
+        """
+        Returns the table with the given id, or None if no such table exists.
+        :type tableId: str
+        :rtype: RelationalTable
+        """
+        return self._tableById.get(tableId)
 
     def getTableByEntityIRI(self, fullIRI):
-        for table in self.tables:
-            if table.entity.fullIRI == fullIRI:
-                return table
-        return None
+        """
+        Returns the table originated by the entity with the given full IRI, or None if no such table exists.
+        :type fullIRI: str
+        :rtype: RelationalTable
+        """
+        return self._tableByEntityFullIRI.get(fullIRI)
+
+    def getTableByEntityShortIRI(self, shortIRI):
+        """
+        Returns the table originated by the entity with the given short IRI, or None if no such table exists.
+        :type shortIRI: str
+        :rtype: RelationalTable
+        """
+        return self._tableByEntityShortIRI.get(shortIRI)
 
     def __str__(self):
         tablesStr = "\n\n".join(map(str, self.tables))
@@ -226,14 +516,16 @@ class RelationalSchema:
 
 
 class RelationalTable:
+    __slots__ = ('_name', '_entity', '_columns', '_primaryKey', '_uniques', '_foreignKeys', '_id', '_actions')
+
     def __init__(self, name, entity, columns, primary_key, uniques, foreign_keys, id, actions):
-        self._name = name
+        self._name = intern(name)
         self._entity = entity
         self._columns = columns
         self._primaryKey = primary_key
         self._uniques = uniques
         self._foreignKeys = foreign_keys
-        self._id = id
+        self._id = intern(id)
         self._actions = actions
 
     @property
@@ -292,12 +584,14 @@ class RelationalTable:
 
 
 class RelationalColumn:
+    __slots__ = ('_columnName', '_entityIRI', '_columnType', '_position', '_id', '_isNullable')
+
     def __init__(self, column_name, entity_IRI, column_type, position, id, is_nullable=True):
-        self._columnName = column_name
+        self._columnName = intern(column_name)
         self._entityIRI = entity_IRI
-        self._columnType = column_type
+        self._columnType = intern(column_type)
         self._position = position
-        self._id = id
+        self._id = intern(id)
         self._isNullable = is_nullable
 
     @property
@@ -324,6 +618,15 @@ class RelationalColumn:
     def isNullable(self):
         return self._isNullable
 
+    @property
+    def key(self):
+        """
+        Returns the value identity of the column, made of everything but its id.
+        :rtype: tuple
+        """
+        entityKey = self._entityIRI.key if self._entityIRI else None
+        return self._columnName, entityKey, self._columnType, self._position, self._isNullable
+
     def __str__(self):
         return '\t\tName: {}\n\t\tEntityIRI: {}\n\t\tColumnType: {}\n\t\t' \
                'Position: {}\n\t\tNullable: {}\n\t\tid:{}\n'.format(self.columnName, self.entityIRI, self.columnType,
@@ -331,9 +634,11 @@ class RelationalColumn:
 
 
 class PrimaryKeyConstraint:
+    __slots__ = ('_name', '_columns')
+
     def __init__(self, name, columns):
-        self._name = name
-        self._columns = columns
+        self._name = intern(name)
+        self._columns = internAll(columns)
 
     @property
     def name(self):
@@ -343,15 +648,25 @@ class PrimaryKeyConstraint:
     def columns(self):
         return self._columns
 
+    @property
+    def key(self):
+        """
+        Returns the value identity of the constraint.
+        :rtype: tuple
+        """
+        return self._name, self._columns
+
     def __str__(self):
         columnsStr = ",".join(map(str, self.columns))
         return '(Name= {}; Columns= [{}])'.format(self.name, columnsStr)
 
 
 class UniqueConstraint:
+    __slots__ = ('_name', '_columns')
+
     def __init__(self, name, columns):
-        self._name = name
-        self._columns = columns
+        self._name = intern(name)
+        self._columns = internAll(columns)
 
     @property
     def name(self):
@@ -361,19 +676,29 @@ class UniqueConstraint:
     def columns(self):
         return self._columns
 
+    @property
+    def key(self):
+        """
+        Returns the value identity of the constraint.
+        :rtype: tuple
+        """
+        return self._name, self._columns
+
     def __str__(self):
         columnsStr = ",".join(map(str, self.columns))
         return '\n\t(Name= {}; Columns= [{}])'.format(self.name, columnsStr)
 
 
 class ForeignKeyConstraint:
+    __slots__ = ('_name', '_srcTable', '_srcColumns', '_tgtTable', '_tgtColumns', '_axiomType')
+
     def __init__(self, name, src_table, src_columns, tgt_table, tgt_columns, axiom_type):
-        self._name = name
-        self._srcTable = src_table
-        self._srcColumns = src_columns
-        self._tgtTable = tgt_table
-        self._tgtColumns = tgt_columns
-        self._axiomType = axiom_type
+        self._name = intern(name)
+        self._srcTable = intern(src_table)
+        self._srcColumns = internAll(src_columns)
+        self._tgtTable = intern(tgt_table)
+        self._tgtColumns = internAll(tgt_columns)
+        self._axiomType = intern(axiom_type)
 
     @property
     def name(self):
@@ -399,6 +724,14 @@ class ForeignKeyConstraint:
     def axiomType(self):
         return self._axiomType
 
+    @property
+    def key(self):
+        """
+        Returns the value identity of the foreign key, made of its name and endpoints.
+        :rtype: tuple
+        """
+        return self._name, self._srcTable, self._srcColumns, self._tgtTable, self._tgtColumns
+
     def equals(self, other):
         if not self.__class__ == other.__class__:
             return False
@@ -417,6 +750,14 @@ class ForeignKeyConstraint:
         #         return False
         return True
 
+    def __eq__(self, other):
+        if not isinstance(other, ForeignKeyConstraint):
+            return NotImplemented
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
     def __str__(self):
         srcColumnsStr = ",".join(map(str, self.srcColumns))
         tgtColumnsStr = ",".join(map(str, self.tgtColumns))
@@ -427,9 +768,11 @@ class ForeignKeyConstraint:
 
 
 class RelationalTableOriginEntity:
+    __slots__ = ('_fullIRI', '_shortIRI', '_entityType', '_entityTypeDescr')
+
     def __init__(self, full_IRI, short_IRI, entity_type):
-        self._fullIRI = full_IRI
-        self._shortIRI = short_IRI
+        self._fullIRI = intern(full_IRI)
+        self._shortIRI = intern(short_IRI)
         self._entityType = entity_type
         self._entityTypeDescr = EntityType.fromValue(entity_type)
 
@@ -449,15 +792,33 @@ class RelationalTableOriginEntity:
     def entityTypeDescription(self):
         return self._entityTypeDescr
 
+    @property
+    def key(self):
+        """
+        Returns the value identity of the entity.
+        :rtype: tuple
+        """
+        return self._fullIRI, self._shortIRI, self._entityType
+
     def __str__(self):
         return '(FullIRI= {};  ShortIRI= {}; Type: {})'.format(self.fullIRI, self.shortIRI, self.entityTypeDescription)
 
 
 class RelationalTableAction:
+    __slots__ = ('actionSubjectTableName', 'actionType', 'actionObjectsNames')
+
     def __init__(self, subject_table, action_type, object_tables):
-        self.actionSubjectTableName = subject_table
-        self.actionType = action_type
-        self.actionObjectsNames = object_tables
+        self.actionSubjectTableName = intern(subject_table)
+        self.actionType = intern(action_type)
+        self.actionObjectsNames = internAll(object_tables)
+
+    @property
+    def key(self):
+        """
+        Returns the value identity of the action.
+        :rtype: tuple
+        """
+        return self.actionSubjectTableName, self.actionType, self.actionObjectsNames
 
     # @property
     # def actionSubjectTableName(self):
@@ -475,3 +836,200 @@ class RelationalTableAction:
         objectTablesStr = ",".join(map(str, self.actionObjectsNames))
         return 'actionSubjectTableName: {} \nActionType: {} \n' \
                'actionObjectsNames: [{}]'.format(self.actionSubjectTableName, self.actionType, objectTablesStr)
+
+
+class RelationalSchemaDiff:
+    """
+    Delta between two versions of a relational schema, computed in linear time.
+    Tables are matched by name, and a table whose name changed while its originating entity did not
+    is reported as renamed. Foreign keys are matched by value.
+    """
+    __slots__ = ('_oldSchema', '_newSchema', '_addedTables', '_removedTables', '_renamedTables',
+                 '_modifiedTables', '_addedForeignKeys', '_removedForeignKeys')
+
+    def __init__(self, old_schema, new_schema):
+        """
+        Compute the delta leading from the old schema to the new one.
+        :type old_schema: RelationalSchema
+        :type new_schema: RelationalSchema
+        """
+        self._oldSchema = old_schema
+        self._newSchema = new_schema
+        self._addedTables = []
+        self._removedTables = []
+        self._renamedTables = []
+        self._modifiedTables = []
+        matchedTables = set()
+        for table in new_schema.tables:
+            oldTable = old_schema.getTableByName(table.name)
+            if oldTable is None and table.entity:
+                oldTable = old_schema.getTableByEntityIRI(table.entity.fullIRI)
+                if oldTable is None or oldTable in matchedTables or new_schema.getTableByName(oldTable.name):
+                    oldTable = None
+                else:
+                    self._renamedTables.append((oldTable, table))
+            if oldTable is None:
+                self._addedTables.append(table)
+                continue
+            matchedTables.add(oldTable)
+            tableDiff = RelationalTableDiff(oldTable, table)
+            if not tableDiff.isEmpty():
+                self._modifiedTables.append(tableDiff)
+        self._removedTables = [table for table in old_schema.tables if table not in matchedTables]
+        oldForeignKeys = set(old_schema.foreignKeys)
+        newForeignKeys = set(new_schema.foreignKeys)
+        self._addedForeignKeys = [fk for fk in new_schema.foreignKeys if fk not in oldForeignKeys]
+        self._removedForeignKeys = [fk for fk in old_schema.foreignKeys if fk not in newForeignKeys]
+
+    @property
+    def oldSchema(self):
+        return self._oldSchema
+
+    @property
+    def newSchema(self):
+        return self._newSchema
+
+    @property
+    def addedTables(self):
+        return self._addedTables
+
+    @property
+    def removedTables(self):
+        return self._removedTables
+
+    @property
+    def renamedTables(self):
+        """
+        Returns the (old table, new table) pairs of the renamed tables.
+        :rtype: list
+        """
+        return self._renamedTables
+
+    @property
+    def modifiedTables(self):
+        """
+        Returns the RelationalTableDiff of each matched table whose definition changed.
+        :rtype: list
+        """
+        return self._modifiedTables
+
+    @property
+    def addedForeignKeys(self):
+        return self._addedForeignKeys
+
+    @property
+    def removedForeignKeys(self):
+        return self._removedForeignKeys
+
+    def isEmpty(self):
+        """
+        Returns True if the two versions of the schema are equivalent, False otherwise.
+        :rtype: bool
+        """
+        return not (self._addedTables or self._removedTables or self._renamedTables or self._modifiedTables or
+                    self._addedForeignKeys or self._removedForeignKeys)
+
+    def __str__(self):
+        return 'Tables: +[{}] -[{}] ~[{}] renamed [{}]\nFKs: +[{}] -[{}]'.format(
+            ','.join(table.name for table in self._addedTables),
+            ','.join(table.name for table in self._removedTables),
+            ','.join(tableDiff.newTable.name for tableDiff in self._modifiedTables),
+            ','.join('{}->{}'.format(old.name, new.name) for old, new in self._renamedTables),
+            ','.join(fk.name for fk in self._addedForeignKeys),
+            ','.join(fk.name for fk in self._removedForeignKeys))
+
+
+class RelationalTableDiff:
+    """
+    Delta between two versions of a relational table. Columns are matched by name.
+    """
+    __slots__ = ('_oldTable', '_newTable', '_addedColumns', '_removedColumns', '_modifiedColumns',
+                 '_addedForeignKeys', '_removedForeignKeys', '_entityChanged', '_primaryKeyChanged',
+                 '_uniquesChanged', '_actionsChanged')
+
+    def __init__(self, old_table, new_table):
+        """
+        Compute the delta leading from the old table to the new one.
+        :type old_table: RelationalTable
+        :type new_table: RelationalTable
+        """
+        self._oldTable = old_table
+        self._newTable = new_table
+        oldColumns = {column.columnName: column for column in old_table.columns or ()}
+        newColumns = {column.columnName: column for column in new_table.columns or ()}
+        self._addedColumns = [column for name, column in newColumns.items() if name not in oldColumns]
+        self._removedColumns = [column for name, column in oldColumns.items() if name not in newColumns]
+        self._modifiedColumns = [(oldColumns[name], column) for name, column in newColumns.items()
+                                 if name in oldColumns and oldColumns[name].key != column.key]
+        oldForeignKeys = set(old_table.foreignKeys or ())
+        newForeignKeys = set(new_table.foreignKeys or ())
+        self._addedForeignKeys = [fk for fk in new_table.foreignKeys or () if fk not in oldForeignKeys]
+        self._removedForeignKeys = [fk for fk in old_table.foreignKeys or () if fk not in newForeignKeys]
+        self._entityChanged = keyOf(old_table.entity) != keyOf(new_table.entity)
+        self._primaryKeyChanged = keyOf(old_table.primaryKey) != keyOf(new_table.primaryKey)
+        self._uniquesChanged = keysOf(old_table.uniques) != keysOf(new_table.uniques)
+        self._actionsChanged = keysOf(old_table.actions) != keysOf(new_table.actions)
+
+    @property
+    def oldTable(self):
+        return self._oldTable
+
+    @property
+    def newTable(self):
+        return self._newTable
+
+    @property
+    def addedColumns(self):
+        return self._addedColumns
+
+    @property
+    def removedColumns(self):
+        return self._removedColumns
+
+    @property
+    def modifiedColumns(self):
+        """
+        Returns the (old column, new column) pairs of the modified columns.
+        :rtype: list
+        """
+        return self._modifiedColumns
+
+    @property
+    def addedForeignKeys(self):
+        return self._addedForeignKeys
+
+    @property
+    def removedForeignKeys(self):
+        return self._removedForeignKeys
+
+    @property
+    def entityChanged(self):
+        return self._entityChanged
+
+    @property
+    def primaryKeyChanged(self):
+        return self._primaryKeyChanged
+
+    @property
+    def uniquesChanged(self):
+        return self._uniquesChanged
+
+    @property
+    def actionsChanged(self):
+        return self._actionsChanged
+
+    def isEmpty(self):
+        """
+        Returns True if the two versions of the table are equivalent, False otherwise.
+        :rtype: bool
+        """
+        return not (self._addedColumns or self._removedColumns or self._modifiedColumns or
+                    self._addedForeignKeys or self._removedForeignKeys or self._entityChanged or
+                    self._primaryKeyChanged or self._uniquesChanged or self._actionsChanged)
+
+
+class RelationalSchemaParseError(Exception):
+    """
+    Raised whenever it's not possible to parse a relational schema out of its JSON description.
+    """
+    pass
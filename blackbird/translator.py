@@ -23,15 +23,23 @@
 ##########################################################################
 
 
+import hashlib
 import os
 import re
+import shutil
 import signal
 import sys
+import tempfile
 import zipfile
-from io import StringIO
+from enum import unique
 
-from PyQt5 import QtCore
+from PyQt5 import (
+    QtCore,
+    QtNetwork
+)
 
+from eddy import ORGANIZATION, APPNAME
+from eddy.core.datatypes.common import Enum_
 from eddy.core.functions.fsystem import fexists, isdir, fread, fwrite, fremove
 from eddy.core.functions.misc import first
 from eddy.core.functions.path import expandPath
@@ -39,49 +47,92 @@ from eddy.core.functions.signals import connect
 from eddy.core.jvm import findJavaHome
 from eddy.core.output import getLogger
 
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird import daemon
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.logbuffer import LogBuffer, LogFileTail
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.rest import NetworkManager, Resources, endpointAtPort
+
 LOGGER = getLogger()
 RE_STARTED = re.compile(r'.*-\sStarted\s@(\d+)ms')
 
 
+@unique
+class EngineState(Enum_):
+    """
+    Enumeration of the lifecycle states of the Blackbird engine.
+    """
+    NotRunning = 'not running'
+    Starting = 'starting'
+    Listening = 'listening'
+    Healthy = 'healthy'
+    Stopping = 'stopping'
+
+
 class BlackbirdProcess(QtCore.QProcess):
     """
     Subclass of QProcess that wraps the Blackbird translator executable.
+    The engine goes through the starting, listening, healthy and stopping states without
+    ever blocking the caller: it is listening once it logs the completion of its startup,
+    and healthy once it answers the HTTP health probe.
+    Additionally to built-in signals, this class emits:
+
+    * sgnReady: whenever the engine becomes healthy.
+    * sgnFinished: whenever the process finishes execution.
+    * sgnErrorOccurred: whenever an error occurs.
+    * sgnStateChanged: whenever the engine changes its lifecycle state.
     """
     sgnReady = QtCore.pyqtSignal()
     sgnFinished = QtCore.pyqtSignal()
     sgnErrorOccurred = QtCore.pyqtSignal()
+    sgnStateChanged = QtCore.pyqtSignal(EngineState)
 
     # noinspection PyArgumentList
-    def __init__(self, path, parent=None):
+    def __init__(self, path, parent=None, nmanager=None, jvmOptions=None, cdsDir=None,
+                 port=None, portArgument='--server.port={}', buffer=None):
         """
         Initialize the BlackbirdProcess instance.
+        When a directory for class data sharing archives is given, the engine classes are dumped
+        into an AppCDS archive the first time the engine exits, and the archive is reused later on.
+        When a port is given, the engine is told to listen on it through the port argument.
+        The engine output is collected in the given log buffer, whose lines are prefixed with
+        the engine port, if any, so that the buffer can be shared by several engines.
+        :type path: str
+        :type parent: QObject
+        :type nmanager: NetworkManager
+        :type jvmOptions: list
+        :type cdsDir: str
+        :type port: int
+        :type portArgument: str
+        :type buffer: LogBuffer
         """
         super().__init__(parent)
-        javaHome = findJavaHome() or ''
-        # Will resort to look for the java executable in PATH
-        self.javaExe = 'java' if not sys.platform.startswith('win32') else 'java.exe'
-        # If we hava JAVA_HOME set then try to use the bundled java executable
-        if isdir(javaHome):
-            # For Java <= 1.8 we use the JDK's private jre path,
-            # this was done for compatibility with pyjnius that
-            # fixes the path to libjvm at compile time.
-            if fexists(os.path.join(javaHome, 'jre', 'bin', self.javaExe)):
-                self.javaExe = os.path.join(javaHome, 'jre', 'bin', self.javaExe)
-            # For java > 1.8 there is no private JRE, so we use the standard path
-            elif fexists(os.path.join(javaHome, 'bin', self.javaExe)):
-                self.javaExe = os.path.join(javaHome, 'bin', self.javaExe)
-            # No java executable under JAVA_HOME so we log an error.
-            # We still try to look for java in PATH though
-            else:
-                LOGGER.error('Unable to locate java executable in JAVA_HOME: {}'.format(javaHome))
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        self.engineState = EngineState.NotRunning
+        self.port = port
+        self.portArgument = portArgument
+        self.endpoint = endpointAtPort(port) if port else Resources.Endpoint.value
+        self.nmanager = nmanager or NetworkManager(self, endpoint=self.endpoint)
+        self.probeReply = None
+        self.probeTimer = QtCore.QTimer(self)
+        self.probeTimer.setInterval(settings.value('blackbird/engine/probeInterval', 500, int))
+        self.stopTimeout = settings.value('blackbird/engine/stopTimeout', 3000, int)
+        self.javaExe = findJavaExecutable()
         self.setProgram(self.javaExe)
-        self.setArguments(['-jar', path])
-        self.buffer = StringIO()
+        self.path = path
+        self.jvmOptions = list(jvmOptions or [])
+        self.cdsArchive = cdsArchivePath(cdsDir, path, self.javaExe, self.jvmOptions, port) if cdsDir else None
+        self.startupTime = None
+        self.updateArguments()
+        self.buffer = buffer or createLogBuffer('blackbird-{}'.format(port) if port else 'blackbird')
+        self.logPrefix = '[{}] '.format(port) if port else ''
         self.runtimeDir = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.RuntimeLocation)
+        self.pidFile = 'blackbird-{}.pid'.format(port) if port else 'blackbird.pid'
         # CHECK FOR PRE-EXISTING FILES TO DEAL WITH ORPHANED PROCESSES
-        if isdir(self.runtimeDir) and fexists(os.path.join(self.runtimeDir, 'blackbird.pid')):
+        if isdir(self.runtimeDir) and fexists(os.path.join(self.runtimeDir, self.pidFile)):
             try:
-                pid = int(fread(os.path.join(self.runtimeDir, 'blackbird.pid')))
+                pid = int(fread(os.path.join(self.runtimeDir, self.pidFile)))
                 LOGGER.warning('Found pre-existing Blackbird process running (PID: {})'.format(pid))
                 # ATTEMPT TO KILL THE PROCESS
                 os.kill(pid, signal.SIGTERM)
@@ -95,6 +146,7 @@ class BlackbirdProcess(QtCore.QProcess):
         connect(self.started, self.onStarted)
         connect(self.finished, self.onFinished)
         connect(self.errorOccurred, self.onErrorOccurred)
+        connect(self.probeTimer.timeout, self.doProbe)
 
     #############################################
     #   SLOTS
@@ -112,8 +164,8 @@ class BlackbirdProcess(QtCore.QProcess):
                 match = RE_STARTED.match(line)
                 if match:
                     LOGGER.info('Blackbird Engine startup completed in {} ms'.format(match.group(1)))
-                    self.sgnReady.emit()
-            self.buffer.write(decoded)
+                    self.onListening(int(match.group(1)))
+            self.buffer.write(decoded, self.logPrefix)
 
     @QtCore.pyqtSlot()
     def onStandardOutputReady(self):
@@ -127,8 +179,8 @@ class BlackbirdProcess(QtCore.QProcess):
                 match = RE_STARTED.match(line)
                 if match:
                     LOGGER.info('Blackbird Engine startup completed in {} ms'.format(match.group(1)))
-                    self.sgnReady.emit()
-            self.buffer.write(decoded)
+                    self.onListening(int(match.group(1)))
+            self.buffer.write(decoded, self.logPrefix)
 
     @QtCore.pyqtSlot()
     def onStarted(self):
@@ -136,10 +188,16 @@ class BlackbirdProcess(QtCore.QProcess):
         Executed when the process is started.
         """
         LOGGER.info('Blackbird process starting (PID: {})'.format(self.processId()))
+        if self.cdsArchive:
+            LOGGER.info('Blackbird Engine {} class data sharing archive {}'.format(
+                'using' if fexists(self.cdsArchive) else 'creating', self.cdsArchive))
+        self.setEngineState(EngineState.Starting)
+        # KEEP PROBING IN CASE THE STARTUP COMPLETION IS NOT LOGGED
+        self.probeTimer.start()
         # WRITE PROCESS ID TO FILE
         if isdir(self.runtimeDir):
             try:
-                fwrite('{:d}'.format(self.processId()), os.path.join(self.runtimeDir, 'blackbird.pid'))
+                fwrite('{:d}'.format(self.processId()), os.path.join(self.runtimeDir, self.pidFile))
             except Exception as e:
                 LOGGER.error('Failed to write PID to file')
                 LOGGER.exception(e)
@@ -153,10 +211,14 @@ class BlackbirdProcess(QtCore.QProcess):
         """
         if exitStatus != QtCore.QProcess.NormalExit:
             LOGGER.warning('Blackbird Engine terminated abnormally (code: {:d})'.format(exitCode))
+        self.probeTimer.stop()
+        self.setEngineState(EngineState.NotRunning)
+        # THE CLASS DATA SHARING ARCHIVE IS DUMPED WHEN THE ENGINE EXITS
+        self.updateArguments()
         # DELETE PID FILE
         if isdir(self.runtimeDir):
             try:
-                fremove(os.path.join(self.runtimeDir, 'blackbird.pid'))
+                fremove(os.path.join(self.runtimeDir, self.pidFile))
             except Exception:
                 pass
         self.sgnFinished.emit()
@@ -170,8 +232,428 @@ class BlackbirdProcess(QtCore.QProcess):
         LOGGER.error('Error starting Blackbird engine: {}'.format(error))
         if self.state() != QtCore.QProcess.NotRunning:
             self.kill()
+        else:
+            self.probeTimer.stop()
+            self.setEngineState(EngineState.NotRunning)
         self.sgnErrorOccurred.emit()
 
+    def onListening(self, startupTime):
+        """
+        Executed when the engine logs the completion of its startup.
+        :type startupTime: int
+        """
+        self.startupTime = startupTime
+        if self.engineState is EngineState.Starting:
+            self.setEngineState(EngineState.Listening)
+            self.doProbe()
+
+    @QtCore.pyqtSlot()
+    def onProbeFinished(self):
+        """
+        Executed when the health probe completes.
+        """
+        reply = self.sender()
+        reply.deleteLater()
+        if reply is self.probeReply:
+            self.probeReply = None
+        # noinspection PyArgumentList
+        if reply.error() == QtNetwork.QNetworkReply.NoError and \
+                self.engineState in {EngineState.Starting, EngineState.Listening}:
+            self.probeTimer.stop()
+            self.setEngineState(EngineState.Healthy)
+            self.sgnReady.emit()
+
+    @QtCore.pyqtSlot()
+    def onStopTimeout(self):
+        """
+        Executed when the engine did not terminate within the stop timeout.
+        """
+        if self.engineState is EngineState.Stopping and self.state() != QtCore.QProcess.NotRunning:
+            LOGGER.warning('Blackbird Engine did not terminate in {} ms: killing it'.format(self.stopTimeout))
+            self.kill()
+
+    @QtCore.pyqtSlot()
+    def doProbe(self):
+        """
+        Probe the engine HTTP endpoint, unless a probe is already in flight.
+        """
+        if self.probeReply or self.engineState not in {EngineState.Starting, EngineState.Listening}:
+            return
+        self.probeReply = self.nmanager.getAllSchemas()
+        connect(self.probeReply.finished, self.onProbeFinished)
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    def isHealthy(self):
+        """
+        Returns True if the engine is running and answering requests, False otherwise.
+        :rtype: bool
+        """
+        return self.engineState is EngineState.Healthy
+
+    def setEngineState(self, state):
+        """
+        Set the lifecycle state of the engine.
+        :type state: EngineState
+        """
+        if state is not self.engineState:
+            LOGGER.debug('Blackbird Engine state changed: {} -> {}'.format(self.engineState.value, state.value))
+            self.engineState = state
+            self.sgnStateChanged.emit(state)
+
+    def updateArguments(self):
+        """
+        Update the process arguments according to the JVM options and the class data sharing archive.
+        """
+        self.setArguments(engineArguments(self.path, self.jvmOptions, self.cdsArchive, self.port, self.portArgument))
+
+    def stop(self, wait=False):
+        """
+        Request the engine to terminate, killing it if it does not terminate within the stop timeout.
+        If wait is True, block until the engine terminates instead of returning immediately.
+        :type wait: bool
+        """
+        if self.state() == QtCore.QProcess.NotRunning:
+            return
+        self.probeTimer.stop()
+        if self.probeReply:
+            self.probeReply.abort()
+        self.setEngineState(EngineState.Stopping)
+        self.terminate()
+        QtCore.QTimer.singleShot(self.stopTimeout, self.onStopTimeout)
+        if wait:
+            self.waitForStopped()
+
+    def waitForStopped(self):
+        """
+        Block until the engine terminates, killing it if it does not terminate within the stop timeout.
+        """
+        if self.state() != QtCore.QProcess.NotRunning and not self.waitForFinished(self.stopTimeout):
+            self.onStopTimeout()
+            self.waitForFinished(self.stopTimeout)
+
+
+class BlackbirdDaemonClient(QtCore.QObject):
+    """
+    Attaches to the Blackbird engine shared across Eddy sessions, starting it if none is running.
+    The engine is run by a detached supervisor (see the daemon module), which stops it once no client
+    has been attached to it for the idle timeout: stopping the client only releases its lease on the engine.
+    This class exposes the same interface of BlackbirdProcess used by the plugin.
+    """
+    sgnReady = QtCore.pyqtSignal()
+    sgnFinished = QtCore.pyqtSignal()
+    sgnErrorOccurred = QtCore.pyqtSignal()
+    sgnStateChanged = QtCore.pyqtSignal(EngineState)
+    errorOccurred = QtCore.pyqtSignal(QtCore.QProcess.ProcessError)
+
+    def __init__(self, path, parent=None, nmanager=None, jvmOptions=None, cdsDir=None, idleTimeout=600):
+        """
+        Initialize the daemon client.
+        :type path: str
+        :type parent: QObject
+        :type nmanager: NetworkManager
+        :type jvmOptions: list
+        :type cdsDir: str
+        :type idleTimeout: int
+        """
+        super().__init__(parent)
+        settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+        self.engineState = EngineState.NotRunning
+        self.nmanager = nmanager or NetworkManager(self)
+        self.path = path
+        self.javaExe = findJavaExecutable()
+        self.jvmOptions = list(jvmOptions or [])
+        self.cdsArchive = cdsArchivePath(cdsDir, path, self.javaExe, self.jvmOptions) if cdsDir else None
+        self.idleTimeout = idleTimeout
+        # THE LEASE FILE IS NAMED AFTER THE PID AND THIS NAME: AN ENGINE POOL KEEPS SEVERAL CLIENTS IN ONE PROCESS
+        self.lease = '{:x}'.format(id(self))
+        self.daemonPid = None
+        self.probeReply = None
+        self.probeInterval = settings.value('blackbird/engine/probeInterval', 500, int)
+        self.probeTimer = QtCore.QTimer(self)
+        runtimeDir = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.RuntimeLocation)
+        self.stateDir = os.path.join(runtimeDir if isdir(runtimeDir) else tempfile.gettempdir(), 'blackbird')
+        self.logTail = LogFileTail(os.path.join(self.stateDir, daemon.LogFile),
+                                   settings.value('blackbird/log/lines', 10000, int))
+        connect(self.probeTimer.timeout, self.doProbe)
+
+    #############################################
+    #   PROPERTIES
+    #################################
+
+    @property
+    def buffer(self):
+        """
+        Returns the output log of the shared engine, which is read lazily from the daemon log file.
+        :rtype: LogFileTail
+        """
+        return self.logTail
+
+    #############################################
+    #   SLOTS
+    #################################
+
+    @QtCore.pyqtSlot()
+    def onProbeFinished(self):
+        """
+        Executed when the health probe completes.
+        """
+        reply = self.sender()
+        reply.deleteLater()
+        if reply is self.probeReply:
+            self.probeReply = None
+        # noinspection PyArgumentList
+        if reply.error() == QtNetwork.QNetworkReply.NoError and self.engineState is EngineState.Starting:
+            # ONCE HEALTHY, ONLY CHECK FROM TIME TO TIME THAT THE DAEMON IS STILL ALIVE
+            self.probeTimer.setInterval(max(self.probeInterval, 5000))
+            self.setEngineState(EngineState.Healthy)
+            self.sgnReady.emit()
+
+    @QtCore.pyqtSlot()
+    def doProbe(self):
+        """
+        Check that the shared engine is still alive, and probe its HTTP endpoint until it is healthy.
+        """
+        info = daemon.readDaemonInfo(self.stateDir)
+        if info and daemon.isAlive(info['pid']):
+            self.daemonPid = info['pid']
+        elif not self.daemonPid or not daemon.isAlive(self.daemonPid):
+            LOGGER.warning('Blackbird Engine daemon terminated')
+            self.detach()
+            return
+        if self.engineState is EngineState.Starting and not self.probeReply:
+            self.probeReply = self.nmanager.getAllSchemas()
+            connect(self.probeReply.finished, self.onProbeFinished)
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    @staticmethod
+    def interpreter():
+        """
+        Returns the Python interpreter used to run the daemon supervisor, or None if there is none.
+        :rtype: str
+        """
+        if not getattr(sys, 'frozen', False):
+            return sys.executable
+        return shutil.which('python3') or shutil.which('python')
+
+    @classmethod
+    def isSupported(cls):
+        """
+        Returns True if the daemon supervisor can be run, False otherwise.
+        The supervisor needs a Python interpreter and its module on disk, which frozen builds
+        may only ship within an archive.
+        :rtype: bool
+        """
+        return bool(cls.interpreter()) and fexists(daemon.__file__)
+
+    def isHealthy(self):
+        """
+        Returns True if the shared engine is running and answering requests, False otherwise.
+        :rtype: bool
+        """
+        return self.engineState is EngineState.Healthy
+
+    def setEngineState(self, state):
+        """
+        Set the lifecycle state of the shared engine, as seen by this client.
+        :type state: EngineState
+        """
+        if state is not self.engineState:
+            LOGGER.debug('Blackbird Engine state changed: {} -> {}'.format(self.engineState.value, state.value))
+            self.engineState = state
+            self.sgnStateChanged.emit(state)
+
+    def start(self):
+        """
+        Attach to the shared engine, starting it if none is running.
+        """
+        if self.engineState is not EngineState.NotRunning:
+            return
+        os.makedirs(self.stateDir, exist_ok=True)
+        info = daemon.readDaemonInfo(self.stateDir)
+        if info and daemon.isAlive(info['pid']):
+            LOGGER.info('Attaching to Blackbird Engine daemon (PID: {})'.format(info['pid']))
+            self.daemonPid = info['pid']
+        else:
+            interpreter = self.interpreter()
+            arguments = [daemon.__file__, '--state-dir', self.stateDir, '--idle-timeout', str(self.idleTimeout), '--']
+            arguments += [self.javaExe] + engineArguments(self.path, self.jvmOptions, self.cdsArchive)
+            started, pid = QtCore.QProcess.startDetached(interpreter or '', arguments, self.stateDir)
+            if not interpreter or not started:
+                LOGGER.error('Error starting Blackbird Engine daemon')
+                self.errorOccurred.emit(QtCore.QProcess.FailedToStart)
+                self.sgnErrorOccurred.emit()
+                return
+            LOGGER.info('Blackbird Engine daemon starting (PID: {})'.format(pid))
+            self.daemonPid = pid
+        daemon.acquireLease(self.stateDir, self.lease)
+        self.setEngineState(EngineState.Starting)
+        self.probeTimer.start(self.probeInterval)
+        self.doProbe()
+
+    def state(self):
+        """
+        Returns the state of the shared engine, as seen by this client.
+        :rtype: ProcessState
+        """
+        if self.engineState is EngineState.NotRunning:
+            return QtCore.QProcess.NotRunning
+        return QtCore.QProcess.Running
+
+    def stop(self, wait=False):
+        """
+        Detach from the shared engine, which keeps running for the other clients.
+        Detaching never blocks, hence wait is accepted only for compatibility with BlackbirdProcess.
+        :type wait: bool
+        """
+        if self.engineState is not EngineState.NotRunning:
+            LOGGER.info('Detaching from Blackbird Engine daemon (PID: {})'.format(self.daemonPid))
+            self.detach()
+
+    #############################################
+    #   UTILITIES
+    #################################
+
+    def detach(self):
+        """
+        Release the lease held on the shared engine.
+        """
+        self.probeTimer.stop()
+        if self.probeReply:
+            self.probeReply.abort()
+        daemon.releaseLease(self.stateDir, self.lease)
+        self.daemonPid = None
+        self.setEngineState(EngineState.NotRunning)
+        self.sgnFinished.emit()
+
+
+class EnginePool(QtCore.QObject):
+    """
+    Runs several Blackbird engines on consecutive ports, so that independent requests,
+    such as previews and full schema generations, are served concurrently.
+    The endpoints of the healthy engines are handed to the network manager, which balances requests among them.
+    This class exposes the same interface of BlackbirdProcess used by the plugin: the pool is healthy
+    as long as any of its engines is, and it is not running once all of them terminated.
+    """
+    sgnReady = QtCore.pyqtSignal()
+    sgnFinished = QtCore.pyqtSignal()
+    sgnErrorOccurred = QtCore.pyqtSignal()
+    sgnStateChanged = QtCore.pyqtSignal(EngineState)
+    errorOccurred = QtCore.pyqtSignal(QtCore.QProcess.ProcessError)
+
+    def __init__(self, path, parent=None, nmanager=None, jvmOptions=None, cdsDir=None,
+                 size=2, port=8080, portArgument='--server.port={}'):
+        """
+        Initialize the engine pool.
+        :type path: str
+        :type parent: QObject
+        :type nmanager: NetworkManager
+        :type jvmOptions: list
+        :type cdsDir: str
+        :type size: int
+        :type port: int
+        :type portArgument: str
+        """
+        super().__init__(parent)
+        self.engineState = EngineState.NotRunning
+        self.nmanager = nmanager or NetworkManager(self)
+        self.buffer = createLogBuffer('blackbird-pool')
+        # EACH ENGINE PROBES ITS OWN ENDPOINT THROUGH A DEDICATED NETWORK MANAGER
+        self.engines = [BlackbirdProcess(path, self, None, jvmOptions, cdsDir, port + i, portArgument, self.buffer)
+                        for i in range(max(1, size))]
+        for engine in self.engines:
+            connect(engine.sgnStateChanged, self.onEngineStateChanged)
+            connect(engine.errorOccurred, self.onEngineErrorOccurred)
+
+    #############################################
+    #   SLOTS
+    #################################
+
+    @QtCore.pyqtSlot(QtCore.QProcess.ProcessError)
+    def onEngineErrorOccurred(self, error):
+        """
+        Executed when an error occurs in one of the engines.
+        The error is only reported once none of the engines is running.
+        :type error: ProcessError
+        """
+        if self.state() == QtCore.QProcess.NotRunning:
+            self.errorOccurred.emit(error)
+            self.sgnErrorOccurred.emit()
+
+    @QtCore.pyqtSlot(EngineState)
+    def onEngineStateChanged(self, _):
+        """
+        Executed when one of the engines changes its lifecycle state.
+        """
+        self.nmanager.setEndpoints([engine.endpoint for engine in self.engines if engine.isHealthy()])
+        states = {engine.engineState for engine in self.engines}
+        for state in (EngineState.Healthy, EngineState.Listening, EngineState.Starting,
+                      EngineState.Stopping, EngineState.NotRunning):
+            if state in states:
+                break
+        previous = self.engineState
+        self.setEngineState(state)
+        if state is EngineState.Healthy and previous is not EngineState.Healthy:
+            self.sgnReady.emit()
+        elif state is EngineState.NotRunning and previous is not EngineState.NotRunning:
+            self.sgnFinished.emit()
+
+    #############################################
+    #   INTERFACE
+    #################################
+
+    def isHealthy(self):
+        """
+        Returns True if any of the engines is running and answering requests, False otherwise.
+        :rtype: bool
+        """
+        return self.engineState is EngineState.Healthy
+
+    def setEngineState(self, state):
+        """
+        Set the lifecycle state of the pool.
+        :type state: EngineState
+        """
+        if state is not self.engineState:
+            LOGGER.debug('Blackbird Engine pool state changed: {} -> {}'.format(self.engineState.value, state.value))
+            self.engineState = state
+            self.sgnStateChanged.emit(state)
+
+    def start(self):
+        """
+        Start the engines of the pool which are not running.
+        """
+        for engine in self.engines:
+            if engine.state() == QtCore.QProcess.NotRunning:
+                engine.start()
+
+    def state(self):
+        """
+        Returns Running if any of the engines is running, NotRunning otherwise.
+        :rtype: ProcessState
+        """
+        if any(engine.state() != QtCore.QProcess.NotRunning for engine in self.engines):
+            return QtCore.QProcess.Running
+        return QtCore.QProcess.NotRunning
+
+    def stop(self, wait=False):
+        """
+        Request the engines of the pool to terminate.
+        If wait is True, block until all of them terminate: the engines are stopped concurrently,
+        so that the pool takes about as long as its slowest engine to stop.
+        :type wait: bool
+        """
+        for engine in self.engines:
+            engine.stop()
+        if wait:
+            for engine in self.engines:
+                engine.waitForStopped()
+
 
 #############################################
 #   UTILITY FUNCTIONS
@@ -180,6 +662,98 @@ class BlackbirdProcess(QtCore.QProcess):
 _RE_POM_FILE = re.compile(r'META-INF/maven/com.obdasystems/.*pom.xml', re.IGNORECASE)
 
 
+def cdsArchivePath(directory, path, javaExe, jvmOptions, port=None):
+    """
+    Returns the path of the class data sharing archive in the given directory for the engine at the given path.
+    The archive name depends on the executable, the java runtime and the JVM options,
+    so that an archive is never reused by a runtime or an executable it was not created for.
+    Engines listening on different ports use distinct archives, as each dumps its own upon exit.
+    :type directory: str
+    :type path: str
+    :type javaExe: str
+    :type jvmOptions: list
+    :type port: int
+    :rtype: str
+    """
+    os.makedirs(directory, exist_ok=True)
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    values = [os.path.abspath(path), stat.st_size, stat.st_mtime_ns, javaExe] + list(jvmOptions)
+    if port:
+        values.append(port)
+    for value in values:
+        digest.update('{}\0'.format(value).encode('utf-8'))
+    return os.path.join(directory, 'blackbird-{}.jsa'.format(digest.hexdigest()[:16]))
+
+
+def createLogBuffer(name):
+    """
+    Returns a new buffer for the output of the Blackbird engine, configured according to the plugin settings.
+    If enabled, the lines discarded from the buffer are spilled to a rotating log file with the given name.
+    :type name: str
+    :rtype: LogBuffer
+    """
+    settings = QtCore.QSettings(ORGANIZATION, APPNAME)
+    spillPath = None
+    if settings.value('blackbird/log/spill', False, bool):
+        location = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.CacheLocation)
+        spillPath = os.path.join(location, 'blackbird', 'logs', '{}.log'.format(name))
+    return LogBuffer(settings.value('blackbird/log/lines', 10000, int), spillPath,
+                     settings.value('blackbird/log/spillSize', 1048576, int),
+                     settings.value('blackbird/log/spillCount', 3, int))
+
+
+def engineArguments(path, jvmOptions, cdsArchive=None, port=None, portArgument='--server.port={}'):
+    """
+    Returns the java arguments running the engine at the given path, according to the JVM options,
+    the class data sharing archive and the port the engine is told to listen on, if any.
+    :type path: str
+    :type jvmOptions: list
+    :type cdsArchive: str
+    :type port: int
+    :type portArgument: str
+    :rtype: list
+    """
+    arguments = list(jvmOptions)
+    if cdsArchive:
+        # OPTIONS NOT SUPPORTED BY THE JAVA RUNTIME ARE IGNORED INSTEAD OF ABORTING THE STARTUP
+        arguments.append('-XX:+IgnoreUnrecognizedVMOptions')
+        if fexists(cdsArchive):
+            # AN UNUSABLE ARCHIVE IS SILENTLY DISCARDED
+            arguments += ['-Xshare:auto', '-XX:SharedArchiveFile={}'.format(cdsArchive)]
+        else:
+            arguments.append('-XX:ArchiveClassesAtExit={}'.format(cdsArchive))
+    arguments += ['-jar', path]
+    if port:
+        arguments.append(portArgument.format(port))
+    return arguments
+
+
+def findJavaExecutable():
+    """
+    Returns the path to the java executable in JAVA_HOME, if any, otherwise the name of the java executable.
+    :rtype: str
+    """
+    javaHome = findJavaHome() or ''
+    # Will resort to look for the java executable in PATH
+    javaExe = 'java' if not sys.platform.startswith('win32') else 'java.exe'
+    # If we hava JAVA_HOME set then try to use the bundled java executable
+    if isdir(javaHome):
+        # For Java <= 1.8 we use the JDK's private jre path,
+        # this was done for compatibility with pyjnius that
+        # fixes the path to libjvm at compile time.
+        if fexists(os.path.join(javaHome, 'jre', 'bin', javaExe)):
+            javaExe = os.path.join(javaHome, 'jre', 'bin', javaExe)
+        # For java > 1.8 there is no private JRE, so we use the standard path
+        elif fexists(os.path.join(javaHome, 'bin', javaExe)):
+            javaExe = os.path.join(javaHome, 'bin', javaExe)
+        # No java executable under JAVA_HOME so we log an error.
+        # We still try to look for java in PATH though
+        else:
+            LOGGER.error('Unable to locate java executable in JAVA_HOME: {}'.format(javaHome))
+    return javaExe
+
+
 def parseBlackbirdInfo(path):
     """
     Read version information from the Blackbird executable at 'path'.
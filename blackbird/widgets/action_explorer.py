@@ -39,6 +39,8 @@ from eddy.plugins.blackbird.schema import ForeignKeyConstraint
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalSchema
 # noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import RelationalSchemaDiff
+# noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalTable
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalTableAction
@@ -54,6 +56,8 @@ class BBActionWidget(QtWidgets.QScrollArea):
     """
     # segnale emesso se schiaccio pulsante corrispondente ad action su schema
     sgnActionButtonClicked = QtCore.pyqtSignal(RelationalSchema, RelationalTableAction)
+    # EMITTED WHEN A BATCH OF ACTIONS MUST BE APPLIED OVER THE SCHEMA
+    sgnActionsButtonClicked = QtCore.pyqtSignal(RelationalSchema, list)
     # segnale emesso se schiaccio pulsante corrispondente ad undo
     sgnUndoButtonClicked = QtCore.pyqtSignal()
 
@@ -75,8 +79,10 @@ class BBActionWidget(QtWidgets.QScrollArea):
         # self.actionInfo = ActionInfo(plugin.session,self.stacked,self.plugin.schema)
         self.actionInfo = ActionInfo(plugin.session, self.stacked)
         connect(self.actionInfo.sgnActionButtonClicked, self.doApplyAction)
+        connect(self.actionInfo.sgnActionsButtonClicked, self.doApplyActions)
         connect(self.actionInfo.sgnUndoButtonClicked, self.doUndoAction)
         connect(plugin.sgnSchemaChanged, self.onSchemaChanged)
+        connect(plugin.sgnSchemaUpdated, self.onSchemaUpdated)
         connect(plugin.sgnUndoActionCorrectlyFinalized, self.onActionCorrectlyApplied)
 
         self.stacked.addWidget(self.actionInfo)
@@ -149,6 +155,7 @@ class BBActionWidget(QtWidgets.QScrollArea):
         scrollbar.installEventFilter(self)
 
         connect(self.sgnActionButtonClicked, plugin.onSchemaActionApplied)
+        connect(self.sgnActionsButtonClicked, plugin.onSchemaActionsApplied)
         connect(self.sgnUndoButtonClicked, plugin.onSchemaActionUndo)
 
     #############################################
@@ -244,13 +251,19 @@ class BBActionWidget(QtWidgets.QScrollArea):
         self.stack(actions)
         self.update()
 
+    @QtCore.pyqtSlot(RelationalSchemaDiff)
+    def onSchemaUpdated(self, diff):
+        self.onSchemaChanged(diff.newSchema)
+
     @QtCore.pyqtSlot()
     def onActionCorrectlyApplied(self):
         self.actionInfo.actionApplied = True
 
     @QtCore.pyqtSlot(RelationalTable)
     def doSelectTable(self, table):
-        actions = table.actions
+        actions = self.plugin.prefetcher.tableActions(table.name)
+        if actions is None:
+            actions = table.actions
         self.actionInfo.updateData(actions, table.name)
         self.stack(actions)
         self.redraw()
@@ -259,6 +272,10 @@ class BBActionWidget(QtWidgets.QScrollArea):
     def doApplyAction(self, action):
         self.sgnActionButtonClicked.emit(self.schema, action)
 
+    @QtCore.pyqtSlot(list)
+    def doApplyActions(self, actions):
+        self.sgnActionsButtonClicked.emit(self.schema, actions)
+
     @QtCore.pyqtSlot()
     def doUndoAction(self):
         self.sgnUndoButtonClicked.emit()
@@ -273,6 +290,8 @@ class ActionInfo(BBAbstractInfo):
 
     # segnale emesso se schiaccio pulsante corrispondente ad action su schema
     sgnActionButtonClicked = QtCore.pyqtSignal(RelationalTableAction)
+    # EMITTED WHEN ALL THE LISTED ACTIONS MUST BE APPLIED IN A SINGLE BATCH
+    sgnActionsButtonClicked = QtCore.pyqtSignal(list)
     # segnale emesso se schiaccio pulsante corrispondente ad aundo
     sgnUndoButtonClicked = QtCore.pyqtSignal()
 
@@ -304,6 +323,10 @@ class ActionInfo(BBAbstractInfo):
         # dialog.raise_()
         self.sgnActionButtonClicked.emit(action)
 
+    @QtCore.pyqtSlot(list)
+    def applyActions(self, actions):
+        self.sgnActionsButtonClicked.emit(actions)
+
     @QtCore.pyqtSlot()
     def undoAction(self):
         # dialog = BlackbirdOutputDialog('ACTION CLICKED', '{}'.format(action), self.session)
@@ -364,6 +387,16 @@ class ActionInfo(BBAbstractInfo):
         # emptyLayout.addRow(emptyKey, emptyField)
         self.widgets.append(domainHeader)
         self.mainLayout.addWidget(domainHeader)
+
+        if len(actions) > 1:
+            batchButton = ActionBatchButton(actions, 'Apply all {} actions'.format(len(actions)), self)
+            batchButton.setFont(Font('Roboto', 12))
+            connect(batchButton.sgnActionsButtonClicked, self.applyActions)
+            batchLayout = QtWidgets.QFormLayout()
+            batchLayout.setSpacing(0)
+            batchLayout.addRow(batchButton)
+            self.layouts.append(batchLayout)
+            self.mainLayout.addLayout(batchLayout)
         # self.layouts.append(emptyLayout)
         # self.mainLayout.addLayout(emptyLayout)
 
@@ -463,6 +496,29 @@ class ActionButton(QtWidgets.QPushButton):
         self.sgnActionButtonClicked.emit(self.action)
 
 
+class ActionBatchButton(QtWidgets.QPushButton):
+    """
+    This class implements the button to apply a batch of actions to a schema
+    """
+    sgnActionsButtonClicked = QtCore.pyqtSignal(list)
+
+    def __init__(self, actions, label, actionInfo):
+        """
+        Initialize the button.
+        """
+        super().__init__(label, actionInfo)
+        self._actions = list(actions)
+        self._actionInfo = actionInfo
+        self.clicked.connect(self.applyActions)
+
+    @property
+    def actions(self):
+        return self._actions
+
+    def applyActions(self):
+        self.sgnActionsButtonClicked.emit(self.actions)
+
+
 class UndoButton(QtWidgets.QPushButton):
     """
     This class implements the button to undo the last action applied over a schema
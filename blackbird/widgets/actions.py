@@ -43,6 +43,8 @@ from eddy.plugins.blackbird.schema import EntityType
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalSchema
 # noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import RelationalSchemaDiff
+# noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalTable
 
 
@@ -113,7 +115,8 @@ class ActionTableExplorerWidget(QtWidgets.QWidget):
         header.setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
 
         connect(plugin.sgnSchemaChanged, self.onSchemaChanged)
-        connect(plugin.sgnActionNodeAdded, self.doAddNode)
+        connect(plugin.sgnSchemaUpdated, self.onSchemaUpdated)
+        connect(plugin.sgnItemsAdded, self.doAddNodes)
         connect(self.tableview.pressed, self.onItemPressed)
         connect(self.tableview.doubleClicked, self.onItemDoubleClicked)
         connect(self.search.textChanged, self.doFilterItem)
@@ -140,28 +143,72 @@ class ActionTableExplorerWidget(QtWidgets.QWidget):
         """
         self.model.clear()
 
-    @QtCore.pyqtSlot(BlackBirdDiagram, TableNode)
-    def doAddNode(self, diagram, node):
+    @QtCore.pyqtSlot(RelationalSchemaDiff)
+    def onSchemaUpdated(self, diff):
+        """
+        Update the tree view to the new version of the schema, once the diagrams have been patched.
+        Only the rows of the tables renamed, modified or removed by the given diff are visited.
+        :type diff: RelationalSchemaDiff
+        """
+        parents = {item.text(): item for item in (self.model.item(row) for row in range(self.model.rowCount()))}
+        for oldTable, newTable in diff.renamedTables:
+            parent = parents.pop(oldTable.name, None)
+            if parent:
+                parent.setText(newTable.name)
+                parent.setData(newTable)
+                for row in range(parent.rowCount()):
+                    child = parent.child(row)
+                    child.setText(self.childKey(child.data().diagram, child.data()))
+                parents[newTable.name] = parent
+        gained = set()
+        for tableDiff in diff.modifiedTables:
+            table = tableDiff.newTable
+            parent = parents.get(table.name)
+            if parent and not table.actions:
+                self.model.removeRow(parents.pop(table.name).row())
+            elif parent:
+                parent.setData(table)
+            elif table.actions and tableDiff.actionsChanged:
+                gained.add(table.name)
+        retargeted = []
+        for table in diff.removedTables:
+            parent = parents.pop(table.name, None)
+            if parent:
+                # NODES OF A REMOVED TABLE ARE EITHER GONE OR RETARGETED TO THE TABLE OF THEIR ENTITY
+                nodes = (parent.child(row).data() for row in range(parent.rowCount()))
+                retargeted.extend(node for node in nodes if node.scene())
+                self.model.removeRow(parent.row())
+        for node in retargeted:
+            self.doAddNodes(node.diagram, [node])
+        if gained:
+            # TABLES WHICH GAINED ACTIONS ARE NOT IN THE TREE VIEW YET: LOOK UP THEIR NODES
+            for diagram in self.plugin.diagramList:
+                nodes = [n for n in diagram.nodes() if isinstance(n, TableNode) and n.relationalTable.name in gained]
+                if nodes:
+                    self.doAddNodes(diagram, nodes)
+        self.proxy.sort(QtCore.Qt.AscendingOrder)
+
+    @QtCore.pyqtSlot(BlackBirdDiagram, list)
+    def doAddNodes(self, diagram, items):
         """
-        Add a node in the tree view.
+        Add the table nodes with actions among the given items in the tree view, filtering and sorting once.
         :type diagram: QGraphicsScene
-        :type node: TableNode
-        """
-        parent = self.parentFor(node)
-        if not parent:
-            parent = QtGui.QStandardItem(self.parentKey(node))
-            parent.setIcon(self.iconFor(node.relationalTable))
-            parent.setData(node.relationalTable)
-            self.model.appendRow(parent)
-        child = QtGui.QStandardItem(self.childKey(diagram, node))
-        child.setData(node)
-        parent.appendRow(child)
-        # APPLY FILTERS AND SORT
-        if self.sender() != self.plugin:
-            self.proxy.invalidateFilter()
-            self.proxy.sort(0, QtCore.Qt.AscendingOrder)
-        else:
-            self.doFilterItem('')
+        :type items: list
+        """
+        parents = {}
+        for node in (item for item in items if isinstance(item, TableNode) and len(item.relationalTable.actions) > 0):
+            key = self.parentKey(node)
+            parent = parents.get(key) or self.parentFor(node)
+            if not parent:
+                parent = QtGui.QStandardItem(key)
+                parent.setIcon(self.iconFor(node.relationalTable))
+                parent.setData(node.relationalTable)
+                self.model.appendRow(parent)
+            parents[key] = parent
+            child = QtGui.QStandardItem(self.childKey(diagram, node))
+            child.setData(node)
+            parent.appendRow(child)
+        self.doFilterItem('')
 
     @QtCore.pyqtSlot('QGraphicsScene', 'QGraphicsItem')
     def doRemoveNode(self, diagram, node):
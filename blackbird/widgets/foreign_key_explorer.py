@@ -46,6 +46,8 @@ from eddy.plugins.blackbird.schema import ForeignKeyConstraint
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalSchema
 # noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import RelationalSchemaDiff
+# noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalTable
 
 LOGGER = getLogger()
@@ -110,7 +112,8 @@ class ForeignKeyExplorerWidget(QtWidgets.QWidget):
         header.setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
 
         connect(plugin.sgnSchemaChanged, self.onSchemaChanged)
-        connect(plugin.sgnEdgeAdded, self.doAddNode)
+        connect(plugin.sgnSchemaUpdated, self.onSchemaUpdated)
+        connect(plugin.sgnItemsAdded, self.doAddNodes)
         connect(self.tableview.pressed, self.onItemPressed)
         connect(self.tableview.doubleClicked, self.onItemDoubleClicked)
         connect(self.search.textChanged, self.doFilterItem)
@@ -137,28 +140,49 @@ class ForeignKeyExplorerWidget(QtWidgets.QWidget):
         """
         self.model.clear()
 
-    @QtCore.pyqtSlot(BlackBirdDiagram, ForeignKeyEdge)
-    def doAddNode(self, diagram, edge):
+    @QtCore.pyqtSlot(RelationalSchemaDiff)
+    def onSchemaUpdated(self, diff):
+        """
+        Update the tree view to the new version of the schema, once the diagrams have been patched.
+        Only the rows of the foreign keys removed by the given diff are visited.
+        :type diff: RelationalSchemaDiff
+        """
+        parents = {item.text(): item for item in (self.model.item(row) for row in range(self.model.rowCount()))}
+        addedForeignKeys = {fk.name: fk for fk in diff.addedForeignKeys}
+        for fk in diff.removedForeignKeys:
+            parent = parents.pop(fk.name, None)
+            if parent:
+                # EDGES ARE KEPT ONLY IF A FOREIGN KEY WITH THE SAME NAME REPLACED THE REMOVED ONE
+                for row in reversed(range(parent.rowCount())):
+                    if not parent.child(row).data().scene():
+                        parent.removeRow(row)
+                if parent.rowCount():
+                    parent.setData(addedForeignKeys.get(fk.name, parent.data()))
+                else:
+                    self.model.removeRow(parent.row())
+        self.proxy.sort(QtCore.Qt.AscendingOrder)
+
+    @QtCore.pyqtSlot(BlackBirdDiagram, list)
+    def doAddNodes(self, diagram, items):
         """
-        Add a node in the tree view.
+        Add the foreign key edges among the given items in the tree view, filtering and sorting once.
         :type diagram: QGraphicsScene
-        :type edge: ForeignKeyEdge
-        """
-        parent = self.parentFor(edge)
-        if not parent:
-            parent = QtGui.QStandardItem(self.parentKey(edge))
-            parent.setIcon(self.iconFor(edge.foreignKey))
-            parent.setData(edge.foreignKey)
-            self.model.appendRow(parent)
-        child = QtGui.QStandardItem(self.childKey(diagram, edge))
-        child.setData(edge)
-        parent.appendRow(child)
-        # APPLY FILTERS AND SORT
-        if self.sender() != self.plugin:
-            self.proxy.invalidateFilter()
-            self.proxy.sort(0, QtCore.Qt.AscendingOrder)
-        else:
-            self.doFilterItem('')
+        :type items: list
+        """
+        parents = {}
+        for edge in (item for item in items if isinstance(item, ForeignKeyEdge)):
+            key = self.parentKey(edge)
+            parent = parents.get(key) or self.parentFor(edge)
+            if not parent:
+                parent = QtGui.QStandardItem(key)
+                parent.setIcon(self.iconFor(edge.foreignKey))
+                parent.setData(edge.foreignKey)
+                self.model.appendRow(parent)
+            parents[key] = parent
+            child = QtGui.QStandardItem(self.childKey(diagram, edge))
+            child.setData(edge)
+            parent.appendRow(child)
+        self.doFilterItem('')
 
     @QtCore.pyqtSlot(str)
     def doFilterItem(self, key):
@@ -48,6 +48,8 @@ from eddy.plugins.blackbird.schema import ForeignKeyConstraint
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalSchema
 # noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import RelationalSchemaDiff
+# noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalTable
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.ui.mdi import BlackBirdMdiSubWindow
@@ -77,6 +79,7 @@ class BBInfoWidget(QtWidgets.QScrollArea):
         # self.schemaInfo = SchemaInfo(self)
         self.schemaInfo = SchemaInfo(plugin.session, self.stacked)
         connect(plugin.sgnSchemaChanged, self.onSchemaChanged)
+        connect(plugin.sgnSchemaUpdated, self.onSchemaUpdated)
         connect(plugin.sgnFocusTable, self.doSelectTable)
         connect(plugin.sgnFocusForeignKey, self.doSelectForeignKey)
 
@@ -306,8 +309,13 @@ class BBInfoWidget(QtWidgets.QScrollArea):
         self.schemaInfo.updateData(len(tables), len(foreignKeys))
         self.stack(schema)
 
+    @QtCore.pyqtSlot(RelationalSchemaDiff)
+    def onSchemaUpdated(self, diff):
+        self.onSchemaChanged(diff.newSchema)
+
     @QtCore.pyqtSlot(RelationalTable)
     def doSelectTable(self, table):
+        table = self.plugin.prefetcher.table(table.name) or table
         self.tableInfo.updateData(table)
         self.stack(table)
 
@@ -44,6 +44,8 @@ from eddy.plugins.blackbird.schema import EntityType
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalSchema
 # noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import RelationalSchemaDiff
+# noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.schema import RelationalTable
 
 
@@ -114,7 +116,8 @@ class TableExplorerWidget(QtWidgets.QWidget):
         header.setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
 
         connect(plugin.sgnSchemaChanged, self.onSchemaChanged)
-        connect(plugin.sgnNodeAdded, self.doAddNode)
+        connect(plugin.sgnSchemaUpdated, self.onSchemaUpdated)
+        connect(plugin.sgnItemsAdded, self.doAddNodes)
         connect(self.tableview.pressed, self.onItemPressed)
         connect(self.tableview.doubleClicked, self.onItemDoubleClicked)
         connect(self.search.textChanged, self.doFilterItem)
@@ -141,28 +144,60 @@ class TableExplorerWidget(QtWidgets.QWidget):
         """
         self.model.clear()
 
-    @QtCore.pyqtSlot(BlackBirdDiagram, TableNode)
-    def doAddNode(self, diagram, node):
+    @QtCore.pyqtSlot(RelationalSchemaDiff)
+    def onSchemaUpdated(self, diff):
+        """
+        Update the tree view to the new version of the schema, once the diagrams have been patched.
+        Only the rows of the tables renamed, modified or removed by the given diff are visited.
+        :type diff: RelationalSchemaDiff
+        """
+        parents = {item.text(): item for item in (self.model.item(row) for row in range(self.model.rowCount()))}
+        for oldTable, newTable in diff.renamedTables:
+            parent = parents.pop(oldTable.name, None)
+            if parent:
+                parent.setText(newTable.name)
+                parent.setData(newTable)
+                for row in range(parent.rowCount()):
+                    child = parent.child(row)
+                    child.setText(self.childKey(child.data().diagram, child.data()))
+                parents[newTable.name] = parent
+        for tableDiff in diff.modifiedTables:
+            parent = parents.get(tableDiff.newTable.name)
+            if parent:
+                parent.setData(tableDiff.newTable)
+        retargeted = []
+        for table in diff.removedTables:
+            parent = parents.pop(table.name, None)
+            if parent:
+                # NODES OF A REMOVED TABLE ARE EITHER GONE OR RETARGETED TO THE TABLE OF THEIR ENTITY
+                nodes = (parent.child(row).data() for row in range(parent.rowCount()))
+                retargeted.extend(node for node in nodes if node.scene())
+                self.model.removeRow(parent.row())
+        for node in retargeted:
+            self.doAddNodes(node.diagram, [node])
+        self.proxy.sort(QtCore.Qt.AscendingOrder)
+
+    @QtCore.pyqtSlot(BlackBirdDiagram, list)
+    def doAddNodes(self, diagram, items):
         """
-        Add a node in the tree view.
+        Add the table nodes among the given items in the tree view, filtering and sorting once.
         :type diagram: QGraphicsScene
-        :type node: TableNode
-        """
-        parent = self.parentFor(node)
-        if not parent:
-            parent = QtGui.QStandardItem(self.parentKey(node))
-            parent.setIcon(self.iconFor(node.relationalTable))
-            parent.setData(node.relationalTable)
-            self.model.appendRow(parent)
-        child = QtGui.QStandardItem(self.childKey(diagram, node))
-        child.setData(node)
-        parent.appendRow(child)
-        # APPLY FILTERS AND SORT
-        if self.sender() != self.plugin:
-            self.proxy.invalidateFilter()
-            self.proxy.sort(0, QtCore.Qt.AscendingOrder)
-        else:
-            self.doFilterItem('')
+        :type items: list
+        """
+        parents = {}
+        for node in (item for item in items if isinstance(item, TableNode)):
+            key = self.parentKey(node)
+            parent = parents.get(key) or self.parentFor(node)
+            if not parent:
+                parent = QtGui.QStandardItem(key)
+                parent.setIcon(self.iconFor(node.relationalTable))
+                parent.setData(node.relationalTable)
+                self.model.appendRow(parent)
+            parents[key] = parent
+            child = QtGui.QStandardItem(self.childKey(diagram, node))
+            child.setData(node)
+            parent.appendRow(child)
+        self.doFilterItem('')
 
     @QtCore.pyqtSlot('QGraphicsScene', 'QGraphicsItem')
     def doRemoveNode(self, diagram, node):
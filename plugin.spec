@@ -30,4 +30,7 @@ name: Blackbird
 version: 0.2.0
 
 [blackbird]
-executable=blackbird.jar
\ No newline at end of file
+executable=blackbird.jar
+cds_archive=false
+jvm_options=
+port_argument=--server.port={}
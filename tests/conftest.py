@@ -188,3 +188,72 @@ def spec():
     """
     basepath = os.path.join(os.path.dirname(__file__), os.pardir)
     yield PluginManager.spec(fread(os.path.join(basepath, 'plugin.spec')))
+
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import EntityType
+
+
+#############################################
+# SCHEMA FIXTURES
+#################################
+
+def jsonEntity(name, entityType=EntityType.Class):
+    """
+    Returns the JSON description of the entity with the given name.
+    """
+    return {
+        'entityFullIRI': 'https://obdasystems.com/blackbird/test/{}'.format(name),
+        'entityShortIRI': 'bbt:{}'.format(name),
+        'entityType': entityType.value,
+    }
+
+
+def jsonColumnName(name, position=0):
+    """
+    Returns the name of the column at the given position in the table of the entity with the given name.
+    """
+    return 'ID_{}_{}'.format(name, position) if position else 'ID_{}'.format(name)
+
+
+def jsonForeignKey(src, tgt, srcPosition=0, tgtPosition=0):
+    """
+    Returns the JSON description of the foreign key from the column at srcPosition in the table of
+    the entity src to the column at tgtPosition in the table of the entity tgt.
+    """
+    return {
+        'fkName': 'FK_{}_{}{}'.format(src, tgt, '_{}{}'.format(srcPosition, tgtPosition)
+                                     if srcPosition or tgtPosition else ''),
+        'sourceTableName': 'CL_{}'.format(src),
+        'sourceColumnsNames': [jsonColumnName(src, srcPosition)],
+        'targetTableName': 'CL_{}'.format(tgt),
+        'targetColumnsNames': [jsonColumnName(tgt, tgtPosition)],
+        'axiomType': 'SubClassOf',
+    }
+
+
+def jsonTable(name, entityType=EntityType.Class, fks=None, actions=None, tableName=None):
+    """
+    Returns the JSON description of the table of the entity with the given name: the tables of properties
+    have two columns. Foreign keys are given either as the names of their target entities, or as
+    descriptions returned by jsonForeignKey.
+    """
+    entity = jsonEntity(name, entityType)
+    tableName = tableName or 'CL_{}'.format(name)
+    return {
+        'tableName': tableName,
+        'entity': entity,
+        'columns': [{
+            'columnName': jsonColumnName(name, i),
+            'entityIRI': entity,
+            'columnType': 'integer',
+            'position': i,
+            'id': 'COL_{}'.format(jsonColumnName(name, i)),
+            'nullable': False,
+        } for i in range(1 if entityType == EntityType.Class else 2)],
+        'primaryKeyConstraint': {'pkName': 'PK_{}'.format(name), 'columnNames': [jsonColumnName(name)]},
+        'uniqueConstraints': [],
+        'foreignKeyConstraints': [dict(jsonForeignKey(name, fk) if isinstance(fk, str) else fk,
+                                       sourceTableName=tableName) for fk in fks or ()],
+        'id': 'TABLE_{}'.format(name),
+        'tableActions': actions or [],
+    }
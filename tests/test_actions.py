@@ -39,6 +39,11 @@ from eddy.core.functions.path import expandPath
 from eddy.core.plugin import PluginManager
 from eddy.ui.session import Session
 
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.items.edges import ForeignKeyEdge
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import RelationalSchema, RelationalSchemaDiff
+
 basepath = expandPath(os.path.join(os.path.dirname(__file__), os.pardir))
 
 
@@ -92,9 +97,9 @@ def test_generate_schema_all_diagrams(session, plugin, qtbot):
     action = plugin.action('generate_schema')
     # WHEN
     try:
-        while not plugin.translator.state() == QtCore.QProcess.Running:
-            qtbot.wait(100)
-        qtbot.wait(2000)
+        if not plugin.translator.isHealthy():
+            with qtbot.waitSignal(plugin.translator.sgnReady, timeout=30000):
+                pass
         with qtbot.waitSignal(plugin.sgnSchemaChanged, timeout=5000):
             action.trigger()
         # THEN
@@ -104,3 +109,116 @@ def test_generate_schema_all_diagrams(session, plugin, qtbot):
         if not plugin.translator.state() == QtCore.QProcess.NotRunning:
             plugin.doStopTranslator()
             qtbot.wait(1000)
+
+
+def test_generate_schema_queued_until_engine_healthy(session, plugin, qtbot):
+    # GIVEN
+    action = plugin.action('generate_schema')
+    try:
+        if not plugin.translator.state() == QtCore.QProcess.NotRunning:
+            with qtbot.waitSignal(plugin.translator.sgnFinished, timeout=5000):
+                plugin.doStopTranslator()
+        # WHEN
+        with qtbot.waitSignal(plugin.sgnSchemaChanged, timeout=30000):
+            action.trigger()
+            # THEN
+            assert plugin.pendingExport is not None
+            assert not plugin.translator.isHealthy()
+        assert plugin.translator.isHealthy()
+        assert plugin.pendingExport is None
+    finally:
+        if not plugin.translator.state() == QtCore.QProcess.NotRunning:
+            plugin.doStopTranslator()
+            qtbot.wait(1000)
+
+
+def test_generate_schema_populates_diagrams_in_bulk(session, plugin, qtbot):
+    # GIVEN
+    action = plugin.action('generate_schema')
+    try:
+        if not plugin.translator.isHealthy():
+            with qtbot.waitSignal(plugin.translator.sgnReady, timeout=30000):
+                pass
+        # WHEN
+        with qtbot.waitSignal(plugin.sgnItemsAdded, timeout=10000) as blocker:
+            action.trigger()
+        # THEN
+        diagram, items = blocker.args
+        assert set(items) == set(diagram.nodes()) | set(diagram.edges())
+        assert all(edge.source.scene() is diagram and edge.target.scene() is diagram for edge in diagram.edges())
+    finally:
+        if not plugin.translator.state() == QtCore.QProcess.NotRunning:
+            plugin.doStopTranslator()
+            qtbot.wait(1000)
+
+
+#############################################
+#   DIAGRAM UPDATE
+#################################
+
+def test_patch_diagram_keeps_unaffected_items(session, plugin, qtbot, monkeypatch):
+    # GIVEN
+    action = plugin.action('generate_schema')
+    try:
+        if not plugin.translator.isHealthy():
+            with qtbot.waitSignal(plugin.translator.sgnReady, timeout=30000):
+                pass
+        with qtbot.waitSignal(plugin.sgnSchemaChanged, timeout=5000):
+            action.trigger()
+        qtbot.waitUntil(lambda: len(plugin.diagramList) > 0, timeout=5000)
+        diagram = first(plugin.diagramList)
+        nodes = set(diagram.nodes())
+        edges = set(diagram.edges())
+        removedTable = first(plugin.schema.tables)
+        schema = RelationalSchema(plugin.schema.name, plugin.schema.id,
+                                  [table for table in plugin.schema.tables if table is not removedTable],
+                                  plugin.schema.actions)
+        updatedEdges = []
+        monkeypatch.setattr(ForeignKeyEdge, 'updateEdge', lambda edge, *args, **kwargs: updatedEdges.append(edge))
+        # WHEN
+        addedItems = diagram.patch(schema, RelationalSchemaDiff(plugin.schema, schema))
+        # THEN
+        assert addedItems == []
+        assert updatedEdges == []
+        removedNodes = {node for node in nodes if node.relationalTable.name == removedTable.name}
+        assert set(diagram.nodes()) == nodes - removedNodes
+        assert all(edge.source not in removedNodes and edge.target not in removedNodes for edge in diagram.edges())
+        assert set(diagram.edges()) <= edges
+        assert all(edge.foreignKey.srcTable != removedTable.name for edge in diagram.edges())
+        assert all(node.relationalTable is schema.getTableByName(node.text()) for node in diagram.nodes())
+    finally:
+        if not plugin.translator.state() == QtCore.QProcess.NotRunning:
+            plugin.doStopTranslator()
+            qtbot.wait(1000)
+
+
+#############################################
+#   SCHEMA ACTIONS
+#################################
+
+def test_apply_action_batch_updates_schema_once(session, plugin, qtbot):
+    # GIVEN
+    action = plugin.action('generate_schema')
+    try:
+        if not plugin.translator.isHealthy():
+            with qtbot.waitSignal(plugin.translator.sgnReady, timeout=30000):
+                pass
+        with qtbot.waitSignal(plugin.sgnSchemaChanged, timeout=5000):
+            action.trigger()
+        qtbot.waitUntil(lambda: len(plugin.diagramList) > 0, timeout=5000)
+        actions = plugin.schema.actions[:3]
+        schemas = []
+        plugin.sgnSchemaUpdated.connect(lambda diff: schemas.append(diff.newSchema))
+        # WHEN
+        with qtbot.waitSignal(plugin.sgnActionBatchFinalized, timeout=10000) as blocker:
+            plugin.onSchemaActionsApplied(plugin.schema, actions)
+        # THEN
+        results = blocker.args[0]
+        assert [bbAction for bbAction, _ in results] == actions
+        assert any(not error for _, error in results)
+        assert schemas == [plugin.schema]
+        assert plugin.actionBatch is None
+    finally:
+        if not plugin.translator.state() == QtCore.QProcess.NotRunning:
+            plugin.doStopTranslator()
+            qtbot.wait(1000)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+"""
+Tests for the Blackbird schema cache.
+"""
+
+import json
+import os
+
+import pytest
+
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.cache import SchemaCache
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import EntityType, RelationalSchemaParser
+
+
+#############################################
+#   UTILITIES
+#################################
+
+def jsonSchema(*names):
+    return {'schemaName': 'test', 'id': 'DB_1', 'tables': [{
+        'tableName': 'CL_{}'.format(name),
+        'entity': {
+            'entityFullIRI': 'https://obdasystems.com/blackbird/test/{}'.format(name),
+            'entityShortIRI': 'bbt:{}'.format(name),
+            'entityType': EntityType.Class.value,
+        },
+        'columns': [],
+        'primaryKeyConstraint': None,
+        'uniqueConstraints': [],
+        'foreignKeyConstraints': [],
+        'id': 'TABLE_{}'.format(name),
+        'tableActions': [],
+    } for name in names]}
+
+
+@pytest.fixture
+def cache(tmpdir):
+    """
+    Yields an empty schema cache bounded to 1MB.
+    """
+    yield SchemaCache(str(tmpdir.join('schemas')), 1024 * 1024)
+
+
+#############################################
+#   CACHE
+#################################
+
+def test_key_depends_on_ontology_and_policies():
+    # GIVEN
+    policies = {'class': 'NO_MERGE', 'objProps': 'NO_MERGE'}
+    # THEN
+    assert SchemaCache.key(b'owl', policies) == SchemaCache.key(b'owl', dict(reversed(list(policies.items()))))
+    assert SchemaCache.key(b'owl', policies) != SchemaCache.key(b'owl2', policies)
+    assert SchemaCache.key(b'owl', policies) != SchemaCache.key(b'owl', dict(policies, objProps='MERGE'))
+
+
+def test_get_returns_stored_schema(cache):
+    # GIVEN
+    data = json.dumps(jsonSchema('A', 'B')).encode('utf-8')
+    key = SchemaCache.key(b'owl', {})
+    # WHEN
+    cache.put(key, data, RelationalSchemaParser.getSchema(jsonSchema('A', 'B')))
+    cachedData, schema = cache.get(key)
+    # THEN
+    assert cachedData == data
+    assert [table.name for table in schema.tables] == ['CL_A', 'CL_B']
+    assert schema.getTableByEntityShortIRI('bbt:B').name == 'CL_B'
+    assert cache.get(SchemaCache.key(b'other', {})) is None
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    # GIVEN
+    schema = RelationalSchemaParser.getSchema(jsonSchema(*range(100)))
+    keys = [SchemaCache.key(str(i).encode('utf-8'), {}) for i in range(3)]
+    cache.put(keys[0], None, schema)
+    cache.maxSize = 2 * cache.size() + 1
+    cache.put(keys[1], None, schema)
+    os.utime(cache.pathOf(keys[0]), (0, 0))
+    os.utime(cache.pathOf(keys[1]), (1, 1))
+    # WHEN
+    cache.get(keys[0])
+    cache.put(keys[2], None, schema)
+    # THEN
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.size() <= cache.maxSize
+
+
+def test_unreadable_entry_is_discarded(cache):
+    # GIVEN
+    key = SchemaCache.key(b'owl', {})
+    with open(cache.pathOf(key), 'wb') as f:
+        f.write(b'garbage')
+    # THEN
+    assert cache.get(key) is None
+    assert not os.path.exists(cache.pathOf(key))
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+"""
+Tests for the Blackbird engine daemon supervisor.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird import daemon
+
+
+#############################################
+#   UTILITIES
+#################################
+
+def startDaemon(stateDir, idleTimeout):
+    """
+    Start a daemon supervising a stand-in engine.
+    :rtype: Popen
+    """
+    return subprocess.Popen([sys.executable, daemon.__file__, '--state-dir', stateDir,
+                             '--idle-timeout', str(idleTimeout), '--poll', '0.1', '--',
+                             sys.executable, '-c', 'import time; time.sleep(60)'])
+
+
+def waitUntil(predicate, timeout=10):
+    """
+    Wait for the given predicate to hold, returning its last value.
+    """
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return predicate()
+
+
+#############################################
+#   TESTS
+#################################
+
+def test_daemon_is_shared_and_stops_when_idle(tmpdir):
+    # GIVEN
+    stateDir = str(tmpdir)
+    daemon.acquireLease(stateDir, 'test')
+    first = startDaemon(stateDir, idleTimeout=1)
+    try:
+        assert waitUntil(lambda: (daemon.readDaemonInfo(stateDir) or {}).get('enginePid'))
+        info = daemon.readDaemonInfo(stateDir)
+        # WHEN
+        second = startDaemon(stateDir, idleTimeout=1)
+        # THEN
+        assert second.wait(10) == 0
+        assert daemon.readDaemonInfo(stateDir) == info
+        # WHEN
+        time.sleep(1.5)
+        # THEN
+        assert first.poll() is None
+        assert daemon.isAlive(info['enginePid'])
+        # WHEN
+        daemon.releaseLease(stateDir, 'test')
+        first.wait(10)
+        # THEN
+        assert daemon.readDaemonInfo(stateDir) is None
+        assert waitUntil(lambda: not daemon.isAlive(info['enginePid']))
+    finally:
+        if first.poll() is None:
+            first.kill()
+
+
+def test_stale_leases_are_discarded(tmpdir):
+    # GIVEN
+    stateDir = str(tmpdir)
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    tmpdir.mkdir(daemon.LeasesDir).join('{}-stale'.format(dead.pid)).write('')
+    daemon.acquireLease(stateDir, 'alive')
+    # WHEN
+    leases = daemon.liveLeases(stateDir)
+    # THEN
+    assert leases == 1
+    assert os.listdir(os.path.join(stateDir, daemon.LeasesDir)) == ['{}-alive'.format(os.getpid())]
+
+
+def test_stale_daemon_file_is_reclaimed(tmpdir):
+    # GIVEN
+    stateDir = str(tmpdir)
+    dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+    dead.wait()
+    daemon.writeDaemonInfo(stateDir, {'pid': dead.pid})
+    # WHEN
+    claimed = daemon.createDaemonInfo(stateDir)
+    # THEN
+    assert claimed
+    assert daemon.readDaemonInfo(stateDir) == {'pid': os.getpid()}
+    assert not daemon.createDaemonInfo(stateDir)
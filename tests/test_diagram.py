@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+"""
+Tests for the Blackbird diagram.
+"""
+
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.diagram import BlackBirdDiagram
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import RelationalSchemaParser
+
+from conftest import jsonTable
+
+
+#############################################
+#   UTILITIES
+#################################
+
+class FakeTableNode:
+    """
+    Minimal stand-in for a table node, exposing the attributes read when carrying a diagram over.
+    """
+    def __init__(self, table):
+        self.relationalTable = table
+
+
+class FakeForeignKeyEdge:
+    """
+    Minimal stand-in for a foreign key edge, exposing the attributes read when carrying a diagram over.
+    """
+    def __init__(self, fk, source, target):
+        self.foreignKey = fk
+        self.source = source
+        self.target = target
+
+
+def chainSchema(ntables, *tables):
+    """
+    Returns a schema with a chain of ntables tables linked by subclass foreign keys, followed by the given tables.
+    """
+    chain = [jsonTable('T{}'.format(i), fks=['T{}'.format(i - 1)] if i else ()) for i in range(ntables)]
+    return RelationalSchemaParser.getSchema({'schemaName': 'test', 'id': 'DB_1', 'tables': chain + list(tables)})
+
+
+def drawSchema(schema):
+    """
+    Returns the nodes and edges of a diagram drawing all the tables and foreign keys of the given schema.
+    """
+    tableToNode = {table.name: FakeTableNode(table) for table in schema.tables}
+    edges = [FakeForeignKeyEdge(fk, tableToNode[fk.srcTable], tableToNode[fk.tgtTable]) for fk in schema.foreignKeys]
+    return list(tableToNode.values()), edges
+
+
+#############################################
+#   DIAGRAM CARRY OVER
+#################################
+
+def test_match_items_across_schema_versions():
+    # GIVEN
+    nodes, edges = drawSchema(chainSchema(3, jsonTable('A'), jsonTable('B', fks=['A'])))
+    schema = chainSchema(3, jsonTable('B', tableName='CL_B_RENAMED'))
+    # WHEN
+    nodeToTable, edgeToForeignKey = BlackBirdDiagram.matchItems(schema, nodes, edges)
+    # THEN
+    assert {node.relationalTable.name: table.name for node, table in nodeToTable.items()} == {
+        'CL_T0': 'CL_T0', 'CL_T1': 'CL_T1', 'CL_T2': 'CL_T2', 'CL_B': 'CL_B_RENAMED'}
+    assert sorted(fk.name for fk in edgeToForeignKey.values()) == ['FK_T1_T0', 'FK_T2_T1']
+    assert all(fk is schema.getTableByName(fk.srcTable).foreignKeys[0] for fk in edgeToForeignKey.values())
+
+
+def test_match_items_benchmark(benchmark):
+    # GIVEN
+    ntables = 2000
+    nodes, edges = drawSchema(chainSchema(ntables))
+    schema = chainSchema(ntables)
+
+    # WHEN
+    nodeToTable, edgeToForeignKey = benchmark(BlackBirdDiagram.matchItems, schema, nodes, edges)
+    # THEN
+    assert all(table is schema.getTableByName(node.relationalTable.name) for node, table in nodeToTable.items())
+    assert len(nodeToTable) == ntables
+    assert all(fk.name == edge.foreignKey.name for edge, fk in edgeToForeignKey.items())
+    assert len(edgeToForeignKey) == ntables - 1
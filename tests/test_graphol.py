@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+
+
+import pickle
+import threading
+
+import pytest
+
+from PyQt5 import QtCore
+
+from eddy.core.datatypes.graphol import Item
+from eddy.core.functions.misc import first
+
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird import graphol
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.graphol import (
+    BlackbirdOntologyEntityManager,
+    DiagramSnapshot
+)
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import (
+    EntityType,
+    RelationalSchemaParser
+)
+
+from conftest import jsonForeignKey, jsonTable
+
+
+#############################################
+#   UTILITIES
+#################################
+
+class FakeNode:
+    """
+    Minimal stand-in for a diagram node, exposing the attributes read by the entity manager.
+    """
+    def __init__(self, id, type, text=''):
+        self.id = id
+        self.Type = type
+        self.edges = []
+        self._text = text
+
+    def type(self):
+        return self.Type
+
+    def text(self):
+        return self._text
+
+    def __str__(self):
+        return self.id
+
+
+class FakeEdge:
+    """
+    Minimal stand-in for a diagram edge, registering itself on its endpoints.
+    """
+    def __init__(self, id, type, source, target):
+        self.id = id
+        self.Type = type
+        self.source = source
+        self.target = target
+        source.edges.append(self)
+        target.edges.append(self)
+
+    def type(self):
+        return self.Type
+
+    def __str__(self):
+        return self.id
+
+
+class FakeDiagram:
+    """
+    Minimal stand-in for an ontology diagram.
+    """
+    def __init__(self, name):
+        self.name = name
+        self._nodes = []
+        self._edges = []
+
+    def node(self, type, text=''):
+        node = FakeNode('n{}'.format(len(self._nodes)), type, text)
+        self._nodes.append(node)
+        return node
+
+    def edge(self, type, source, target):
+        edge = FakeEdge('e{}'.format(len(self._edges)), type, source, target)
+        self._edges.append(edge)
+        return edge
+
+    def nodes(self):
+        return self._nodes
+
+    def edges(self):
+        return self._edges
+
+
+class FakeSession(QtCore.QObject):
+    """
+    Minimal stand-in for the Eddy session.
+    """
+    project = None
+
+
+def schemaOf(*tables):
+    return RelationalSchemaParser.getSchema({'schemaName': 'test', 'id': 'DB_1', 'tables': list(tables)})
+
+
+@pytest.fixture
+def schema():
+    return schemaOf(jsonTable('A', fks=[jsonForeignKey('A', 'B')]), jsonTable('B'),
+                    jsonTable('R', EntityType.ObjectProperty))
+
+
+#############################################
+#   TABLES MAPPING
+#################################
+
+def test_node_index_normalizes_node_text():
+    # GIVEN
+    diagram = FakeDiagram('D1')
+    diagram.node(Item.ConceptNode, 'bbt:A')
+    diagram.node(Item.ConceptNode, 'bbt:\nA')
+    diagram.node(Item.RoleNode, 'bbt:A')
+    diagram.node(Item.UnionNode)
+    # WHEN
+    index = DiagramSnapshot(diagram.nodes(), diagram.edges()).nodeIndex()
+    # THEN
+    assert index == {(Item.ConceptNode, 'bbt:A'): [0, 1], (Item.RoleNode, 'bbt:A'): [2]}
+
+
+def test_tables_mapped_to_nodes_of_matching_type(schema):
+    # GIVEN
+    diagram = FakeDiagram('D1')
+    a = diagram.node(Item.ConceptNode, 'bbt:A')
+    b = diagram.node(Item.ConceptNode, 'bbt:B')
+    r = diagram.node(Item.RoleNode, 'bbt:R')
+    diagram.node(Item.AttributeNode, 'bbt:B')
+    diagram.edge(Item.InclusionEdge, a, b)
+    # WHEN
+    manager = BlackbirdOntologyEntityManager(schema, FakeSession(), [diagram])
+    # THEN
+    tables = manager.diagramToTables[diagram]
+    assert tables[schema.getTableByName('CL_A')] == [a]
+    assert tables[schema.getTableByName('CL_B')] == [b]
+    assert tables[schema.getTableByName('CL_R')] == [r]
+    fkVEs = manager.diagramToForeignKeys[diagram][schema.getTableByName('CL_A').foreignKeys[0]]
+    assert [(ve.src, ve.tgt) for ves in fkVEs for ve in ves] == [(a, b)]
+
+
+#############################################
+#   FOREIGN KEYS MAPPING
+#################################
+
+def test_snapshot_returns_adjacent_edges_in_diagram_order():
+    # GIVEN
+    diagram = FakeDiagram('D1')
+    a = diagram.node(Item.ConceptNode, 'bbt:A')
+    b = diagram.node(Item.ConceptNode, 'bbt:B')
+    c = diagram.node(Item.ConceptNode, 'bbt:C')
+    diagram.edge(Item.EquivalenceEdge, b, a)
+    diagram.edge(Item.InclusionEdge, b, c)
+    diagram.edge(Item.InclusionEdge, a, c)
+    diagram.edge(Item.InclusionEdge, a, a)
+    # WHEN
+    snapshot = DiagramSnapshot(diagram.nodes(), diagram.edges())
+    # THEN
+    assert snapshot.edgesOf(0, Item.InclusionEdge) == [2, 3]
+    assert snapshot.edgesOf(2, Item.InputEdge) == ()
+    assert pickle.loads(pickle.dumps(snapshot)).edgesOf(0, Item.InclusionEdge) == [2, 3]
+
+
+def test_foreign_key_mapped_through_union_and_equivalence(schema):
+    # GIVEN
+    diagram = FakeDiagram('D1')
+    a = diagram.node(Item.ConceptNode, 'bbt:A')
+    b1 = diagram.node(Item.ConceptNode, 'bbt:B')
+    b2 = diagram.node(Item.ConceptNode, 'bbt:B')
+    union = diagram.node(Item.UnionNode)
+    e0 = diagram.edge(Item.InputEdge, a, union)
+    e1 = diagram.edge(Item.InclusionEdge, union, b1)
+    e2 = diagram.edge(Item.EquivalenceEdge, b2, a)
+    diagram.edge(Item.InclusionEdge, b1, b2)
+    # WHEN
+    manager = BlackbirdOntologyEntityManager(schema, FakeSession(), [diagram])
+    # THEN
+    fkVEs = first(manager.diagramToForeignKeys[diagram][schema.getTableByName('CL_A').foreignKeys[0]])
+    assert [(ve.src, ve.tgt, ve.edges, ve.invertBreakpoints) for ve in fkVEs] == [
+        (a, b1, [e0, e1], None),
+        (a, b2, [e2], [e2]),
+    ]
+
+
+@pytest.fixture
+def propertySchema():
+    return schemaOf(
+        jsonTable('A', fks=[jsonForeignKey('A', 'R', 0, 1)]),
+        jsonTable('R', EntityType.ObjectProperty, fks=[jsonForeignKey('R', 'A'),
+                                                       jsonForeignKey('R', 'A', 1, 0),
+                                                       jsonForeignKey('R', 'P')]),
+        jsonTable('P', EntityType.ObjectProperty))
+
+
+def test_foreign_key_mapped_through_restrictions(propertySchema):
+    # GIVEN
+    diagram = FakeDiagram('D1')
+    a = diagram.node(Item.ConceptNode, 'bbt:A')
+    r = diagram.node(Item.RoleNode, 'bbt:R')
+    p = diagram.node(Item.RoleNode, 'bbt:P')
+    domainR = diagram.node(Item.DomainRestrictionNode)
+    rangeR = diagram.node(Item.RangeRestrictionNode)
+    domainP = diagram.node(Item.DomainRestrictionNode)
+    e0 = diagram.edge(Item.InputEdge, r, domainR)
+    e1 = diagram.edge(Item.InclusionEdge, domainR, a)
+    e2 = diagram.edge(Item.InputEdge, r, rangeR)
+    e3 = diagram.edge(Item.EquivalenceEdge, a, rangeR)
+    e4 = diagram.edge(Item.InputEdge, p, domainP)
+    e5 = diagram.edge(Item.InclusionEdge, domainR, domainP)
+    # WHEN
+    manager = BlackbirdOntologyEntityManager(propertySchema, FakeSession(), [diagram])
+    # THEN
+    fkToVEs = {fk.name: [(ve.src, ve.tgt, ve.edges, ve.inners, ve.invertBreakpoints) for ve in first(ves)]
+               for fk, ves in manager.diagramToForeignKeys[diagram].items()}
+    assert fkToVEs == {
+        'FK_R_A': [(r, a, [e0, e1], [domainR], None)],
+        'FK_R_A_10': [(r, a, [e2, e3], [rangeR], [e3])],
+        'FK_A_R_01': [(a, r, [e3, e2], [rangeR], [e2])],
+        'FK_R_P': [(r, p, [e0, e5, e4], [domainR, domainP], [e4])],
+    }
+
+
+def test_foreign_key_pattern_matching_benchmark(benchmark):
+    # GIVEN
+    nclasses = 1000
+    tables = [jsonTable('C{}'.format(i), fks=[jsonForeignKey('C{}'.format(i), 'C{}'.format(i - 1))] if i else [])
+              for i in range(nclasses)]
+    schema = schemaOf(*tables)
+    diagram = FakeDiagram('D1')
+    nodes = [diagram.node(Item.ConceptNode, 'bbt:C{}'.format(i)) for i in range(nclasses)]
+    edges = [diagram.edge(Item.InclusionEdge, nodes[i], nodes[i - 1]) for i in range(1, nclasses)]
+    # WHEN
+    manager = benchmark(BlackbirdOntologyEntityManager, schema, FakeSession(), [diagram])
+    # THEN
+    fkToEdges = {fk.srcTable: first(ves)[0].edges for fk, ves in manager.diagramToForeignKeys[diagram].items()}
+    assert fkToEdges == {'CL_C{}'.format(i): [edges[i - 1]] for i in range(1, nclasses)}
+
+
+def test_parallel_mapping_matches_sequential_mapping(qtbot, monkeypatch, propertySchema):
+    # GIVEN
+    mappingThreads = []
+    mapDiagramSnapshot = graphol.mapDiagramSnapshot
+
+    def recordingMapDiagramSnapshot(*args):
+        mappingThreads.append(threading.current_thread().name)
+        return mapDiagramSnapshot(*args)
+
+    monkeypatch.setattr(graphol, 'mapDiagramSnapshot', recordingMapDiagramSnapshot)
+    diagrams = []
+    for i in range(3):
+        diagram = FakeDiagram('D{}'.format(i))
+        a = diagram.node(Item.ConceptNode, 'bbt:A')
+        r = diagram.node(Item.RoleNode, 'bbt:R')
+        domainR = diagram.node(Item.DomainRestrictionNode)
+        diagram.edge(Item.InputEdge, r, domainR)
+        diagram.edge(Item.InclusionEdge, domainR, a)
+        diagrams.append(diagram)
+
+    def mapping(manager):
+        return {diagram.name: ({table.name: nodes for table, nodes in manager.diagramToTables[diagram].items()},
+                               {fk.name: [(ve.src, ve.tgt, ve.edges) for ve in first(ves)]
+                                for fk, ves in manager.diagramToForeignKeys[diagram].items()})
+                for diagram in diagrams}
+
+    # WHEN
+    sequential = BlackbirdOntologyEntityManager(propertySchema, FakeSession(), diagrams)
+    del mappingThreads[:]
+    parallel = BlackbirdOntologyEntityManager(propertySchema, FakeSession(), diagrams, workers=2)
+    qtbot.waitUntil(parallel.isReady)
+    # THEN
+    assert sequential.isReady()
+    assert len(mappingThreads) == 3
+    assert all(name.startswith(BlackbirdOntologyEntityManager.WorkerName) for name in mappingThreads)
+    assert mapping(parallel) == mapping(sequential)
+
+
+def test_incremental_update_matches_full_mapping(propertySchema):
+    # GIVEN
+    diagram = FakeDiagram('D1')
+    a = diagram.node(Item.ConceptNode, 'bbt:A')
+    b = diagram.node(Item.ConceptNode, 'bbt:B')
+    r = diagram.node(Item.RoleNode, 'bbt:R')
+    domainR = diagram.node(Item.DomainRestrictionNode)
+    diagram.edge(Item.InputEdge, r, domainR)
+    diagram.edge(Item.InclusionEdge, domainR, a)
+    diagram.edge(Item.InclusionEdge, a, b)
+    manager = BlackbirdOntologyEntityManager(propertySchema, FakeSession(), [diagram])
+    reusedVEs = manager.diagramToForeignKeys[diagram][first(propertySchema.getTableByName('CL_R').foreignKeys)]
+    newSchema = schemaOf(
+        jsonTable('A', fks=[jsonForeignKey('A', 'B')]),
+        jsonTable('B'),
+        jsonTable('R', EntityType.ObjectProperty, fks=[jsonForeignKey('R', 'A')]))
+    # WHEN
+    manager.update(newSchema)
+    # THEN
+    expected = BlackbirdOntologyEntityManager(newSchema, FakeSession(), [diagram])
+    assert {t.name: nodes for t, nodes in manager.diagramToTables[diagram].items()} == \
+        {t.name: nodes for t, nodes in expected.diagramToTables[diagram].items()}
+    assert {fk.name: [(ve.src, ve.tgt, ve.edges) for ve in first(ves)]
+            for fk, ves in manager.diagramToForeignKeys[diagram].items()} == \
+        {fk.name: [(ve.src, ve.tgt, ve.edges) for ve in first(ves)]
+         for fk, ves in expected.diagramToForeignKeys[diagram].items()}
+    assert manager.diagramToForeignKeys[diagram][first(newSchema.getTableByName('CL_R').foreignKeys)] is reusedVEs
+    assert manager.diagramToTables[diagram][newSchema.getTableByName('CL_B')] == [b]
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+
+"""
+Tests for the Blackbird engine log buffer.
+"""
+
+import os
+
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.logbuffer import LogBuffer, LogFileTail
+
+
+#############################################
+#   TESTS
+#################################
+
+def test_buffer_retains_the_most_recent_lines():
+    # GIVEN
+    buffer = LogBuffer(maxLines=10)
+    text = ''.join('line {}\r\n'.format(i) for i in range(25)) + 'partial'
+    # WHEN
+    for i in range(0, len(text), 7):
+        buffer.write(text[i:i + 7])
+    # THEN
+    assert buffer.lineCount() == 26
+    assert buffer.firstLine() == 15
+    assert buffer.readLines(20, 3) == ['line 20', 'line 21', 'line 22']
+    assert buffer.readLines(0, 2) == []
+    assert buffer.readLines(13, 4) == ['line 15', 'line 16']
+    assert buffer.tail(2) == ['line 24', 'partial']
+    assert buffer.getvalue() == ''.join('line {}\n'.format(i) for i in range(15, 25)) + 'partial'
+
+
+def test_buffer_completes_lines_of_each_source_independently():
+    # GIVEN
+    buffer = LogBuffer()
+    # WHEN
+    buffer.write('Started', '[8080] ')
+    buffer.write('Starting\nStarted', '[8081] ')
+    buffer.write(' @10ms\n', '[8080] ')
+    # THEN
+    assert buffer.readLines(0, 3) == ['[8081] Starting', '[8080] Started @10ms', '[8081] Started']
+
+
+def test_discarded_lines_are_spilled_to_rotating_files(tmpdir):
+    # GIVEN
+    path = os.path.join(str(tmpdir), 'logs', 'blackbird.log')
+    buffer = LogBuffer(maxLines=5, spillPath=path, spillSize=100, spillCount=2)
+    # WHEN
+    for i in range(100):
+        buffer.write('line {:02d}\n'.format(i))
+    buffer.close()
+    # THEN
+    assert sorted(os.listdir(os.path.dirname(path))) == ['blackbird.log', 'blackbird.log.1', 'blackbird.log.2']
+    spilled = []
+    for name in (path + '.2', path + '.1', path):
+        with open(name, encoding='utf-8') as f:
+            spilled += f.read().splitlines()
+    assert spilled + buffer.readLines(95, 5) == ['line {:02d}'.format(i) for i in range(100 - len(spilled) - 5, 100)]
+
+
+def test_file_tail_follows_appended_and_truncated_files(tmpdir):
+    # GIVEN
+    path = os.path.join(str(tmpdir), 'engine.log')
+    buffer = LogFileTail(path, maxLines=3)
+    # WHEN
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('a\nb\nc\nd\ne')
+    buffer.sync()
+    # THEN
+    assert buffer.tail(3) == ['c', 'd', 'e']
+    # WHEN
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('è\n')
+    buffer.sync()
+    # THEN
+    assert buffer.tail(2) == ['d', 'eè']
+    # WHEN
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('x\n')
+    buffer.sync()
+    # THEN
+    assert buffer.lineCount() == 1
+    assert buffer.getvalue() == 'x\n'
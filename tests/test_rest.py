@@ -0,0 +1,440 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+"""
+Tests for the Blackbird REST client.
+"""
+
+import gzip
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from PyQt5 import QtNetwork
+
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.prefetch import TablePrefetcher
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.rest import Encoding, NetworkManager, ReplyDecoder, RequestCoordinator
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import RelationalSchema, RelationalTableAction
+
+
+#############################################
+#   UTILITIES
+#################################
+
+class StandInEngineHandler(BaseHTTPRequestHandler):
+    """
+    Serves the requests received by the stand-in engine.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.active += 1
+            self.server.maxActive = max(self.server.maxActive, self.server.active)
+            self.server.requests.append(self.path)
+        time.sleep(self.server.latency)
+        path = self.path.split('/')
+        if path[-3] == 'table':
+            body = json.dumps([{'actionSubjectTableName': path[-2], 'actionType': 'mergeX', 'actionObjectsNames': []}])
+        else:
+            body = json.dumps(self.server.table(path[-1], path[-1]))
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.active -= 1
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        decoded = gzip.decompress(body) if self.headers.get('Content-Encoding') == 'gzip' else body
+        time.sleep(self.server.latency)
+        data = json.dumps(self.server.schema(decoded)).encode('utf-8')
+        encoding = 'gzip' if 'gzip' in self.headers.get('Accept-Encoding', '') else 'identity'
+        content = gzip.compress(data) if encoding == 'gzip' else data
+        with self.server.lock:
+            self.server.traffic.append({
+                'path': self.path,
+                'requestBytes': len(body),
+                'requestDecodedBytes': len(decoded),
+                'responseBytes': len(content),
+                'responseDecodedBytes': len(data),
+            })
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        # SEND THE CONTENT IN TWO PARTS, SO THAT CLIENTS CAN BE OBSERVED IN THE MIDDLE OF THE TRANSFER
+        try:
+            self.wfile.write(content[:len(content) // 2])
+            self.wfile.flush()
+            time.sleep(self.server.stall)
+            self.wfile.write(content[len(content) // 2:])
+        except ConnectionError:
+            pass
+
+    def do_PUT(self):
+        content = self.rfile.read(int(self.headers['Content-Length']))
+        # UNDO REQUESTS CARRY NO ACTION
+        action = json.loads(str(content, encoding='utf-8')) if content else {'actionSubjectTableName': 'UNDO'}
+        with self.server.lock:
+            self.server.active += 1
+            self.server.maxActive = max(self.server.maxActive, self.server.active)
+            self.server.requests.append(action['actionSubjectTableName'])
+        time.sleep(self.server.latency)
+        # ACTIONS OVER MISSING TABLES ARE REJECTED, AS THE ENGINE DOES
+        status = 404 if action['actionSubjectTableName'].startswith('MISSING') else 200
+        body = json.dumps(self.server.schema(b'')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInEngine(ThreadingHTTPServer):
+    """
+    Local stand-in for the Blackbird engine, recording the traffic it serves.
+    Posted ontologies are translated into a schema with one table per line of the ontology.
+    """
+    daemon_threads = True
+
+    def __init__(self, latency=0.0):
+        super().__init__(('127.0.0.1', 0), StandInEngineHandler)
+        self.latency = latency
+        self.stall = 0.0
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.active = 0
+        self.maxActive = 0
+        self.requests = []
+        self.traffic = []
+
+    @staticmethod
+    def table(name, iri):
+        return {
+            'tableName': name,
+            'entity': {'entityFullIRI': iri, 'entityShortIRI': ':{}'.format(name), 'entityType': 1},
+            'columns': [], 'primaryKeyConstraint': None, 'uniqueConstraints': [],
+            'foreignKeyConstraints': [], 'id': 'TABLE_{}'.format(name), 'tableActions': [],
+        }
+
+    @classmethod
+    def schema(cls, owl):
+        return {'schemaName': 'test', 'id': 'DB_1', 'tables': [
+            cls.table('CL_{}'.format(i), str(line, encoding='utf-8')) for i, line in enumerate(owl.splitlines())
+        ]}
+
+    @property
+    def endpoint(self):
+        return 'http://127.0.0.1:{}/bbe'.format(self.server_port)
+
+
+@pytest.fixture
+def engine():
+    """
+    Yields a running stand-in engine.
+    """
+    engine = StandInEngine(latency=0.005)
+    thread = threading.Thread(target=engine.serve_forever, daemon=True)
+    thread.start()
+    yield engine
+    engine.shutdown()
+    engine.server_close()
+
+
+@pytest.fixture
+def engines():
+    """
+    Yields a pool of two running stand-in engines.
+    """
+    engines = [StandInEngine(latency=0.2) for _ in range(2)]
+    for engine in engines:
+        threading.Thread(target=engine.serve_forever, daemon=True).start()
+    yield engines
+    for engine in engines:
+        engine.shutdown()
+        engine.server_close()
+
+
+#############################################
+#   BULK REQUESTS
+#################################
+
+def test_bulk_actions_fetch_reuses_bounded_connections(engine, qtbot):
+    # GIVEN
+    nmanager = NetworkManager(endpoint=engine.endpoint)
+    tableNames = ['CL_{}'.format(i) for i in range(300)]
+    replies = []
+    # WHEN
+    queue = nmanager.getAllActions('test', tableNames)
+    queue.sgnReplyFinished.connect(replies.append)
+    with qtbot.waitSignal(queue.sgnFinished, timeout=30000):
+        pass
+    # THEN
+    assert queue.isFinished()
+    assert len(replies) == len(tableNames)
+    assert all(reply.error() == QtNetwork.QNetworkReply.NoError for reply in replies)
+    assert sorted(engine.requests) == sorted('/bbe/schema/test/table/{}/actions'.format(n) for n in tableNames)
+    assert engine.maxActive <= nmanager.maxInFlight
+    assert engine.connections <= nmanager.maxInFlight
+
+
+def test_batch_actions_are_applied_in_order(engine, qtbot):
+    # GIVEN
+    nmanager = NetworkManager(endpoint=engine.endpoint)
+    actions = [RelationalTableAction('CL_{}'.format(i), 'mergeX', ['CL_{}'.format(i + 1)]) for i in range(30)]
+    actions.insert(10, RelationalTableAction('MISSING', 'mergeX', ['CL_0']))
+    replies = []
+    # WHEN
+    queue = nmanager.putActionsToSchema('test', actions)
+    queue.sgnReplyFinished.connect(replies.append)
+    with qtbot.waitSignal(queue.sgnFinished, timeout=30000):
+        pass
+    # THEN
+    assert engine.requests == [action.actionSubjectTableName for action in actions]
+    assert engine.maxActive == 1
+    assert [reply.request().attribute(NetworkManager.Action).key for reply in replies] == [a.key for a in actions]
+    assert [reply.error() == QtNetwork.QNetworkReply.NoError for reply in replies] == \
+           [action.actionSubjectTableName != 'MISSING' for action in actions]
+
+
+#############################################
+#   COORDINATION
+#################################
+
+def test_coordinator_coalesces_identical_requests(engine, qtbot):
+    # GIVEN
+    nmanager = NetworkManager(endpoint=engine.endpoint)
+    coordinator = RequestCoordinator(nmanager)
+    # WHEN
+    reply = coordinator.issue('schema', 'CL_1', nmanager.getTable, 'test', 'CL_1', abortable=True)
+    coalesced = coordinator.issue('schema', 'CL_1', nmanager.getTable, 'test', 'CL_1', abortable=True)
+    with qtbot.waitSignal(reply.finished, timeout=5000):
+        pass
+    # THEN
+    assert coalesced is None
+    assert coordinator.isCurrent('schema', reply)
+    assert not coordinator.isPending('schema')
+    assert engine.requests == ['/bbe/schema/test/table/CL_1']
+
+
+def test_coordinator_supersedes_claimed_batches(engine, qtbot):
+    # GIVEN
+    nmanager = NetworkManager(endpoint=engine.endpoint)
+    coordinator = RequestCoordinator(nmanager)
+    actions = [RelationalTableAction('CL_{}'.format(i), 'mergeX', []) for i in range(3)]
+    generation = coordinator.issue('schema', 'owl', nmanager.getTable, 'test', 'CL_1', abortable=True)
+    # WHEN
+    batch = nmanager.putActionsToSchema('test', actions)
+    coordinator.claim('schema', batch)
+    # THEN
+    assert coordinator.isCurrent('schema', batch)
+    # WHEN
+    undone = coordinator.issue('schema', None, nmanager.putUndoToSchema, 'test')
+    with qtbot.waitSignals([batch.sgnFinished, undone.finished], timeout=5000):
+        pass
+    # THEN
+    assert generation.error() == QtNetwork.QNetworkReply.OperationCanceledError
+    assert not coordinator.isCurrent('schema', batch)
+    assert coordinator.isCurrent('schema', undone)
+
+
+def test_coordinator_supersedes_requests_in_flight(engine, qtbot):
+    # GIVEN
+    engine.latency = 0.2
+    nmanager = NetworkManager(endpoint=engine.endpoint)
+    coordinator = RequestCoordinator(nmanager)
+    action = RelationalTableAction('CL_1', 'mergeX', ['CL_2'])
+    # WHEN
+    generation = coordinator.issue('schema', 'owl', nmanager.getTable, 'test', 'CL_1', abortable=True)
+    applied = coordinator.issue('schema', 'action', nmanager.putActionToSchema, 'test', action)
+    undone = coordinator.issue('schema', None, nmanager.putUndoToSchema, 'test')
+    with qtbot.waitSignals([applied.finished, undone.finished], timeout=5000):
+        pass
+    # THEN
+    assert generation.error() == QtNetwork.QNetworkReply.OperationCanceledError
+    assert applied.error() == QtNetwork.QNetworkReply.NoError
+    assert not coordinator.isCurrent('schema', applied)
+    assert coordinator.isCurrent('schema', undone)
+    assert not coordinator.isPending('schema')
+
+
+#############################################
+#   LOAD BALANCING
+#################################
+
+def test_balancer_runs_previews_concurrently_and_pins_schemas(engines, qtbot):
+    # GIVEN
+    nmanager = NetworkManager()
+    nmanager.setEndpoints([engine.endpoint for engine in engines])
+    action = RelationalTableAction('CL_1', 'mergeX', ['CL_0'])
+    # WHEN
+    generation = nmanager.postSchema(b'A\nB')
+    preview = nmanager.postSchema(b'A')
+    with qtbot.waitSignals([generation.finished, preview.finished], timeout=5000):
+        pass
+    # THEN
+    assert [len(engine.traffic) for engine in engines] == [1, 1]
+    assert generation.url().port() != preview.url().port()
+    # WHEN
+    nmanager.bindSchema('test', generation)
+    replies = [nmanager.putActionToSchema('test', action), nmanager.putUndoToSchema('test')]
+    replies += [nmanager.getTable('test', 'CL_0'), nmanager.getTable('test', 'CL_1')]
+    with qtbot.waitSignals([reply.finished for reply in replies], timeout=5000):
+        pass
+    # THEN
+    pinned = next(engine for engine in engines if engine.server_port == generation.url().port())
+    other = next(engine for engine in engines if engine is not pinned)
+    assert all(reply.url().port() == pinned.server_port for reply in replies)
+    assert sorted(pinned.requests) == ['/bbe/schema/test/table/CL_0', '/bbe/schema/test/table/CL_1', 'CL_1', 'UNDO']
+    assert not other.requests
+    assert not any(nmanager.load.values())
+
+
+#############################################
+#   PREFETCH
+#################################
+
+def test_prefetched_tables_need_no_round_trip(engine, qtbot):
+    # GIVEN
+    nmanager = NetworkManager(endpoint=engine.endpoint)
+    prefetcher = TablePrefetcher(nmanager)
+    prefetcher.invalidate(RelationalSchema('test', 'DB_1', [], []))
+    tableNames = ['CL_{}'.format(i) for i in range(50)]
+    # WHEN
+    prefetcher.prefetch(tableNames)
+    qtbot.waitUntil(lambda: all(prefetcher.isCached(name) for name in tableNames), timeout=10000)
+    prefetcher.prefetch(tableNames)
+    # THEN
+    assert len(engine.requests) == 2 * len(tableNames)
+    assert prefetcher.table('CL_7').name == 'CL_7'
+    assert [action.actionSubjectTableName for action in prefetcher.tableActions('CL_7')] == ['CL_7']
+    # WHEN
+    prefetcher.invalidate(RelationalSchema('test', 'DB_1', [], []))
+    # THEN
+    assert prefetcher.table('CL_7') is None
+    assert prefetcher.tableActions('CL_7') is None
+
+
+def test_prefetch_skips_requests_in_flight(engine, qtbot):
+    # GIVEN
+    engine.latency = 0.2
+    nmanager = NetworkManager(endpoint=engine.endpoint)
+    prefetcher = TablePrefetcher(nmanager)
+    prefetcher.invalidate(RelationalSchema('test', 'DB_1', [], []))
+    tableNames = ['actions', 'CL_1']
+    # WHEN
+    prefetcher.prefetch(tableNames)
+    prefetcher.prefetch(tableNames)
+    qtbot.waitUntil(lambda: all(prefetcher.isCached(name) for name in tableNames), timeout=5000)
+    # THEN
+    assert len(engine.requests) == 2 * len(tableNames)
+    assert prefetcher.table('actions').name == 'actions'
+    assert [action.actionSubjectTableName for action in prefetcher.tableActions('actions')] == ['actions']
+
+
+#############################################
+#   COMPRESSION
+#################################
+
+def test_reply_decoder_decodes_chunks():
+    # GIVEN
+    data = b'Declaration(Class(:A))\n' * 10000
+    compressed = gzip.compress(data)
+    decoder = ReplyDecoder('gzip')
+    # WHEN
+    decoded = b''.join(decoder.decode(compressed[i:i + 100]) for i in range(0, len(compressed), 100))
+    decoded += decoder.flush()
+    # THEN
+    assert decoded == data
+    assert ReplyDecoder('identity').decode(data) is data
+    assert zlib.decompress(zlib.compress(data)) == ReplyDecoder('deflate').decode(zlib.compress(data))
+
+
+def test_compressed_schema_transfer(engine, qtbot):
+    # GIVEN
+    nmanager = NetworkManager(endpoint=engine.endpoint)
+    nmanager.compression = Encoding.Gzip
+    owl = b''.join('Declaration(Class(<https://obdasystems.com/blackbird/test/C{}>))\n'.format(i).encode('utf-8')
+                   for i in range(5000))
+    chunks = []
+    # WHEN
+    reply = nmanager.postSchema(owl)
+    reply.readyRead.connect(lambda: chunks.append(nmanager.readAll(reply)))
+    with qtbot.waitSignal(reply.finished, timeout=10000):
+        pass
+    chunks.append(nmanager.readAll(reply))
+    # THEN
+    traffic = engine.traffic[-1]
+    schema = json.loads(str(b''.join(chunks), encoding='utf-8'))
+    assert reply.error() == QtNetwork.QNetworkReply.NoError
+    assert len(schema['tables']) == 5000
+    assert traffic['requestDecodedBytes'] == len(owl)
+    assert traffic['requestBytes'] < traffic['requestDecodedBytes'] / 5
+    assert traffic['responseBytes'] < traffic['responseDecodedBytes'] / 5
+    assert reply not in nmanager.decoders
+
+
+def test_aborted_compressed_reply_releases_its_decoder(engine, qtbot):
+    # GIVEN
+    engine.stall = 1.0
+    nmanager = NetworkManager(endpoint=engine.endpoint)
+    nmanager.compression = Encoding.Gzip
+    owl = b''.join('Declaration(Class(<https://obdasystems.com/blackbird/test/C{}>))\n'.format(i).encode('utf-8')
+                   for i in range(5000))
+    chunks = []
+
+    def onReadyRead():
+        chunks.append(nmanager.readAll(reply))
+        reply.abort()
+
+    # WHEN
+    reply = nmanager.postSchema(owl)
+    reply.readyRead.connect(onReadyRead)
+    with qtbot.waitSignal(reply.finished, timeout=10000):
+        pass
+    # THEN
+    assert chunks
+    assert reply.error() == QtNetwork.QNetworkReply.OperationCanceledError
+    assert reply not in nmanager.decoders
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+
+##########################################################################
+#                                                                        #
+#  Blackbird: An ontology to relational schema translator                #
+#  Copyright (C) 2019 OBDA Systems                                       #
+#                                                                        #
+#  ####################################################################  #
+#                                                                        #
+#  This program is free software: you can redistribute it and/or modify  #
+#  it under the terms of the GNU General Public License as published by  #
+#  the Free Software Foundation, either version 3 of the License, or     #
+#  (at your option) any later version.                                   #
+#                                                                        #
+#  This program is distributed in the hope that it will be useful,       #
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of        #
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the          #
+#  GNU General Public License for more details.                          #
+#                                                                        #
+#  You should have received a copy of the GNU General Public License     #
+#  along with this program. If not, see <http://www.gnu.org/licenses/>.  #
+#                                                                        #
+##########################################################################
+
+
+"""
+Tests for the Blackbird relational schema model.
+"""
+
+import json
+
+import pytest
+
+from eddy.core.functions.misc import first
+
+# noinspection PyUnresolvedReferences
+from eddy.plugins.blackbird.schema import (
+    RelationalSchemaDiff,
+    RelationalSchemaParseError,
+    RelationalSchemaParser,
+    RelationalSchemaStreamParser
+)
+
+from conftest import jsonForeignKey, jsonTable
+
+
+#############################################
+#   UTILITIES
+#################################
+
+def jsonSchema(*tables):
+    return {'schemaName': 'test', 'id': 'DB_1', 'tables': list(tables)}
+
+
+def jsonWideSchema(ntables, ncolumns):
+    """
+    Returns the JSON text of a synthetic schema with ntables * ncolumns columns.
+    """
+    tables = []
+    for i in range(ntables):
+        table = jsonTable('T{}'.format(i), fks=['T{}'.format(i - 1)] if i else None)
+        table['columns'] = [dict(table['columns'][0], columnName='C{}_{}'.format(i, j), position=j,
+                                 id='COL_{}_{}'.format(i, j)) for j in range(ncolumns)]
+        tables.append(table)
+    return json.dumps(jsonSchema(*tables))
+
+
+@pytest.fixture
+def schema():
+    """
+    Yields a small schema with a chain of subclass foreign keys.
+    """
+    yield RelationalSchemaParser.getSchema(jsonSchema(
+        jsonTable('A'),
+        jsonTable('B', fks=['A']),
+        jsonTable('C', fks=['A', 'B']),
+    ))
+
+
+#############################################
+#   TABLE LOOKUP
+#################################
+
+def test_table_lookup_by_name(schema):
+    # THEN
+    assert schema.getTableByName('CL_B').id == 'TABLE_B'
+    assert schema.getTableByName('CL_Z') is None
+
+
+def test_table_lookup_by_id(schema):
+    # THEN
+    assert schema.getTableById('TABLE_C').name == 'CL_C'
+    assert schema.getTableById('TABLE_Z') is None
+
+
+def test_table_lookup_by_entity_iri(schema):
+    # THEN
+    assert schema.getTableByEntityIRI('https://obdasystems.com/blackbird/test/A').name == 'CL_A'
+    assert schema.getTableByEntityShortIRI('bbt:C').name == 'CL_C'
+    assert schema.getTableByEntityIRI('https://obdasystems.com/blackbird/test/Z') is None
+    assert schema.getTableByEntityShortIRI('bbt:Z') is None
+
+
+#############################################
+#   FOREIGN KEYS
+#################################
+
+def test_foreign_key_value_identity(schema):
+    # GIVEN
+    data = jsonSchema(jsonTable('A'), jsonTable('B', fks=['A']))
+    # WHEN
+    fk1 = first(RelationalSchemaParser.getSchema(data).foreignKeys)
+    fk2 = first(RelationalSchemaParser.getSchema(data).foreignKeys)
+    # THEN
+    assert fk1 is not fk2
+    assert fk1 == fk2
+    assert hash(fk1) == hash(fk2)
+    assert fk1 != first(schema.getTableByName('CL_C').foreignKeys)
+
+
+def test_foreign_key_deduplication():
+    # GIVEN
+    tableB = jsonTable('B', fks=['A', 'A'])
+    tableA = jsonTable('A')
+    tableA['foreignKeyConstraints'] = [jsonForeignKey('B', 'A')]
+    # WHEN
+    schema = RelationalSchemaParser.getSchema(jsonSchema(tableA, tableB))
+    # THEN
+    assert len(schema.getTableByName('CL_B').foreignKeys) == 1
+    assert len(schema.foreignKeys) == 1
+    assert first(schema.foreignKeys) is first(schema.getTableByName('CL_B').foreignKeys)
+
+
+#############################################
+#   SCHEMA DIFF
+#################################
+
+def test_schema_diff_of_equal_schemas_is_empty(schema):
+    # GIVEN
+    data = jsonSchema(jsonTable('A'), jsonTable('B', fks=['A']), jsonTable('C', fks=['A', 'B']))
+    # WHEN
+    diff = RelationalSchemaDiff(schema, RelationalSchemaParser.getSchema(data))
+    # THEN
+    assert diff.isEmpty()
+    assert not diff.modifiedTables
+
+
+def test_schema_diff_added_and_removed_tables(schema):
+    # GIVEN
+    data = jsonSchema(jsonTable('A'), jsonTable('B', fks=['A']), jsonTable('D', fks=['A']))
+    # WHEN
+    diff = RelationalSchemaDiff(schema, RelationalSchemaParser.getSchema(data))
+    # THEN
+    assert [table.name for table in diff.addedTables] == ['CL_D']
+    assert [table.name for table in diff.removedTables] == ['CL_C']
+    assert [fk.name for fk in diff.addedForeignKeys] == ['FK_D_A']
+    assert sorted(fk.name for fk in diff.removedForeignKeys) == ['FK_C_A', 'FK_C_B']
+    assert not diff.modifiedTables
+    assert not diff.renamedTables
+
+
+def test_schema_diff_renamed_table(schema):
+    # GIVEN
+    tableC = jsonTable('C', fks=['A', 'B'])
+    tableC['tableName'] = 'CL_C_RENAMED'
+    # WHEN
+    diff = RelationalSchemaDiff(schema, RelationalSchemaParser.getSchema(
+        jsonSchema(jsonTable('A'), jsonTable('B', fks=['A']), tableC)))
+    # THEN
+    assert [(old.name, new.name) for old, new in diff.renamedTables] == [('CL_C', 'CL_C_RENAMED')]
+    assert not diff.addedTables
+    assert not diff.removedTables
+    assert not diff.addedForeignKeys
+
+
+def test_schema_diff_of_rename_only_is_not_empty(schema):
+    # GIVEN
+    tableC = jsonTable('C', fks=['A', 'B'])
+    tableC['tableName'] = 'CL_C_RENAMED'
+    # WHEN
+    diff = RelationalSchemaDiff(schema, RelationalSchemaParser.getSchema(
+        jsonSchema(jsonTable('A'), jsonTable('B', fks=['A']), tableC)))
+    # THEN
+    assert not diff.modifiedTables
+    assert not diff.removedForeignKeys
+    assert not diff.isEmpty()
+
+
+def test_schema_diff_modified_table(schema):
+    # GIVEN
+    tableB = jsonTable('B')
+    tableB['columns'][0]['nullable'] = True
+    tableB['columns'].append(dict(tableB['columns'][0], columnName='NAME_B', position=1, id='COL_NAME_B'))
+    # WHEN
+    diff = RelationalSchemaDiff(schema, RelationalSchemaParser.getSchema(
+        jsonSchema(jsonTable('A'), tableB, jsonTable('C', fks=['A', 'B']))))
+    # THEN
+    tableDiff = first(diff.modifiedTables)
+    assert len(diff.modifiedTables) == 1
+    assert tableDiff.newTable.name == 'CL_B'
+    assert [column.columnName for column in tableDiff.addedColumns] == ['NAME_B']
+    assert not tableDiff.removedColumns
+    assert [(old.isNullable, new.isNullable) for old, new in tableDiff.modifiedColumns] == [(False, True)]
+    assert [fk.name for fk in tableDiff.removedForeignKeys] == ['FK_B_A']
+    assert [fk.name for fk in diff.removedForeignKeys] == ['FK_B_A']
+    assert not tableDiff.entityChanged
+    assert not tableDiff.primaryKeyChanged
+
+
+#############################################
+#   INCREMENTAL PARSING
+#################################
+
+@pytest.mark.parametrize('chunksize', [1, 7, 64, 4096])
+def test_stream_parser_matches_parser(chunksize):
+    # GIVEN
+    data = jsonSchema(jsonTable('A'), jsonTable('B', fks=['A']), jsonTable('C\u00e8"\\', fks=['A', 'B']))
+    data['id'] = data.pop('id')  # MOVE THE ID AFTER THE TABLES
+    text = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    parser = RelationalSchemaStreamParser()
+    # WHEN
+    for i in range(0, len(text), chunksize):
+        parser.feed(text[i:i + chunksize])
+    schema = parser.close()
+    expected = RelationalSchemaParser.getSchema(data)
+    # THEN
+    assert [t.name for t in schema.tables] == [t.name for t in expected.tables]
+    assert str(schema) == str(expected)
+
+
+@pytest.mark.parametrize('chunksize', [1000, 65536])
+def test_stream_parser_decodes_tables_larger_than_its_window(chunksize):
+    # GIVEN
+    text = jsonWideSchema(ntables=20, ncolumns=200).replace('CL_T1', 'CL_T1\u00e8').encode('utf-8')
+    parser = RelationalSchemaStreamParser()
+    # WHEN
+    for i in range(0, len(text), chunksize):
+        parser.feed(text[i:i + chunksize])
+    schema = parser.close()
+    expected = RelationalSchemaParser.getSchema(json.loads(text))
+    # THEN
+    assert [t.name for t in schema.tables][:3] == ['CL_T0', 'CL_T1\u00e8', 'CL_T2']
+    assert str(schema) == str(expected)
+
+
+def test_stream_parser_yields_tables_before_completion():
+    # GIVEN
+    text = json.dumps(jsonSchema(jsonTable('A'), jsonTable('B'))).encode('utf-8')
+    parser = RelationalSchemaStreamParser()
+    # WHEN
+    tables = parser.feed(text[:text.index(b'CL_B')])
+    # THEN
+    assert [t.name for t in tables] == ['CL_A']
+
+
+def test_stream_parser_truncated_document():
+    # GIVEN
+    text = json.dumps(jsonSchema(jsonTable('A'), jsonTable('B'))).encode('utf-8')
+    parser = RelationalSchemaStreamParser()
+    parser.feed(text[:-10])
+    # THEN
+    with pytest.raises(RelationalSchemaParseError):
+        parser.close()
+
+
+#############################################
+#   BENCHMARKS
+#################################
+
+def test_compact_model_benchmark(benchmark):
+    # GIVEN
+    data = json.loads(jsonWideSchema(ntables=5000, ncolumns=10))
+    # WHEN
+    schema = benchmark.pedantic(RelationalSchemaParser.getSchema, args=(data,), rounds=3)
+    # THEN
+    assert len(schema.tables) == 5000
+    assert all(len(table.columns) == 10 for table in schema.tables)
+    assert len(schema.foreignKeys) == 4999
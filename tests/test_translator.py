@@ -39,7 +39,7 @@ from PyQt5 import (
 from eddy.core.functions.fsystem import fread
 
 # noinspection PyUnresolvedReferences
-from eddy.plugins.blackbird.translator import BlackbirdProcess
+from eddy.plugins.blackbird.translator import BlackbirdProcess, EngineState, cdsArchivePath, engineArguments
 # noinspection PyUnresolvedReferences
 from eddy.plugins.blackbird.rest import NetworkManager
 
@@ -72,6 +72,95 @@ def test_process_start_stop(executable, qtbot):
             process.kill()
 
 
+def test_process_lifecycle_states(executable, qtbot):
+    # GIVEN
+    process = BlackbirdProcess(executable)
+    states = []
+    process.sgnStateChanged.connect(states.append)
+    try:
+        # WHEN
+        with qtbot.waitSignal(process.sgnReady, timeout=3000):
+            process.start()
+        # THEN
+        assert process.isHealthy()
+        assert states[0] is EngineState.Starting
+        assert states[-1] is EngineState.Healthy
+        # WHEN
+        with qtbot.waitSignal(process.sgnFinished, timeout=5000):
+            process.stop()
+        # THEN
+        assert states[-2:] == [EngineState.Stopping, EngineState.NotRunning]
+        assert not process.isHealthy()
+    finally:
+        if process.state() != QtCore.QProcess.NotRunning:
+            process.kill()
+
+
+def test_process_stops_gracefully_when_waited_for(executable, qtbot, tmpdir):
+    # GIVEN
+    process = BlackbirdProcess(executable, cdsDir=str(tmpdir.mkdir('cds')))
+    states = []
+    process.sgnStateChanged.connect(states.append)
+    try:
+        with qtbot.waitSignal(process.sgnReady, timeout=30000):
+            process.start()
+        # WHEN
+        process.stop(wait=True)
+        # THEN
+        assert process.state() == QtCore.QProcess.NotRunning
+        assert process.exitStatus() == QtCore.QProcess.NormalExit
+        assert states[-2:] == [EngineState.Stopping, EngineState.NotRunning]
+        assert os.path.isfile(process.cdsArchive)
+    finally:
+        if process.state() != QtCore.QProcess.NotRunning:
+            process.kill()
+
+
+def test_engine_arguments_dump_then_reuse_the_archive(executable, tmpdir):
+    # GIVEN
+    archive = cdsArchivePath(str(tmpdir.mkdir('cds')), executable, 'java', ['-Xmx1g'], 8081)
+    # WHEN
+    dumping = engineArguments(executable, ['-Xmx1g'], archive, 8081)
+    open(archive, 'wb').close()
+    reusing = engineArguments(executable, ['-Xmx1g'], archive, 8081)
+    # THEN
+    assert dumping == ['-Xmx1g', '-XX:+IgnoreUnrecognizedVMOptions', '-XX:ArchiveClassesAtExit={}'.format(archive),
+                       '-jar', executable, '--server.port=8081']
+    assert reusing[2:4] == ['-Xshare:auto', '-XX:SharedArchiveFile={}'.format(archive)]
+    assert archive != cdsArchivePath(str(tmpdir.join('cds')), executable, 'java', ['-Xmx1g'], 8082)
+
+
+def startEngine(qtbot, process):
+    """
+    Start and stop the given engine process, returning its startup time as logged by the engine.
+    :rtype: int
+    """
+    try:
+        with qtbot.waitSignal(process.sgnReady, timeout=30000):
+            process.start()
+        return process.startupTime
+    finally:
+        with qtbot.waitSignal(process.sgnFinished, timeout=10000):
+            process.stop()
+
+
+def test_startup_benchmark_class_data_sharing(executable, qtbot, tmpdir, benchmark):
+    # GIVEN
+    cdsDir = str(tmpdir.mkdir('cds'))
+    coldTime = startEngine(qtbot, BlackbirdProcess(executable))
+    # WHEN
+    startEngine(qtbot, BlackbirdProcess(executable, cdsDir=cdsDir))
+    process = BlackbirdProcess(executable, cdsDir=cdsDir)
+    cdsTime = benchmark.pedantic(startEngine, args=(qtbot, process), rounds=3, iterations=1)
+    benchmark.extra_info['started_ms_without_archive'] = coldTime
+    benchmark.extra_info['started_ms_with_archive'] = cdsTime
+    # THEN
+    assert os.path.isfile(process.cdsArchive)
+    assert '-XX:SharedArchiveFile={}'.format(process.cdsArchive) in process.arguments()
+    assert coldTime > 0
+    assert cdsTime > 0
+
+
 @pytest.mark.parametrize('owlfilename,ntables', [
     ('Diagram1.owl', 3),
     ('Diagram2.owl', 3),
@@ -99,7 +188,7 @@ def test_process_translate_owl(executable, qtbot, owlfilename, ntables):
         # THEN
         assert reply.error() == QtNetwork.QNetworkReply.NoError
         # AND
-        schema = json.loads(str(reply.readAll(), encoding='utf-8'))
+        schema = json.loads(str(nmanager.readAll(reply), encoding='utf-8'))
         assert 'id' in schema
         assert 'schemaName' in schema
         assert 'tables' in schema